@@ -1 +1,4 @@
- 
\ No newline at end of file
+from dotenv import load_dotenv
+
+# Modules read their settings from the environment when imported, so .env goes first
+load_dotenv()
@@ -0,0 +1,87 @@
+"""Awaitable counterparts of the functions in ``crud``.
+
+Each wrapper runs the sync crud function through ``database.run_db`` so the
+query logic lives in one place, while routers can ``await`` it with either a
+threadpool-bound ``Session`` or an ``AsyncSession`` (``ASYNC_DB_ENABLED``).
+"""
+import functools
+
+from . import crud
+from .database import run_db
+
+# Relationships read by response models; an AsyncSession cannot lazy-load
+# them once the handler has returned, so they are loaded up front.
+GROUP_RELATIONS = ("members", "shared_goals")
+
+
+def _to_async(fn, preload=()):
+    @functools.wraps(fn)
+    async def wrapper(db, *args, **kwargs):
+        def call(session):
+            result = fn(session, *args, **kwargs)
+            if preload and result is not None:
+                for obj in result if isinstance(result, list) else [result]:
+                    for attr in preload:
+                        getattr(obj, attr)
+            return result
+        return await run_db(db, call)
+    return wrapper
+
+
+# --- USER CRUD ---
+get_user = _to_async(crud.get_user)
+get_users_by_ids = _to_async(crud.get_users_by_ids)
+get_user_by_email = _to_async(crud.get_user_by_email)
+get_users = _to_async(crud.get_users)
+create_user = _to_async(crud.create_user)
+update_user = _to_async(crud.update_user)
+delete_user = _to_async(crud.delete_user)
+award_xp = _to_async(crud.award_xp)
+
+# --- GROUP CRUD ---
+get_group = _to_async(crud.get_group, preload=GROUP_RELATIONS)
+get_groups = _to_async(crud.get_groups, preload=GROUP_RELATIONS)
+create_group = _to_async(crud.create_group, preload=GROUP_RELATIONS)
+update_group = _to_async(crud.update_group, preload=GROUP_RELATIONS)
+delete_group = _to_async(crud.delete_group, preload=GROUP_RELATIONS)
+reconcile_group_progress = _to_async(crud.reconcile_group_progress)
+
+# --- GOAL CRUD ---
+get_goal = _to_async(crud.get_goal)
+get_goals_by_ids = _to_async(crud.get_goals_by_ids)
+get_goals = _to_async(crud.get_goals)
+create_goal = _to_async(crud.create_goal)
+update_goal = _to_async(crud.update_goal)
+delete_goal = _to_async(crud.delete_goal)
+
+# --- EXPLORATION STATE CRUD ---
+get_exploration_state = _to_async(crud.get_exploration_state)
+create_exploration_state = _to_async(crud.create_exploration_state)
+update_exploration_state = _to_async(crud.update_exploration_state)
+delete_exploration_state = _to_async(crud.delete_exploration_state)
+unlock_location = _to_async(crud.unlock_location)
+unlock_achievement = _to_async(crud.unlock_achievement)
+get_users_with_location = _to_async(crud.get_users_with_location)
+get_users_with_achievement = _to_async(crud.get_users_with_achievement)
+
+# --- ACHIEVEMENT CRUD ---
+get_achievement = _to_async(crud.get_achievement)
+get_achievements_by_ids = _to_async(crud.get_achievements_by_ids)
+get_achievements = _to_async(crud.get_achievements)
+create_achievement = _to_async(crud.create_achievement)
+update_achievement = _to_async(crud.update_achievement)
+delete_achievement = _to_async(crud.delete_achievement)
+
+# --- FOCUS SESSION CRUD ---
+get_focus_session = _to_async(crud.get_focus_session)
+get_focus_sessions_by_ids = _to_async(crud.get_focus_sessions_by_ids)
+get_focus_sessions = _to_async(crud.get_focus_sessions)
+create_focus_session = _to_async(crud.create_focus_session)
+create_focus_sessions_bulk = _to_async(crud.create_focus_sessions_bulk)
+update_focus_session = _to_async(crud.update_focus_session)
+delete_focus_session = _to_async(crud.delete_focus_session)
+get_user_focus_stats = _to_async(crud.get_user_focus_stats)
+get_goal_focus_stats = _to_async(crud.get_goal_focus_stats)
+
+# --- DASHBOARD ---
+get_dashboard = _to_async(crud.get_dashboard)
@@ -6,9 +6,12 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from . import crud, schemas, utils
+from . import async_crud, schemas, utils
+from .cache import token_cache
 from .database import get_db
+from .instrumentation import timed
 
 # Read secret key from environment variable, fallback to default for dev
 SECRET_KEY = os.environ.get("SECRET_KEY", "your-secret-key")
@@ -24,37 +27,51 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    with timed("jwt"):
+        encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def authenticate_user(db: Session, email: str, password: str):
-    user = crud.get_user_by_email(db, email)
+async def authenticate_user(db: Session, email: str, password: str):
+    user = await async_crud.get_user_by_email(db, email)
     if not user:
         return False
-    if not utils.verify_password(password, user.hashed_password):
+    if not await utils.verify_password_async(password, user.hashed_password):
         return False
     return user
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    # A shared cache backend means network I/O, so keep it off the event loop
+    if token_cache.backend is None:
+        cached_user = token_cache.get(token)
+    else:
+        cached_user = await run_in_threadpool(token_cache.get, token)
+    if cached_user is not None:
+        return cached_user
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        with timed("jwt"):
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
         token_data = schemas.TokenData(email=email)
     except JWTError:
         raise credentials_exception
-    user = crud.get_user_by_email(db, email=token_data.email)
+    user = await async_crud.get_user_by_email(db, email=token_data.email)
     if user is None:
         raise credentials_exception
+    user = schemas.UserResponse.model_validate(user)
+    if token_cache.backend is None:
+        token_cache.set(token, user, expires_at=payload["exp"])
+    else:
+        await run_in_threadpool(token_cache.set, token, user, payload["exp"])
     return user
 
-def get_current_active_user(current_user: schemas.User = Depends(get_current_user)):
+async def get_current_active_user(current_user: schemas.User = Depends(get_current_user)):
     if not current_user:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
@@ -0,0 +1,173 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from . import schemas
+from .metrics import Counter
+
+# Upper bound on how long a cached user can outlive a change made by another worker
+AUTH_CACHE_TTL = float(os.environ.get("AUTH_CACHE_TTL", "30"))
+AUTH_CACHE_MAX_SIZE = int(os.environ.get("AUTH_CACHE_MAX_SIZE", "10000"))
+# Optional shared second level (requires the `redis` package)
+AUTH_CACHE_REDIS_URL = os.environ.get("AUTH_CACHE_REDIS_URL")
+
+AUTH_CACHE_REQUESTS = Counter("auth_cache_requests_total", "Token lookups by result (hit/miss)")
+
+
+class TTLCache:
+    """Thread-safe LRU map whose entries also expire after their own TTL."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class InMemoryBackend:
+    """Process-local stand-in for a shared backend (tests, single worker)."""
+
+    def __init__(self, max_size: int = 100000):
+        self._cache = TTLCache(max_size, float("inf"))
+
+    def get(self, key: str) -> Optional[str]:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: str, ttl: float):
+        self._cache.set(key, value, ttl)
+
+    def delete(self, key: str):
+        self._cache.delete(key)
+
+
+class RedisBackend:
+    def __init__(self, url: str):
+        import redis
+
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+
+    def get(self, key: str) -> Optional[str]:
+        return self._client.get(key)
+
+    def set(self, key: str, value: str, ttl: float):
+        self._client.set(key, value, px=max(int(ttl * 1000), 1))
+
+    def delete(self, key: str):
+        self._client.delete(key)
+
+
+class TokenCache:
+    """Resolves bearer tokens to user snapshots without jwt.decode or a SELECT.
+
+    Tokens map to ``(user_id, sub)`` until the token's ``exp``; users are cached
+    separately by id so ``invalidate_user`` drops every token of that user at once.
+    A hit also requires the cached email to still match the token's ``sub``.
+    """
+
+    def __init__(self, max_size: int, ttl: float, backend=None):
+        self.ttl = ttl
+        self.backend = backend
+        self._tokens = TTLCache(max_size, ttl)
+        self._users = TTLCache(max_size, ttl)
+
+    @staticmethod
+    def _token_key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[schemas.UserResponse]:
+        key = self._token_key(token)
+        user = None
+        entry = self._tokens.get(key)
+        if entry is None and self.backend is not None:
+            raw = self.backend.get(f"auth:token:{key}")
+            if raw is not None:
+                entry = tuple(json.loads(raw))
+        if entry is not None:
+            user_id, sub = entry
+            user = self._users.get(user_id)
+            if user is None and self.backend is not None:
+                raw = self.backend.get(f"auth:user:{user_id}")
+                if raw is not None:
+                    user = schemas.UserResponse.model_validate_json(raw)
+                    self._users.set(user_id, user)
+            if user is not None and user.email != sub:
+                user = None
+            if user is not None:
+                self._tokens.set(key, entry)
+        AUTH_CACHE_REQUESTS.inc(result="hit" if user is not None else "miss")
+        return user
+
+    def set(self, token: str, user: schemas.UserResponse, expires_at: float):
+        ttl = min(self.ttl, expires_at - time.time())
+        if ttl <= 0:
+            return
+        key = self._token_key(token)
+        entry = (user.id, user.email)
+        self._tokens.set(key, entry, ttl)
+        self._users.set(user.id, user)
+        if self.backend is not None:
+            self.backend.set(f"auth:token:{key}", json.dumps(entry), ttl)
+            self.backend.set(f"auth:user:{user.id}", user.model_dump_json(), self.ttl)
+
+    def invalidate_user(self, user_id: str):
+        self._users.delete(user_id)
+        if self.backend is not None:
+            self.backend.delete(f"auth:user:{user_id}")
+
+    def clear(self):
+        self._tokens.clear()
+        self._users.clear()
+
+    def stats(self) -> dict:
+        return {
+            "hits": AUTH_CACHE_REQUESTS.value(result="hit"),
+            "misses": AUTH_CACHE_REQUESTS.value(result="miss"),
+            "tokens": len(self._tokens),
+            "users": len(self._users),
+            "ttl": self.ttl,
+            "shared_backend": type(self.backend).__name__ if self.backend else None,
+        }
+
+
+token_cache = TokenCache(
+    AUTH_CACHE_MAX_SIZE,
+    AUTH_CACHE_TTL,
+    backend=RedisBackend(AUTH_CACHE_REDIS_URL) if AUTH_CACHE_REDIS_URL else None,
+)
@@ -1,23 +1,101 @@
-from datetime import datetime
-from typing import List, Optional
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy import Float, bindparam, case, cast, delete, func, insert, inspect, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
 
 from . import models, schemas, utils
+from .cache import token_cache
+from .feed import publish_on_commit
+from .leaderboard import leaderboard
+from .pagination import paginate
+from .response_cache import dashboard_cache, invalidate_on_commit
+
+# Rows per multi-row INSERT; keeps bound parameters under SQLite's limit
+BULK_INSERT_CHUNK_SIZE = 1000
+
+
+def _dialect_insert(db: Session):
+    """``insert`` with ON CONFLICT support for the bound dialect, or None."""
+    return {"postgresql": postgresql_insert, "sqlite": sqlite_insert}.get(db.get_bind().dialect.name)
+
+def _column_changes(model, changes):
+    """Fields set on an update schema that are columns of ``model`` (others were never persisted)."""
+    columns = model.__table__.columns
+    return {field: value for field, value in changes.model_dump(exclude_unset=True).items() if field in columns}
+
+def _update_returning(db: Session, model, key_column, key, values: dict, options=()):
+    """UPDATE one row and load it from RETURNING; None when no row matched."""
+    stmt = update(model).where(key_column == key).values(**values).returning(model)
+    return db.execute(stmt.options(*options)).scalar_one_or_none()
+
+def _delete_returning(db: Session, model, key_column, key):
+    """DELETE one row and return it as it was; None when no row matched."""
+    return db.execute(delete(model).where(key_column == key).returning(model)).scalar_one_or_none()
+
+def _invalidate_dashboards(db: Session, user_ids=None):
+    """Drop the cached dashboards of ``user_ids`` once ``db`` commits; all of them with None."""
+    if user_ids is None:
+        invalidate_on_commit(db, "dashboard", cache=dashboard_cache)
+        return
+    for user_id in user_ids:
+        if user_id is not None:
+            invalidate_on_commit(db, "dashboard", user_id, cache=dashboard_cache)
+
+def _get_by_ids(db: Session, model, ids: List[str]):
+    """Rows of ``model`` whose primary key is in ``ids``, in one IN query and no particular order."""
+    if not ids:
+        return []
+    return db.query(model).filter(model.id.in_(ids)).all()
+
+def _entities(model, columns=None):
+    """Query entities for list reads: ``columns`` yields plain row tuples instead of ORM instances."""
+    return columns or (model,)
+
+def _commit_loaded(db: Session, instance):
+    """Commit like ``db.commit()`` but leave ``instance`` and its loaded relationships unexpired.
+
+    Update and delete results were just written or read back by RETURNING,
+    so reloading them for the response would fetch the same values again.
+    Everything else in the session is expired as usual.
+    """
+    keep = {id(instance)}
+    state = inspect(instance)
+    for relationship in state.mapper.relationships:
+        related = state.dict.get(relationship.key)
+        if related is not None:
+            keep.update(map(id, related if relationship.uselist else [related]))
+    expire_on_commit, db.expire_on_commit = db.expire_on_commit, False
+    try:
+        db.commit()
+    finally:
+        db.expire_on_commit = expire_on_commit
+    if expire_on_commit:
+        for obj in list(db.identity_map.values()):
+            if id(obj) not in keep:
+                db.expire(obj)
 
 
 # --- USER CRUD ---
 def get_user(db: Session, user_id: str):
     return db.query(models.User).filter(models.User.id == user_id).first()
 
+def get_users_by_ids(db: Session, ids: List[str]):
+    return _get_by_ids(db, models.User, ids)
+
 def get_user_by_email(db: Session, email: str):
     return db.query(models.User).filter(models.User.email == email).first()
 
-def get_users(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.User).offset(skip).limit(limit).all()
+def get_users(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, columns=None):
+    return paginate(db.query(*_entities(models.User, columns)), models.User.id, skip, limit, cursor)
 
-def create_user(db: Session, user: schemas.UserCreate):
-    hashed_password = utils.get_password_hash(user.password)
+def create_user(db: Session, user: schemas.UserCreate, hashed_password: Optional[str] = None):
+    if hashed_password is None:
+        hashed_password = utils.get_password_hash(user.password)
     db_user = models.User(
         username=user.username,
         email=user.email,
@@ -35,28 +113,116 @@ def create_user(db: Session, user: schemas.UserCreate):
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    leaderboard.record_user(db_user.id, db_user.experience_points, db_user.streak_days)
     return db_user
 
 def update_user(db: Session, user_id: str, user: schemas.UserUpdate):
-    db_user = get_user(db, user_id)
-    for field, value in user.model_dump(exclude_unset=True).items():
-        setattr(db_user, field, value)
-    db.commit()
-    db.refresh(db_user)
+    """Apply ``user``; returns None if the user doesn't exist."""
+    values = _column_changes(models.User, user)
+    # XP is not an updatable field; it only changes through award_xp/apply_xp_batch
+    if values:
+        db_user = _update_returning(db, models.User, models.User.id, user_id, values)
+    else:
+        db_user = get_user(db, user_id)
+    if db_user is None:
+        return None
+    _invalidate_dashboards(db, [user_id])
+    _commit_loaded(db, db_user)
+    token_cache.invalidate_user(user_id)
+    leaderboard.record_user(user_id, db_user.experience_points, db_user.streak_days)
     return db_user
 
 def delete_user(db: Session, user_id: str):
+    """Returns the deleted user, or None if it doesn't exist."""
     db_user = get_user(db, user_id)
+    if db_user is None:
+        return None
+    # Their groups stop counting the user's focus minutes along with the membership
+    minutes = db.scalar(
+        select(func.coalesce(func.sum(models.FocusUserRollup.minutes), 0))
+        .where(models.FocusUserRollup.user_id == user_id)
+    )
+    _adjust_group_focus_minutes(db, {user_id: -minutes})
     db.delete(db_user)
+    # Cached groups list the user among their members
+    invalidate_on_commit(db, "group")
+    _invalidate_dashboards(db, [user_id])
     db.commit()
+    token_cache.invalidate_user(user_id)
+    leaderboard.remove_user(user_id)
     return db_user
 
-# --- GROUP CRUD ---
-def get_group(db: Session, group_id: str):
-    return db.query(models.Group).filter(models.Group.id == group_id).first()
+def award_xp(db: Session, user_id: str, amount: int):
+    """Add ``amount`` XP in one atomic UPDATE; returns the new total, or None if the user doesn't exist."""
+    total = db.execute(
+        update(models.User)
+        .where(models.User.id == user_id)
+        .values(experience_points=func.coalesce(models.User.experience_points, 0) + amount)
+        .returning(models.User.experience_points)
+    ).scalar_one_or_none()
+    if total is not None:
+        publish_on_commit(db, "user", user_id, "xp.awarded", user_id=user_id, amount=amount, experience_points=total)
+        _invalidate_dashboards(db, [user_id])
+    db.commit()
+    if total is not None:
+        token_cache.invalidate_user(user_id)
+        leaderboard.award_xp(user_id, amount)
+    return total
+
+def apply_xp_batch(db: Session, awards: Dict[str, int], batch_id: Optional[str] = None):
+    """Apply merged per-user XP deltas in one transaction (one executemany UPDATE).
+
+    With ``batch_id`` the batch is recorded alongside the updates and skipped
+    if it was already applied, which makes journal replays exactly-once.
+    Returns False when the batch had already been applied.
+    """
+    if batch_id is not None:
+        if db.get(models.XPAwardBatch, batch_id) is not None:
+            return False
+        db.add(models.XPAwardBatch(id=batch_id))
+    users = models.User.__table__
+    if awards:
+        db.execute(
+            update(users)
+            .where(users.c.id == bindparam("award_user_id"))
+            .values(experience_points=func.coalesce(users.c.experience_points, 0) + bindparam("award_amount")),
+            [{"award_user_id": user_id, "award_amount": amount} for user_id, amount in awards.items()]
+        )
+        for user_id, amount in awards.items():
+            publish_on_commit(db, "user", user_id, "xp.awarded", user_id=user_id, amount=amount)
+        _invalidate_dashboards(db, awards)
+    db.commit()
+    for user_id in awards:
+        token_cache.invalidate_user(user_id)
+    return True
+
+def prune_xp_award_batches(db: Session, older_than: datetime):
+    db.query(models.XPAwardBatch).filter(models.XPAwardBatch.applied_at < older_than).delete()
+    db.commit()
 
-def get_groups(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Group).offset(skip).limit(limit).all()
+def get_leaderboard_rows(db: Session):
+    """``(id, experience_points, streak_days)`` of every user, for rebuilding the leaderboards."""
+    return db.query(models.User.id, models.User.experience_points, models.User.streak_days).yield_per(10000)
+
+# --- GROUP CRUD ---
+# schemas.Group only exposes member and goal ids: batch-load the collections
+# (one query each per page, not per group) and fetch nothing but the id column.
+GROUP_ID_LOADERS = (
+    selectinload(models.Group.members).load_only(models.User.id),
+    selectinload(models.Group.shared_goals).load_only(models.Goal.id),
+)
+# For callers that need the full member and goal rows
+GROUP_FULL_LOADERS = (
+    selectinload(models.Group.members),
+    selectinload(models.Group.shared_goals),
+)
+
+def get_group(db: Session, group_id: str, options=GROUP_ID_LOADERS):
+    return db.query(models.Group).options(*options).filter(models.Group.id == group_id).first()
+
+def get_groups(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+               options=GROUP_ID_LOADERS):
+    return paginate(db.query(models.Group).options(*options), models.Group.id, skip, limit, cursor)
 
 def create_group(db: Session, group: schemas.GroupCreate):
     db_group = models.Group(**group.model_dump())
@@ -66,25 +232,186 @@ def create_group(db: Session, group: schemas.GroupCreate):
     return db_group
 
 def update_group(db: Session, group_id: str, group: schemas.GroupUpdate):
-    db_group = get_group(db, group_id)
-    for field, value in group.model_dump(exclude_unset=True).items():
-        setattr(db_group, field, value)
-    db.commit()
-    db.refresh(db_group)
+    """Apply ``group``; returns None if the group doesn't exist."""
+    values = _column_changes(models.Group, group)
+    if not values:
+        return get_group(db, group_id)
+    db_group = _update_returning(db, models.Group, models.Group.id, group_id, values, GROUP_ID_LOADERS)
+    if db_group is None:
+        return None
+    invalidate_on_commit(db, "group", group_id)
+    _commit_loaded(db, db_group)
     return db_group
 
 def delete_group(db: Session, group_id: str):
+    """Returns the deleted group, or None if it doesn't exist."""
+    # The ORM delete clears the membership and shared goal rows from the loaded collections
     db_group = get_group(db, group_id)
+    if db_group is None:
+        return None
     db.delete(db_group)
-    db.commit()
+    invalidate_on_commit(db, "group", group_id)
+    _commit_loaded(db, db_group)
     return db_group
 
+# --- GROUP PROGRESS ---
+# groups.goals_total / goals_completed / focus_minutes / progress are running
+# counters shifted by atomic UPDATEs in the same transaction as the change that
+# moves them; reconcile_group_progress recomputes them to repair drift.
+COMPLETED_GOAL_STATUS = "completed"
+
+def _progress(total, completed):
+    return case((total > 0, cast(completed, Float) / total), else_=0.0)
+
+def _adjust_group_goal_counts(db: Session, goal_id: str, total_delta: int, completed_delta: int,
+                              group_ids: Optional[List[str]] = None):
+    """Shift the goal counters of every group sharing ``goal_id``; returns the groups' new counters.
+
+    Pass ``group_ids`` when the group_goal rows are already gone.
+    """
+    if (not total_delta and not completed_delta) or group_ids == []:
+        return []
+    groups = models.Group.__table__
+    total = groups.c.goals_total + total_delta
+    completed = groups.c.goals_completed + completed_delta
+    sharing = group_ids
+    if sharing is None:
+        sharing = select(models.group_goal.c.group_id).where(models.group_goal.c.goal_id == goal_id)
+    changed = db.execute(
+        update(groups)
+        .where(groups.c.id.in_(sharing))
+        .values(goals_total=total, goals_completed=completed, progress=_progress(total, completed))
+        .returning(groups.c.id, groups.c.goals_total, groups.c.goals_completed, groups.c.progress)
+    ).all()
+    for group_id, *_ in changed:
+        invalidate_on_commit(db, "group", group_id)
+    return changed
+
+def _publish_goal_event(db: Session, event_type: str, db_goal: models.Goal, counters):
+    """Tell the feeds of the groups sharing ``db_goal``, with their updated counters."""
+    goal = {"id": db_goal.id, "title": db_goal.title, "status": db_goal.status}
+    for group_id, goals_total, goals_completed, progress in counters:
+        publish_on_commit(
+            db, "group", group_id, event_type,
+            goal=goal, goals_total=goals_total, goals_completed=goals_completed, progress=progress
+        )
+
+def _adjust_group_focus_minutes(db: Session, minutes_by_user: Dict[str, int]):
+    """Add members' focus minute deltas to every group they belong to."""
+    minutes_by_user = {user_id: minutes for user_id, minutes in minutes_by_user.items() if minutes}
+    if not minutes_by_user:
+        return
+    memberships = db.execute(
+        select(models.user_group.c.group_id, models.user_group.c.user_id)
+        .where(models.user_group.c.user_id.in_(minutes_by_user))
+    )
+    per_group = {}
+    for group_id, user_id in memberships:
+        per_group[group_id] = per_group.get(group_id, 0) + minutes_by_user[user_id]
+    if per_group:
+        groups = models.Group.__table__
+        db.execute(
+            update(groups)
+            .where(groups.c.id == bindparam("counter_group_id"))
+            .values(focus_minutes=groups.c.focus_minutes + bindparam("counter_minutes")),
+            [{"counter_group_id": group_id, "counter_minutes": minutes} for group_id, minutes in per_group.items()]
+        )
+        for group_id in per_group:
+            invalidate_on_commit(db, "group", group_id)
+
+def _expected_group_counters():
+    """Correlated subqueries computing each counter from scratch for ``groups.c.id``."""
+    groups = models.Group.__table__
+    goals = models.Goal.__table__
+    group_goal, user_group = models.group_goal, models.user_group
+    rollups = models.FocusUserRollup.__table__
+    total = select(func.count()).select_from(group_goal).where(group_goal.c.group_id == groups.c.id)
+    completed = select(func.count()).select_from(group_goal.join(goals, goals.c.id == group_goal.c.goal_id)).where(
+        group_goal.c.group_id == groups.c.id, goals.c.status == COMPLETED_GOAL_STATUS
+    )
+    minutes = select(func.coalesce(func.sum(rollups.c.minutes), 0)).select_from(
+        user_group.join(rollups, rollups.c.user_id == user_group.c.user_id)
+    ).where(user_group.c.group_id == groups.c.id)
+    return total.scalar_subquery(), completed.scalar_subquery(), minutes.scalar_subquery()
+
+def reconcile_group_progress(db: Session, group_ids: List[str]):
+    """Recompute the counters of ``group_ids``; returns the ids whose counters had drifted.
+
+    Focus minutes are summed from the daily rollups, so a large group costs
+    O(members x days), not a scan of every session.
+    """
+    groups = models.Group.__table__
+    total, completed, minutes = _expected_group_counters()
+    rows = db.execute(
+        select(groups.c.id, groups.c.goals_total, groups.c.goals_completed, groups.c.focus_minutes,
+               total, completed, minutes)
+        .where(groups.c.id.in_(group_ids))
+    ).all()
+    drifted = [row[0] for row in rows if tuple(row[1:4]) != tuple(row[4:7])]
+    if drifted:
+        # Recomputed inside the UPDATE so changes committed since the SELECT aren't overwritten
+        db.execute(
+            update(groups)
+            .where(groups.c.id.in_(drifted))
+            .values(goals_total=total, goals_completed=completed, focus_minutes=minutes,
+                    progress=_progress(total, completed))
+        )
+        for group_id in drifted:
+            invalidate_on_commit(db, "group", group_id)
+    db.commit()
+    return drifted
+
+def get_group_ids(db: Session, after: Optional[str] = None, limit: int = 100):
+    query = db.query(models.Group.id).order_by(models.Group.id)
+    if after is not None:
+        query = query.filter(models.Group.id > after)
+    return [row.id for row in query.limit(limit)]
+
 # --- GOAL CRUD ---
 def get_goal(db: Session, goal_id: str):
     return db.query(models.Goal).filter(models.Goal.id == goal_id).first()
 
-def get_goals(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Goal).offset(skip).limit(limit).all()
+def get_goals_by_ids(db: Session, ids: List[str]):
+    return _get_by_ids(db, models.Goal, ids)
+
+def get_goals(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    creator_id: Optional[str] = None,
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    due_from: Optional[date] = None,
+    due_to: Optional[date] = None,
+    columns=None
+):
+    query = db.query(*_entities(models.Goal, columns)).filter(*_goal_filters(creator_id, status, category, due_from, due_to))
+    return paginate(query, models.Goal.id, skip, limit, cursor)
+
+def _goal_filters(creator_id=None, status=None, category=None, due_from=None, due_to=None):
+    filters = [
+        column == value
+        for column, value in ((models.Goal.creator_id, creator_id), (models.Goal.status, status), (models.Goal.category, category))
+        if value is not None
+    ]
+    if due_from is not None:
+        filters.append(models.Goal.due_date >= due_from)
+    if due_to is not None:
+        filters.append(models.Goal.due_date <= due_to)
+    return filters
+
+# Plain columns only: exports stream tuples, never ORM objects or relationships
+GOAL_EXPORT_COLUMNS = (
+    "id", "title", "description", "type", "status", "creator_id", "category", "created_by_ai",
+    "created_at", "due_date", "rewards_xp", "rewards_custom_reward", "rewards_unlock",
+)
+
+def goals_export_query(creator_id: Optional[str] = None, status: Optional[str] = None, category: Optional[str] = None,
+                       due_from: Optional[date] = None, due_to: Optional[date] = None):
+    """SELECT for ``export.stream_export``; same filters as ``get_goals``."""
+    columns = [getattr(models.Goal, name) for name in GOAL_EXPORT_COLUMNS]
+    return select(*columns).where(*_goal_filters(creator_id, status, category, due_from, due_to))
 
 def create_goal(db: Session, goal: schemas.GoalCreate):
     db_goal = models.Goal(
@@ -102,134 +429,458 @@ def create_goal(db: Session, goal: schemas.GoalCreate):
         rewards_unlock=goal.rewards_unlock
     )
     db.add(db_goal)
+    if goal.group_id is not None:
+        db.flush()
+        db.execute(insert(models.group_goal).values(group_id=goal.group_id, goal_id=db_goal.id))
+        counters = _adjust_group_goal_counts(db, db_goal.id, 1, int(db_goal.status == COMPLETED_GOAL_STATUS))
+        _publish_goal_event(db, "goal.created", db_goal, counters)
+    _invalidate_dashboards(db, [goal.creator_id])
     db.commit()
     db.refresh(db_goal)
     return db_goal
 
 def update_goal(db: Session, goal_id: str, goal: schemas.GoalUpdate):
+    """Apply ``goal``; returns None if the goal doesn't exist."""
+    values = _column_changes(models.Goal, goal)
+    if values and "status" not in values:
+        db_goal = _update_returning(db, models.Goal, models.Goal.id, goal_id, values)
+        if db_goal is None:
+            return None
+        # RETURNING only has the new creator; a handed-over goal leaves the old one's dashboard too
+        _invalidate_dashboards(db, None if "creator_id" in values else [db_goal.creator_id])
+        _commit_loaded(db, db_goal)
+        return db_goal
+    # A status change moves the group counters, which depends on the stored status
     db_goal = get_goal(db, goal_id)
-    for field, value in goal.model_dump(exclude_unset=True).items():
+    if db_goal is None:
+        return None
+    was_completed = db_goal.status == COMPLETED_GOAL_STATUS
+    previous_creator = db_goal.creator_id
+    for field, value in values.items():
         setattr(db_goal, field, value)
-    db.commit()
-    db.refresh(db_goal)
+    _invalidate_dashboards(db, {previous_creator, db_goal.creator_id})
+    is_completed = db_goal.status == COMPLETED_GOAL_STATUS
+    if is_completed != was_completed:
+        counters = _adjust_group_goal_counts(db, goal_id, 0, 1 if is_completed else -1)
+        _publish_goal_event(db, "goal.completed" if is_completed else "goal.reopened", db_goal, counters)
+    _commit_loaded(db, db_goal)
     return db_goal
 
 def delete_goal(db: Session, goal_id: str):
-    db_goal = get_goal(db, goal_id)
-    db.delete(db_goal)
-    db.commit()
+    """Returns the deleted goal, or None if it doesn't exist.
+
+    Link rows go first (they reference the goal); the groups they named get
+    their counters adjusted once the goal's status is known from RETURNING.
+    """
+    db.execute(delete(models.goal_user).where(models.goal_user.c.goal_id == goal_id))
+    group_ids = list(db.scalars(
+        delete(models.group_goal).where(models.group_goal.c.goal_id == goal_id).returning(models.group_goal.c.group_id)
+    ))
+    db_goal = _delete_returning(db, models.Goal, models.Goal.id, goal_id)
+    if db_goal is None:
+        return None
+    completed = int(db_goal.status == COMPLETED_GOAL_STATUS)
+    counters = _adjust_group_goal_counts(db, goal_id, -1, -completed, group_ids=group_ids)
+    _publish_goal_event(db, "goal.deleted", db_goal, counters)
+    _invalidate_dashboards(db, [db_goal.creator_id])
+    _commit_loaded(db, db_goal)
     return db_goal
 
 # --- EXPLORATION STATE CRUD ---
+def _insert_ignore(db: Session, model, **values):
+    """Single-row INSERT that is a no-op when a unique constraint already holds it."""
+    dialect_insert = _dialect_insert(db)
+    if dialect_insert is not None:
+        db.execute(dialect_insert(model).values(**values).on_conflict_do_nothing())
+    else:
+        try:
+            with db.begin_nested():
+                db.execute(insert(model).values(**values))
+        except IntegrityError:
+            pass
+
+def _replace_unlocks(rows, items, attr, model):
+    """Apply a full list as a diff: delete dropped items, insert new ones, keep the rest."""
+    wanted = list(dict.fromkeys(items))
+    keep = set(wanted)
+    for row in [row for row in rows if getattr(row, attr) not in keep]:
+        rows.remove(row)
+    existing = {getattr(row, attr) for row in rows}
+    rows.extend(model(**{attr: item}) for item in wanted if item not in existing)
+
 def get_exploration_state(db: Session, user_id: str):
-    state = db.query(models.ExplorationState).filter(models.ExplorationState.user_id == user_id).first()
-    if state:
-        # Convert comma-separated strings to lists only if needed
-        if isinstance(state.unlocked_locations, str):
-            state.unlocked_locations = state.unlocked_locations.split(',') if state.unlocked_locations else []
-        if isinstance(state.achievements, str):
-            state.achievements = state.achievements.split(',') if state.achievements else []
-    return state
+    return db.query(models.ExplorationState).filter(models.ExplorationState.user_id == user_id).first()
 
 def create_exploration_state(db: Session, state: schemas.ExplorationStateCreate):
     db_state = models.ExplorationState(
         user_id=state.user_id,
-        unlocked_locations=','.join(state.unlocked_locations),
         current_location=state.current_location,
         lore_progress=state.lore_progress,
-        achievements=','.join(state.achievements)
+        location_unlocks=[models.UnlockedLocation(location=item) for item in dict.fromkeys(state.unlocked_locations)],
+        achievement_unlocks=[models.UnlockedAchievement(achievement=item) for item in dict.fromkeys(state.achievements)]
     )
     db.add(db_state)
+    _invalidate_dashboards(db, [state.user_id])
     db.commit()
     db.refresh(db_state)
-    # Convert for API response
-    if isinstance(db_state.unlocked_locations, str):
-        db_state.unlocked_locations = db_state.unlocked_locations.split(',') if db_state.unlocked_locations else []
-    if isinstance(db_state.achievements, str):
-        db_state.achievements = db_state.achievements.split(',') if db_state.achievements else []
     return db_state
 
 def update_exploration_state(db: Session, user_id: str, state: schemas.ExplorationStateUpdate):
+    """Apply ``state``; returns None if the user has no exploration state."""
+    # The unlock lists are applied as a diff against the loaded rows, so this loads first
     db_state = get_exploration_state(db, user_id)
+    if db_state is None:
+        return None
     for field, value in state.model_dump(exclude_unset=True).items():
-        if field in ['unlocked_locations', 'achievements']:
-            if value is None:
-                continue  # Don't update if not provided
-            if isinstance(value, list):
-                value = ','.join(value)
-        setattr(db_state, field, value)
-    # Ensure these fields are always strings before commit
-    if isinstance(db_state.unlocked_locations, list):
-        db_state.unlocked_locations = ','.join(db_state.unlocked_locations)
-    if isinstance(db_state.achievements, list):
-        db_state.achievements = ','.join(db_state.achievements)
-    db.commit()
-    db.refresh(db_state)
-    # Convert for API response
-    if isinstance(db_state.unlocked_locations, str):
-        db_state.unlocked_locations = db_state.unlocked_locations.split(',') if db_state.unlocked_locations else []
-    if isinstance(db_state.achievements, str):
-        db_state.achievements = db_state.achievements.split(',') if db_state.achievements else []
+        if field == 'unlocked_locations':
+            if value is not None:
+                _replace_unlocks(db_state.location_unlocks, value, 'location', models.UnlockedLocation)
+        elif field == 'achievements':
+            if value is not None:
+                _replace_unlocks(db_state.achievement_unlocks, value, 'achievement', models.UnlockedAchievement)
+        else:
+            setattr(db_state, field, value)
+    _invalidate_dashboards(db, [user_id])
+    _commit_loaded(db, db_state)
     return db_state
 
 def delete_exploration_state(db: Session, user_id: str):
+    """Returns the deleted state, or None if it doesn't exist."""
     db_state = get_exploration_state(db, user_id)
+    if db_state is None:
+        return None
     db.delete(db_state)
+    _invalidate_dashboards(db, [user_id])
+    _commit_loaded(db, db_state)
+    return db_state
+
+def unlock_location(db: Session, user_id: str, location: str):
+    """Append one location with a single INSERT; returns None if the state doesn't exist."""
+    db_state = get_exploration_state(db, user_id)
+    if db_state is None:
+        return None
+    _insert_ignore(db, models.UnlockedLocation, user_id=user_id, location=location, unlocked_at=datetime.utcnow())
+    _invalidate_dashboards(db, [user_id])
     db.commit()
+    db.refresh(db_state)
     return db_state
 
+def unlock_achievement(db: Session, user_id: str, achievement: str):
+    """Append one achievement with a single INSERT; returns None if the state doesn't exist."""
+    db_state = get_exploration_state(db, user_id)
+    if db_state is None:
+        return None
+    _insert_ignore(db, models.UnlockedAchievement, user_id=user_id, achievement=achievement, unlocked_at=datetime.utcnow())
+    _invalidate_dashboards(db, [user_id])
+    db.commit()
+    db.refresh(db_state)
+    return db_state
+
+def get_users_with_location(db: Session, location: str, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    query = db.query(models.UnlockedLocation.user_id).filter(models.UnlockedLocation.location == location)
+    return paginate(query, models.UnlockedLocation.user_id, skip, limit, cursor)
+
+def get_users_with_achievement(db: Session, achievement: str, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    query = db.query(models.UnlockedAchievement.user_id).filter(models.UnlockedAchievement.achievement == achievement)
+    return paginate(query, models.UnlockedAchievement.user_id, skip, limit, cursor)
+
 # --- ACHIEVEMENT CRUD ---
 def get_achievement(db: Session, achievement_id: str):
     return db.query(models.Achievement).filter(models.Achievement.id == achievement_id).first()
 
-def get_achievements(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Achievement).offset(skip).limit(limit).all()
+def get_achievements_by_ids(db: Session, ids: List[str]):
+    return _get_by_ids(db, models.Achievement, ids)
+
+def get_achievements(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, columns=None):
+    return paginate(db.query(*_entities(models.Achievement, columns)), models.Achievement.id, skip, limit, cursor)
 
 def create_achievement(db: Session, achievement: schemas.AchievementCreate):
     db_achievement = models.Achievement(**achievement.model_dump())
     db.add(db_achievement)
+    invalidate_on_commit(db, "achievements")
+    # Dashboards embed the definitions of unlocked achievements
+    _invalidate_dashboards(db)
     db.commit()
     db.refresh(db_achievement)
     return db_achievement
 
 def update_achievement(db: Session, achievement_id: str, achievement: schemas.AchievementUpdate):
-    db_achievement = get_achievement(db, achievement_id)
-    for field, value in achievement.model_dump(exclude_unset=True).items():
-        setattr(db_achievement, field, value)
-    db.commit()
-    db.refresh(db_achievement)
+    """Apply ``achievement``; returns None if it doesn't exist."""
+    values = _column_changes(models.Achievement, achievement)
+    if not values:
+        return get_achievement(db, achievement_id)
+    db_achievement = _update_returning(db, models.Achievement, models.Achievement.id, achievement_id, values)
+    if db_achievement is None:
+        return None
+    invalidate_on_commit(db, "achievement", achievement_id)
+    invalidate_on_commit(db, "achievements")
+    # Dashboards embed the definitions of unlocked achievements
+    _invalidate_dashboards(db)
+    _commit_loaded(db, db_achievement)
     return db_achievement
 
 def delete_achievement(db: Session, achievement_id: str):
-    db_achievement = get_achievement(db, achievement_id)
-    db.delete(db_achievement)
-    db.commit()
+    """Returns the deleted achievement, or None if it doesn't exist."""
+    db_achievement = _delete_returning(db, models.Achievement, models.Achievement.id, achievement_id)
+    if db_achievement is None:
+        return None
+    invalidate_on_commit(db, "achievement", achievement_id)
+    invalidate_on_commit(db, "achievements")
+    # Dashboards embed the definitions of unlocked achievements
+    _invalidate_dashboards(db)
+    _commit_loaded(db, db_achievement)
     return db_achievement
 
 # --- FOCUS SESSION CRUD ---
 def get_focus_session(db: Session, session_id: str):
     return db.query(models.FocusSession).filter(models.FocusSession.id == session_id).first()
 
-def get_focus_sessions(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.FocusSession).offset(skip).limit(limit).all()
+def get_focus_sessions_by_ids(db: Session, ids: List[str]):
+    return _get_by_ids(db, models.FocusSession, ids)
+
+def get_focus_sessions(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, columns=None):
+    return paginate(db.query(*_entities(models.FocusSession, columns)), models.FocusSession.id, skip, limit, cursor)
+
+FOCUS_SESSION_EXPORT_COLUMNS = ("id", "user_id", "goal_id", "method", "started_at", "duration")
+
+def focus_sessions_export_query(user_id: Optional[str] = None, goal_id: Optional[str] = None,
+                                method: Optional[str] = None, start: Optional[date] = None, end: Optional[date] = None):
+    """SELECT for ``export.stream_export``; ``start``/``end`` are inclusive days of ``started_at``."""
+    fs = models.FocusSession
+    query = select(*[getattr(fs, name) for name in FOCUS_SESSION_EXPORT_COLUMNS])
+    for column, value in ((fs.user_id, user_id), (fs.goal_id, goal_id), (fs.method, method)):
+        if value is not None:
+            query = query.where(column == value)
+    if start is not None:
+        query = query.where(fs.started_at >= datetime.combine(start, datetime.min.time()))
+    if end is not None:
+        query = query.where(fs.started_at < datetime.combine(end + timedelta(days=1), datetime.min.time()))
+    return query
+
+ROLLUP_FIELDS = ("user_id", "goal_id", "started_at", "method", "duration")
+
+def _rollup_values(db_session: models.FocusSession):
+    return {field: getattr(db_session, field) for field in ROLLUP_FIELDS}
+
+def _publish_focus_session_event(db: Session, event_type: str, db_session: models.FocusSession):
+    session = {field: getattr(db_session, field) for field in FOCUS_SESSION_EXPORT_COLUMNS}
+    session["started_at"] = session["started_at"].isoformat() if session["started_at"] else None
+    publish_on_commit(db, "user", db_session.user_id, event_type, user_id=db_session.user_id, session=session)
+
+def _upsert_rollups(db: Session, model, owner_column: str, deltas: dict):
+    rows = [
+        {owner_column: owner, "day": day, "method": method, "minutes": minutes, "sessions": sessions}
+        for (owner, day, method), (minutes, sessions) in deltas.items()
+        if minutes or sessions
+    ]
+    dialect_insert = _dialect_insert(db)
+    for start in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+        chunk = rows[start:start + BULK_INSERT_CHUNK_SIZE]
+        if dialect_insert is not None:
+            stmt = dialect_insert(model).values(chunk)
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=[owner_column, "day", "method"],
+                set_={"minutes": model.minutes + stmt.excluded.minutes, "sessions": model.sessions + stmt.excluded.sessions}
+            ))
+            continue
+        for row in chunk:
+            bucket = db.get(model, (row[owner_column], row["day"], row["method"]))
+            if bucket is None:
+                db.add(model(**row))
+            else:
+                bucket.minutes += row["minutes"]
+                bucket.sessions += row["sessions"]
+
+def _apply_focus_rollups(db: Session, added=(), removed=()):
+    """Fold sessions into the daily rollups (``removed`` ones are subtracted).
+
+    Deltas are summed per bucket first, so each touched bucket is one row of a
+    single multi-row upsert no matter how many sessions land in it.
+    """
+    user_deltas, goal_deltas = {}, {}
+    for values, sign in [(v, 1) for v in added] + [(v, -1) for v in removed]:
+        if values["started_at"] is None:
+            continue
+        bucket = (values["started_at"].date(), values["method"] or "")
+        for deltas, owner in ((user_deltas, values["user_id"]), (goal_deltas, values["goal_id"])):
+            if owner is None:
+                continue
+            totals = deltas.setdefault((owner, *bucket), [0, 0])
+            totals[0] += sign * (values["duration"] or 0)
+            totals[1] += sign
+    _upsert_rollups(db, models.FocusUserRollup, "user_id", user_deltas)
+    _upsert_rollups(db, models.FocusGoalRollup, "goal_id", goal_deltas)
+    minutes_by_user = {}
+    for (user_id, _, _), (minutes, _) in user_deltas.items():
+        minutes_by_user[user_id] = minutes_by_user.get(user_id, 0) + minutes
+    _adjust_group_focus_minutes(db, minutes_by_user)
+
+def _focus_stats(db: Session, model, owner_column, owner_id: str, group_by: str, start=None, end=None):
+    bucket_column = model.method if group_by == "method" else model.day
+    query = db.query(bucket_column, func.sum(model.minutes), func.sum(model.sessions)).filter(owner_column == owner_id)
+    if start is not None:
+        query = query.filter(model.day >= start)
+    if end is not None:
+        query = query.filter(model.day <= end)
+    rows = query.group_by(bucket_column).having(func.sum(model.sessions) > 0).order_by(bucket_column).all()
+    if group_by == "week":
+        weeks = {}
+        for day, minutes, sessions in rows:
+            totals = weeks.setdefault(day - timedelta(days=day.weekday()), [0, 0])
+            totals[0] += minutes
+            totals[1] += sessions
+        rows = [(week, minutes, sessions) for week, (minutes, sessions) in weeks.items()]
+    return [{"bucket": str(bucket), "minutes": minutes, "sessions": sessions} for bucket, minutes, sessions in rows]
+
+def get_user_focus_stats(db: Session, user_id: str, group_by: str = "day", start=None, end=None):
+    return _focus_stats(db, models.FocusUserRollup, models.FocusUserRollup.user_id, user_id, group_by, start, end)
+
+def get_goal_focus_stats(db: Session, goal_id: str, group_by: str = "day", start=None, end=None):
+    return _focus_stats(db, models.FocusGoalRollup, models.FocusGoalRollup.goal_id, goal_id, group_by, start, end)
 
 def create_focus_session(db: Session, session: schemas.FocusSessionCreate):
-    db_session = models.FocusSession(**session.model_dump())
+    db_session = models.FocusSession(id=str(uuid.uuid4()), **session.model_dump())
     db.add(db_session)
+    _apply_focus_rollups(db, added=[_rollup_values(db_session)])
+    _publish_focus_session_event(db, "focus_session.created", db_session)
+    _invalidate_dashboards(db, [db_session.user_id])
     db.commit()
     db.refresh(db_session)
     return db_session
 
+def _bulk_insert_ignore(db: Session, model, rows: List[dict], conflict_columns: List[str]):
+    """Multi-row INSERT skipping rows that hit ``conflict_columns``; returns the inserted ids."""
+    dialect_insert = _dialect_insert(db)
+    if dialect_insert is not None:
+        stmt = dialect_insert(model).values(rows).on_conflict_do_nothing(index_elements=conflict_columns)
+        return set(db.execute(stmt.returning(model.id)).scalars())
+    with db.begin_nested():
+        db.execute(insert(model), rows)
+    return {row["id"] for row in rows}
+
+def _focus_session_ids_by_key(db: Session, keys):
+    user_ids = {user_id for user_id, _ in keys}
+    idempotency_keys = {key for _, key in keys}
+    rows = db.query(models.FocusSession.id, models.FocusSession.user_id, models.FocusSession.idempotency_key).filter(
+        models.FocusSession.user_id.in_(user_ids),
+        models.FocusSession.idempotency_key.in_(idempotency_keys)
+    )
+    return {(row.user_id, row.idempotency_key): row.id for row in rows if (row.user_id, row.idempotency_key) in keys}
+
+def create_focus_sessions_bulk(db: Session, sessions: List[schemas.FocusSessionBulkItem]):
+    """Insert many sessions in one transaction using multi-row INSERTs.
+
+    Returns one ``(status, id, errors)`` tuple per input, in order. A session whose
+    ``(user_id, idempotency_key)`` already exists, in the table or earlier in the
+    batch, is reported as a duplicate of that row instead of being inserted again.
+    """
+    results = [None] * len(sessions)
+    user_ids = {s.user_id for s in sessions}
+    goal_ids = {s.goal_id for s in sessions if s.goal_id}
+    known_users = set(db.scalars(select(models.User.id).where(models.User.id.in_(user_ids)))) if user_ids else set()
+    known_goals = set(db.scalars(select(models.Goal.id).where(models.Goal.id.in_(goal_ids)))) if goal_ids else set()
+    keys = {(s.user_id, s.idempotency_key) for s in sessions if s.idempotency_key is not None}
+    existing = _focus_session_ids_by_key(db, keys) if keys else {}
+
+    pending, repeats, batch_keys = [], [], set()
+    for index, session in enumerate(sessions):
+        key = (session.user_id, session.idempotency_key)
+        if session.user_id not in known_users:
+            results[index] = ("error", None, ["Unknown user_id"])
+        elif session.goal_id and session.goal_id not in known_goals:
+            results[index] = ("error", None, ["Unknown goal_id"])
+        elif session.idempotency_key is not None and key in existing:
+            results[index] = ("duplicate", existing[key], None)
+        elif session.idempotency_key is not None and key in batch_keys:
+            repeats.append((index, key))
+        else:
+            if session.idempotency_key is not None:
+                batch_keys.add(key)
+            pending.append((index, {"id": str(uuid.uuid4()), **session.model_dump()}))
+
+    inserted = set()
+    for start in range(0, len(pending), BULK_INSERT_CHUNK_SIZE):
+        chunk = [row for _, row in pending[start:start + BULK_INSERT_CHUNK_SIZE]]
+        inserted |= _bulk_insert_ignore(db, models.FocusSession, chunk, ["user_id", "idempotency_key"])
+    created = [row for _, row in pending if row["id"] in inserted]
+    _apply_focus_rollups(db, added=created)
+    # One summary per user rather than an event per session
+    per_user = {}
+    for row in created:
+        count, minutes = per_user.get(row["user_id"], (0, 0))
+        per_user[row["user_id"]] = (count + 1, minutes + (row["duration"] or 0))
+    for user_id, (count, minutes) in per_user.items():
+        publish_on_commit(db, "user", user_id, "focus_session.bulk", user_id=user_id, sessions=count, minutes=minutes)
+    _invalidate_dashboards(db, per_user)
+    db.commit()
+
+    # Rows skipped by ON CONFLICT lost a race with a concurrent upload of the same key
+    lost = {(row["user_id"], row["idempotency_key"]) for _, row in pending if row["id"] not in inserted}
+    final_ids = _focus_session_ids_by_key(db, lost) if lost else {}
+    for index, row in pending:
+        key = (row["user_id"], row["idempotency_key"])
+        if row["id"] in inserted:
+            results[index] = ("created", row["id"], None)
+            final_ids.setdefault(key, row["id"])
+        else:
+            results[index] = ("duplicate", final_ids.get(key), None)
+    for index, key in repeats:
+        results[index] = ("duplicate", final_ids.get(key), None)
+    return results
+
 def update_focus_session(db: Session, session_id: str, session: schemas.FocusSessionUpdate):
+    """Apply ``session``; returns None if it doesn't exist."""
+    # Every updatable field feeds the rollups, which need the stored values
     db_session = get_focus_session(db, session_id)
+    if db_session is None:
+        return None
+    before = _rollup_values(db_session)
     for field, value in session.model_dump(exclude_unset=True).items():
         setattr(db_session, field, value)
-    db.commit()
-    db.refresh(db_session)
+    _apply_focus_rollups(db, added=[_rollup_values(db_session)], removed=[before])
+    _publish_focus_session_event(db, "focus_session.updated", db_session)
+    _invalidate_dashboards(db, {before["user_id"], db_session.user_id})
+    _commit_loaded(db, db_session)
     return db_session
 
 def delete_focus_session(db: Session, session_id: str):
-    db_session = get_focus_session(db, session_id)
-    db.delete(db_session)
-    db.commit()
+    """Returns the deleted session, or None if it doesn't exist."""
+    db_session = _delete_returning(db, models.FocusSession, models.FocusSession.id, session_id)
+    if db_session is None:
+        return None
+    _apply_focus_rollups(db, removed=[_rollup_values(db_session)])
+    _publish_focus_session_event(db, "focus_session.deleted", db_session)
+    _invalidate_dashboards(db, [db_session.user_id])
+    _commit_loaded(db, db_session)
     return db_session
+
+# --- DASHBOARD ---
+ACTIVE_GOAL_STATUS = "active"
+DASHBOARD_RECENT_SESSIONS = 10
+
+def get_dashboard(db: Session, user_id: str, group_id: Optional[str] = None):
+    """The sections of ``schemas.Dashboard`` but the user, with one query per table.
+
+    The user comes from authentication; everything else is read here in one
+    session, with collections batch-loaded instead of lazily per row.
+    """
+    goals, sessions = models.Goal, models.FocusSession
+    exploration = get_exploration_state(db, user_id)
+    codes = exploration.achievements if exploration is not None else []
+    achievements = []
+    if codes:
+        achievements = db.query(models.Achievement).filter(models.Achievement.code.in_(codes)).order_by(models.Achievement.code).all()
+    return {
+        "group": get_group(db, group_id) if group_id else None,
+        "active_goals": db.query(goals)
+        .filter(goals.creator_id == user_id, goals.status == ACTIVE_GOAL_STATUS)
+        .order_by(goals.created_at.desc(), goals.id)
+        .all(),
+        "recent_sessions": db.query(sessions)
+        .filter(sessions.user_id == user_id)
+        .order_by(sessions.started_at.desc(), sessions.id)
+        .limit(DASHBOARD_RECENT_SESSIONS)
+        .all(),
+        "exploration": exploration,
+        "achievements": achievements,
+    }
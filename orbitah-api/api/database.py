@@ -1,31 +1,210 @@
+import asyncio
+import logging
 import os
-
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
+import threading
+import time
 
 from sqlalchemy import create_engine
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.ext.asyncio import (AsyncEngine, AsyncSession,
+                                    async_sessionmaker, create_async_engine)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.concurrency import run_in_threadpool
+
+from .metrics import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
 
 # Read DB URL from environment variable, fallback to SQLite for dev
 SQLALCHEMY_DATABASE_URL = os.environ.get("SQLALCHEMY_DATABASE_URL", "sqlite:///./test.db")
 
-# Set connect_args only for SQLite (not needed for PostgreSQL)
-if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(
-        SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+# Opt-in async mode: requests get an AsyncSession instead of a threadpool-bound Session
+ASYNC_DB_ENABLED = os.environ.get("ASYNC_DB_ENABLED", "false").lower() in ("1", "true", "yes")
+
+def to_async_url(url: str) -> str:
+    """Map a sync driver URL onto its asyncio driver (aiosqlite / asyncpg)."""
+    if url.startswith("sqlite"):
+        return "sqlite+aiosqlite" + url[url.index(":"):]
+    if url.startswith("postgresql"):
+        return "postgresql+asyncpg" + url[url.index(":"):]
+    return url
+
+ASYNC_SQLALCHEMY_DATABASE_URL = os.environ.get(
+    "ASYNC_SQLALCHEMY_DATABASE_URL", to_async_url(SQLALCHEMY_DATABASE_URL)
+)
+
+# Connection pool tuning, all overridable from the environment
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "30"))
+# Recycle before typical server/proxy idle timeouts so failovers don't leave stale sockets
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+# Seconds between periodic pool usage samples; 0 disables the reporter
+DB_POOL_METRICS_INTERVAL = float(os.environ.get("DB_POOL_METRICS_INTERVAL", "60"))
+
+POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds", "Time spent waiting for a pooled connection"
+)
+POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT"
+)
+POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections currently checked out")
+POOL_OVERFLOW = Gauge("db_pool_overflow", "Connections open beyond DB_POOL_SIZE")
+
+class _InstrumentedPoolMixin:
+    """Times every checkout so queueing behind the pool shows up in metrics."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except sa_exc.TimeoutError:
+            POOL_CHECKOUT_TIMEOUTS.inc(pool=self.metrics_name)
+            raise
+        finally:
+            POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start, pool=self.metrics_name)
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    metrics_name = "sync"
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    metrics_name = "async"
+
+def pool_options(poolclass):
+    return {
+        "poolclass": poolclass,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+# Engines are created on first use: importing the app (workers, tests, alembic, CLI tools)
+# neither imports a database driver nor builds a pool until something needs a connection
+_engines = {}
+_engines_lock = threading.Lock()
+
+def lazy_engine(name: str, create):
+    """The engine registered as ``name``, built by ``create()`` on first use."""
+    engine = _engines.get(name)
+    if engine is None:
+        with _engines_lock:
+            engine = _engines.get(name)
+            if engine is None:
+                engine = _engines[name] = create()
+    return engine
+
+def get_engine():
+    """The app's sync engine."""
+    def create():
+        # Set connect_args only for SQLite (not needed for PostgreSQL)
+        if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
+            return create_engine(
+                SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False},
+                **pool_options(InstrumentedQueuePool)
+            )
+        return create_engine(SQLALCHEMY_DATABASE_URL, **pool_options(InstrumentedQueuePool))
+    return lazy_engine("sync", create)
+
+def get_async_engine():
+    """The app's async engine (``ASYNC_DB_ENABLED``)."""
+    return lazy_engine("async", lambda: create_async_engine(
+        ASYNC_SQLALCHEMY_DATABASE_URL, **pool_options(InstrumentedAsyncQueuePool)
+    ))
+
+async def dispose_engines():
+    """Close the pools of every engine created so far; the next use creates fresh ones."""
+    with _engines_lock:
+        engines = list(_engines.values())
+        _engines.clear()
+    for engine in engines:
+        if isinstance(engine, AsyncEngine):
+            await engine.dispose()
+        else:
+            await run_in_threadpool(engine.dispose)
+
+class _LazyBind:
+    """Session factory mixin that binds to ``get_bind()`` when the first session is made."""
+
+    def __init__(self, get_bind, **kw):
+        super().__init__(**kw)
+        self._get_bind = get_bind
+
+    def __call__(self, **local_kw):
+        if "bind" not in local_kw:
+            local_kw["bind"] = self._get_bind()
+        return super().__call__(**local_kw)
+
+class LazySessionmaker(_LazyBind, sessionmaker):
+    pass
+
+class LazyAsyncSessionmaker(_LazyBind, async_sessionmaker):
+    pass
+
+SessionLocal = LazySessionmaker(get_engine, autocommit=False, autoflush=False)
+Base = declarative_base()
+
+if ASYNC_DB_ENABLED:
+    # Objects outlive the commit so responses can be serialized without a reload
+    AsyncSessionLocal = LazyAsyncSessionmaker(
+        get_async_engine, autoflush=False, expire_on_commit=False
     )
+
+    async def get_db():
+        async with AsyncSessionLocal() as db:
+            yield db
 else:
-    engine = create_engine(SQLALCHEMY_DATABASE_URL)
+    AsyncSessionLocal = None
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+async def run_db(db, fn, *args, **kwargs):
+    """Run a sync ``fn(session, ...)`` without blocking the event loop.
+
+    AsyncSessions run it in their greenlet, plain Sessions in the threadpool.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+def pool_status(pool) -> dict:
+    """Point-in-time usage of a connection pool."""
+    status = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=DB_MAX_OVERFLOW,
+            timeout=DB_POOL_TIMEOUT,
+            recycle=DB_POOL_RECYCLE,
+            pre_ping=DB_POOL_PRE_PING,
+        )
+    return status
+
+def pool_statuses() -> dict:
+    """Usage of the pools created so far (none before the first connection)."""
+    return {
+        name: pool_status(engine.sync_engine.pool if isinstance(engine, AsyncEngine) else engine.pool)
+        for name, engine in list(_engines.items())
+    }
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+async def report_pool_metrics(interval: float = DB_POOL_METRICS_INTERVAL):
+    """Sample pool usage into gauges and the log every ``interval`` seconds."""
+    while True:
+        for name, status in pool_statuses().items():
+            if "checked_out" in status:
+                POOL_CHECKED_OUT.set(status["checked_out"], pool=name)
+                POOL_OVERFLOW.set(status["overflow"], pool=name)
+            logger.info("db pool %s: %s", name, status)
+        await asyncio.sleep(interval)
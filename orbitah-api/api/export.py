@@ -0,0 +1,78 @@
+import csv
+import io
+import json
+import os
+from datetime import date, datetime
+from typing import AsyncIterator, Sequence
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+# Rows fetched per round trip and written per response chunk
+EXPORT_BATCH_SIZE = int(os.environ.get("EXPORT_BATCH_SIZE", "2000"))
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+def encode_ndjson(columns: Sequence[str], rows) -> bytes:
+    return "".join(
+        json.dumps(dict(zip(columns, map(_plain, row))), separators=(",", ":")) + "\n" for row in rows
+    ).encode()
+
+def encode_csv(columns: Sequence[str], rows) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([_plain(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+ENCODERS = {"ndjson": encode_ndjson, "csv": encode_csv}
+
+
+async def iter_partitions(db, statement, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[list]:
+    """Yield the rows of ``statement`` ``batch_size`` at a time from a server-side cursor.
+
+    ``yield_per`` makes psycopg2/asyncpg use a named cursor instead of
+    buffering the whole result client-side; SQLite cursors are lazy anyway.
+    """
+    statement = statement.execution_options(yield_per=batch_size)
+    if isinstance(db, AsyncSession):
+        result = await db.stream(statement)
+        try:
+            async for partition in result.partitions():
+                yield partition
+        finally:
+            await result.close()
+        return
+    result = await run_in_threadpool(db.execute, statement)
+    try:
+        while partition := await run_in_threadpool(result.fetchmany, batch_size):
+            yield partition
+    finally:
+        result.close()
+
+
+def stream_export(db, statement, fmt: str, filename: str) -> StreamingResponse:
+    """Stream ``statement`` as NDJSON (one object per line) or CSV with a header row.
+
+    Rows are plain tuples encoded one partition at a time, so memory stays
+    flat whatever the result size. The session must stay open until the body
+    is sent, which request-scoped ``get_db`` dependencies guarantee.
+    """
+    columns = list(statement.selected_columns.keys())
+    encode = ENCODERS[fmt]
+
+    async def body():
+        if fmt == "csv":
+            yield encode_csv(columns, [columns])
+        async for partition in iter_partitions(db, statement):
+            yield encode(columns, partition)
+
+    return StreamingResponse(
+        body(),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'}
+    )
@@ -0,0 +1,271 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+# Events buffered per subscriber; a subscriber that falls this far behind is disconnected
+GROUP_FEED_QUEUE_SIZE = int(os.environ.get("GROUP_FEED_QUEUE_SIZE", "256"))
+# Seconds between SSE keep-alive comments on an idle stream
+GROUP_FEED_KEEPALIVE = float(os.environ.get("GROUP_FEED_KEEPALIVE", "15"))
+# Optional pub/sub so events reach subscribers on every worker (requires the `redis` package)
+GROUP_FEED_REDIS_URL = os.environ.get("GROUP_FEED_REDIS_URL")
+
+FEED_EVENTS = Counter("group_feed_events_total", "Events published to the group feed by type")
+FEED_DELIVERIES = Counter("group_feed_deliveries_total", "Events queued for local subscribers")
+FEED_OVERFLOWS = Counter("group_feed_overflows_total", "Subscribers disconnected for falling behind")
+FEED_SUBSCRIBERS = Gauge("group_feed_subscribers", "Open feed connections on this worker")
+
+# Session.info key holding events that wait for the transaction to commit
+_PENDING = "group_feed_events"
+
+
+class Subscription:
+    """One feed connection: a bounded queue filled from any thread, drained on its event loop.
+
+    Writers never wait for readers. When the queue is full the subscription
+    is closed instead (``get`` returns None); the client reconnects and
+    re-reads the group state.
+    """
+
+    def __init__(self, feed: "GroupFeed", group_id: str, loop: asyncio.AbstractEventLoop, max_size: int):
+        self.feed = feed
+        self.group_id = group_id
+        self.loop = loop
+        self.overflowed = False
+        self._queue = asyncio.Queue(max_size)
+
+    def _push(self, event):
+        if self.overflowed:
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            FEED_OVERFLOWS.inc()
+            # Make room for the end-of-stream marker
+            self._queue.get_nowait()
+            self._queue.put_nowait(None)
+
+    def put(self, event: dict):
+        """Thread-safe enqueue."""
+        try:
+            self.loop.call_soon_threadsafe(self._push, event)
+        except RuntimeError:
+            # The connection's loop is gone; it unsubscribes on its way out
+            pass
+
+    async def get(self) -> Optional[dict]:
+        return await self._queue.get()
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    def close(self):
+        self.feed.unsubscribe(self)
+
+
+class LocalBroker:
+    """Delivers straight to this process's subscribers (tests, single worker)."""
+
+    def __init__(self, deliver):
+        self._deliver = deliver
+
+    def publish(self, scope: str, key: str, payload: dict):
+        self._deliver(scope, key, payload)
+
+    def start(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class RedisBroker:
+    """Redis pub/sub fan-out: every worker receives every event and delivers it locally."""
+
+    def __init__(self, url: str, deliver, prefix: str = "group-feed:"):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self._deliver = deliver
+        self._prefix = prefix
+        self._thread = None
+
+    def publish(self, scope: str, key: str, payload: dict):
+        self._client.publish(f"{self._prefix}{scope}:{key}", json.dumps(payload))
+
+    def _on_message(self, message):
+        scope, key = message["channel"].decode()[len(self._prefix):].split(":", 1)
+        self._deliver(scope, key, json.loads(message["data"]))
+
+    def start(self):
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(**{self._prefix + "*": self._on_message})
+        self._thread = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+    def close(self):
+        if self._thread is not None:
+            self._thread.stop()
+            self._thread = None
+
+
+class GroupFeed:
+    """Per-group activity streams fed by crud write paths.
+
+    Events are published either to a group (goal changes) or to a user (focus
+    sessions, XP). User events reach the groups the user belonged to when
+    each local subscriber connected, so the write path never has to look up
+    memberships.
+    """
+
+    def __init__(self, redis_url: Optional[str] = None, queue_size: int = GROUP_FEED_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.broker = RedisBroker(redis_url, self._deliver) if redis_url else LocalBroker(self._deliver)
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._members: Dict[str, Set[str]] = {}
+        self._groups_by_user: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, scope: str, key: str, payload: dict):
+        """Publish ``payload`` to group ``key`` (scope "group") or user ``key`` (scope "user")."""
+        FEED_EVENTS.inc(type=payload["type"])
+        try:
+            self.broker.publish(scope, key, payload)
+        except Exception:
+            # The write already committed; a lost event only costs a stale view
+            logger.exception("could not publish %s event", payload["type"])
+
+    def _deliver(self, scope: str, key: str, payload: dict):
+        with self._lock:
+            group_ids = [key] if scope == "group" else list(self._groups_by_user.get(key, ()))
+            targets = [(group_id, list(self._subscribers.get(group_id, ()))) for group_id in group_ids]
+        for group_id, subscribers in targets:
+            event = {**payload, "group_id": group_id}
+            for subscription in subscribers:
+                subscription.put(event)
+            FEED_DELIVERIES.inc(len(subscribers))
+
+    def subscribe(self, group_id: str, member_ids: Iterable[str]) -> Subscription:
+        """Subscribe the running event loop to ``group_id``; close the subscription when done."""
+        subscription = Subscription(self, group_id, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(group_id, set()).add(subscription)
+            members = self._members.setdefault(group_id, set())
+            members.update(member_ids)
+            for user_id in members:
+                self._groups_by_user.setdefault(user_id, set()).add(group_id)
+        FEED_SUBSCRIBERS.inc()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        group_id = subscription.group_id
+        with self._lock:
+            subscribers = self._subscribers.get(group_id)
+            if subscribers is None or subscription not in subscribers:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[group_id]
+                for user_id in self._members.pop(group_id, ()):
+                    groups = self._groups_by_user[user_id]
+                    groups.discard(group_id)
+                    if not groups:
+                        del self._groups_by_user[user_id]
+        FEED_SUBSCRIBERS.inc(-1)
+
+    def start(self):
+        self.broker.start()
+
+    def close(self):
+        self.broker.close()
+
+    def clear(self):
+        with self._lock:
+            self._subscribers.clear()
+            self._members.clear()
+            self._groups_by_user.clear()
+        FEED_SUBSCRIBERS.set(0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            groups = len(self._subscribers)
+            backlog = [subscription.qsize() for subscribers in self._subscribers.values() for subscription in subscribers]
+        return {
+            "backend": type(self.broker).__name__,
+            "groups": groups,
+            "subscribers": len(backlog),
+            "max_backlog": max(backlog, default=0),
+            "queue_size": self.queue_size,
+            "events": FEED_EVENTS.snapshot(),
+            "deliveries": FEED_DELIVERIES.value(),
+            "overflows": FEED_OVERFLOWS.value(),
+        }
+
+
+group_feed = GroupFeed(GROUP_FEED_REDIS_URL)
+
+
+def publish_on_commit(db: Session, scope: str, key: str, event_type: str, **data):
+    """Publish once ``db`` commits; dropped if the transaction rolls back."""
+    payload = {"type": event_type, "at": datetime.now(timezone.utc).isoformat(), **data}
+    db.info.setdefault(_PENDING, []).append((scope, key, payload))
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session):
+    for scope, key, payload in session.info.pop(_PENDING, ()):
+        group_feed.publish(scope, key, payload)
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_pending(session, previous_transaction):
+    # Only the outermost transaction; a released savepoint keeps the events it covered
+    if previous_transaction.parent is None:
+        session.info.pop(_PENDING, None)
+
+
+async def sse_events(subscription: Subscription, keepalive: float = GROUP_FEED_KEEPALIVE):
+    """Server-Sent Events framing of a subscription; ends after an overflow."""
+    try:
+        yield ": connected\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), keepalive)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if event is None:
+                yield "event: overflow\ndata: {}\n\n"
+                return
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    finally:
+        subscription.close()
+
+
+async def websocket_events(websocket, subscription: Subscription):
+    """Forward events as JSON messages until the client leaves; closes with 1013 after an overflow."""
+    async def forward():
+        while (event := await subscription.get()) is not None:
+            await websocket.send_json(event)
+
+    async def until_disconnect():
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    sender, receiver = asyncio.create_task(forward()), asyncio.create_task(until_disconnect())
+    try:
+        done, _ = await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+        if receiver not in done and sender.exception() is None:
+            await websocket.close(code=1013)
+    finally:
+        sender.cancel()
+        receiver.cancel()
+        subscription.close()
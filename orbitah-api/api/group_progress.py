@@ -0,0 +1,42 @@
+import asyncio
+import logging
+import os
+
+from . import crud
+from .database import SessionLocal
+from .metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+# Seconds between reconciliation passes over all groups (0 disables)
+GROUP_RECONCILE_INTERVAL = float(os.environ.get("GROUP_RECONCILE_INTERVAL", "3600"))
+# Groups recomputed per transaction
+GROUP_RECONCILE_BATCH_SIZE = int(os.environ.get("GROUP_RECONCILE_BATCH_SIZE", "100"))
+
+GROUP_PROGRESS_DRIFT = Counter("group_progress_drift_total", "Groups whose progress counters reconciliation repaired")
+
+
+def reconcile_all_groups(batch_size: int = GROUP_RECONCILE_BATCH_SIZE) -> int:
+    """One pass over every group in id order; returns the number of groups repaired."""
+    repaired = 0
+    after = None
+    with SessionLocal() as db:
+        while True:
+            group_ids = crud.get_group_ids(db, after=after, limit=batch_size)
+            if not group_ids:
+                break
+            drifted = crud.reconcile_group_progress(db, group_ids)
+            if drifted:
+                logger.warning("repaired drifted progress counters of groups %s", drifted)
+                GROUP_PROGRESS_DRIFT.inc(len(drifted))
+            repaired += len(drifted)
+            after = group_ids[-1]
+    return repaired
+
+async def run_group_reconciler(interval: float = GROUP_RECONCILE_INTERVAL):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(reconcile_all_groups)
+        except Exception:
+            logger.exception("group progress reconciliation failed")
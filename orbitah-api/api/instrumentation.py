@@ -0,0 +1,186 @@
+import functools
+import inspect
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from . import query_log
+from .metrics import Histogram
+
+# Adds a Server-Timing header with the per-phase breakdown (visible in browser devtools)
+SERVER_TIMING_ENABLED = os.environ.get("SERVER_TIMING_ENABLED", "false").lower() in ("1", "true", "yes")
+
+PHASES = ("sql", "bcrypt", "jwt", "serialize")
+# Label for requests that matched no route, so scanners can't blow up label cardinality
+UNMATCHED_ROUTE = "<unmatched>"
+
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "Wall time per request by route, method and status")
+PHASE_SECONDS = Histogram(
+    "http_request_phase_seconds", "Time per request spent in SQL, bcrypt, JWT and response serialization"
+)
+SQL_STATEMENTS = Histogram(
+    "http_request_sql_statements", "SQL statements executed per request",
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250, 1000)
+)
+
+
+class RequestTimings:
+    """Time accumulated by one request, filled in from the handler, threadpool and greenlets."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations = dict.fromkeys(PHASES, 0.0)
+        self.sql_statements = 0
+        self.endpoint_finished = None
+
+    def add(self, phase: str, seconds: float):
+        self.durations[phase] += seconds
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        parts = [f"app;dur={self.elapsed() * 1000:.2f}"]
+        for phase, seconds in self.durations.items():
+            part = f"{phase};dur={seconds * 1000:.2f}"
+            if phase == "sql":
+                part += f';desc="statements={self.sql_statements}"'
+            parts.append(part)
+        return ", ".join(parts)
+
+    def observe(self, route: str, method: str, status: int):
+        REQUEST_SECONDS.observe(self.elapsed(), route=route, method=method, status=str(status))
+        for phase, seconds in self.durations.items():
+            PHASE_SECONDS.observe(seconds, route=route, phase=phase)
+        SQL_STATEMENTS.observe(self.sql_statements, route=route)
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current.get()
+
+@contextmanager
+def timed(phase: str):
+    """Charge the enclosed block to ``phase`` of the current request (no-op outside one)."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, time.perf_counter() - start)
+
+
+# Engine-class listeners cover the sync engine, the async engine's sync core and test engines alike
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("request_query_start", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timings = _current.get()
+    starts = conn.info.get("request_query_start")
+    if timings is None or not starts:
+        return
+    timings.add("sql", time.perf_counter() - starts.pop())
+    timings.sql_statements += 1
+
+
+def _mark_endpoint_finished(endpoint):
+    """Wrap an endpoint so the route handler knows when serialization starts."""
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                timings = _current.get()
+                if timings is not None:
+                    timings.endpoint_finished = time.perf_counter()
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                timings = _current.get()
+                if timings is not None:
+                    timings.endpoint_finished = time.perf_counter()
+    return wrapper
+
+
+class InstrumentedRoute(APIRoute):
+    """APIRoute that charges response validation and encoding to the "serialize" phase.
+
+    Everything FastAPI does between the endpoint returning and the response
+    object being ready is serialization of the endpoint's return value.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _mark_endpoint_finished(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def instrumented_handler(request):
+            response = await handler(request)
+            timings = _current.get()
+            if timings is not None and timings.endpoint_finished is not None:
+                timings.add("serialize", time.perf_counter() - timings.endpoint_finished)
+                timings.endpoint_finished = None
+            return response
+
+        return instrumented_handler
+
+
+def route_label(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class InstrumentationMiddleware:
+    """Records wall time and the per-phase breakdown of every HTTP request.
+
+    Pure ASGI so it neither buffers streaming responses nor breaks the
+    context the phase timers write to.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timings = RequestTimings()
+        token = _current.set(timings)
+        queries_token = query_log.start_request(scope)
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if SERVER_TIMING_ENABLED:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", timings.server_timing().encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            query_log.end_request(queries_token)
+            _current.reset(token)
+            timings.observe(route_label(scope), scope["method"], status)
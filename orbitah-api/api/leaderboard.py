@@ -0,0 +1,280 @@
+import bisect
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Optional shared backend so every worker ranks against the same boards (requires the `redis` package)
+LEADERBOARD_REDIS_URL = os.environ.get("LEADERBOARD_REDIS_URL")
+
+METRICS = ("xp", "streak")
+# XP earned in the current UTC day / ISO week; boards are kept for one extra window
+WINDOWS = {
+    "day": (lambda now: now.strftime("%Y-%m-%d"), 2 * 86400),
+    "week": (lambda now: "%d-W%02d" % now.isocalendar()[:2], 14 * 86400),
+}
+
+
+class SortedBoard:
+    """Scores kept in a list sorted by (-score, member), plus a member -> score map.
+
+    ``rank`` and ``score`` are O(log n) / O(1); writes are a bisect plus a list
+    insert/delete (a memmove), which stays cheap well past a million members.
+    Ties share a rank ("1224" ranking).
+    """
+
+    def __init__(self):
+        self._scores: Dict[str, int] = {}
+        self._order: List[Tuple[int, str]] = []
+
+    def set(self, member: str, score: int):
+        old = self._scores.get(member)
+        if old == score:
+            return
+        if old is not None:
+            del self._order[bisect.bisect_left(self._order, (-old, member))]
+        self._scores[member] = score
+        bisect.insort(self._order, (-score, member))
+
+    def incr(self, member: str, amount: int) -> int:
+        score = self._scores.get(member, 0) + amount
+        self.set(member, score)
+        return score
+
+    def remove(self, member: str):
+        old = self._scores.pop(member, None)
+        if old is not None:
+            del self._order[bisect.bisect_left(self._order, (-old, member))]
+
+    def score(self, member: str) -> Optional[int]:
+        return self._scores.get(member)
+
+    def rank(self, member: str) -> Optional[int]:
+        score = self._scores.get(member)
+        if score is None:
+            return None
+        return bisect.bisect_left(self._order, (-score,)) + 1
+
+    def top(self, n: int) -> List[Tuple[str, int]]:
+        return [(member, -negated) for negated, member in self._order[:n]]
+
+    def __len__(self):
+        return len(self._scores)
+
+
+class InMemoryBackend:
+    """Process-local boards (tests, single worker)."""
+
+    def __init__(self):
+        self._boards: Dict[str, SortedBoard] = {}
+        self._expires: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _board(self, name: str) -> SortedBoard:
+        expires_at = self._expires.get(name)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._boards.pop(name, None)
+            self._expires.pop(name, None)
+        return self._boards.setdefault(name, SortedBoard())
+
+    def set(self, name: str, member: str, score: int):
+        with self._lock:
+            self._board(name).set(member, score)
+
+    def incr(self, name: str, member: str, amount: int, ttl: Optional[float] = None):
+        with self._lock:
+            self._board(name).incr(member, amount)
+            if ttl is not None:
+                self._expires.setdefault(name, time.monotonic() + ttl)
+
+    def remove(self, name: str, member: str):
+        with self._lock:
+            self._board(name).remove(member)
+
+    def replace(self, name: str, entries: Iterable[Tuple[str, int]]):
+        board = SortedBoard()
+        for member, score in entries:
+            board.set(member, score)
+        with self._lock:
+            self._boards[name] = board
+            self._expires.pop(name, None)
+
+    def score(self, name: str, member: str) -> Optional[int]:
+        with self._lock:
+            return self._board(name).score(member)
+
+    def scores(self, name: str, members: Iterable[str]) -> Dict[str, int]:
+        with self._lock:
+            board = self._board(name)
+            return {m: s for m in members if (s := board.score(m)) is not None}
+
+    def rank(self, name: str, member: str) -> Optional[int]:
+        with self._lock:
+            return self._board(name).rank(member)
+
+    def top(self, name: str, n: int) -> List[Tuple[str, int]]:
+        with self._lock:
+            return self._board(name).top(n)
+
+    def size(self, name: str) -> int:
+        with self._lock:
+            return len(self._board(name))
+
+    def clear(self):
+        with self._lock:
+            self._boards.clear()
+            self._expires.clear()
+
+
+class RedisBackend:
+    """Boards as Redis sorted sets."""
+
+    def __init__(self, url: str, prefix: str = "leaderboard:"):
+        import redis
+
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+        self._prefix = prefix
+
+    def _key(self, name: str) -> str:
+        return self._prefix + name
+
+    def set(self, name: str, member: str, score: int):
+        self._client.zadd(self._key(name), {member: score})
+
+    def incr(self, name: str, member: str, amount: int, ttl: Optional[float] = None):
+        pipe = self._client.pipeline()
+        pipe.zincrby(self._key(name), amount, member)
+        if ttl is not None:
+            pipe.expire(self._key(name), int(ttl))
+        pipe.execute()
+
+    def remove(self, name: str, member: str):
+        self._client.zrem(self._key(name), member)
+
+    def replace(self, name: str, entries: Iterable[Tuple[str, int]]):
+        staging = self._key(name) + ":rebuild"
+        pipe = self._client.pipeline()
+        pipe.delete(staging)
+        batch, total = {}, 0
+        for member, score in entries:
+            batch[member] = score
+            total += 1
+            if len(batch) >= 10000:
+                pipe.zadd(staging, batch)
+                batch = {}
+        if batch:
+            pipe.zadd(staging, batch)
+        # Swap the rebuilt set in at once so readers never see a half-filled board
+        if total:
+            pipe.rename(staging, self._key(name))
+        else:
+            pipe.delete(self._key(name))
+        pipe.execute()
+
+    def score(self, name: str, member: str) -> Optional[int]:
+        score = self._client.zscore(self._key(name), member)
+        return None if score is None else int(score)
+
+    def scores(self, name: str, members: Iterable[str]) -> Dict[str, int]:
+        members = list(members)
+        if not members:
+            return {}
+        values = self._client.zmscore(self._key(name), members)
+        return {m: int(s) for m, s in zip(members, values) if s is not None}
+
+    def rank(self, name: str, member: str) -> Optional[int]:
+        score = self._client.zscore(self._key(name), member)
+        if score is None:
+            return None
+        # Members strictly ahead, so ties share a rank like SortedBoard
+        return self._client.zcount(self._key(name), f"({score}", "+inf") + 1
+
+    def top(self, name: str, n: int) -> List[Tuple[str, int]]:
+        return [(m, int(s)) for m, s in self._client.zrevrange(self._key(name), 0, n - 1, withscores=True)]
+
+    def size(self, name: str) -> int:
+        return self._client.zcard(self._key(name))
+
+    def clear(self):
+        for key in self._client.scan_iter(match=self._prefix + "*"):
+            self._client.delete(key)
+
+
+class Leaderboard:
+    """Global XP and streak boards plus XP-earned boards per UTC day and ISO week.
+
+    Global boards are rebuilt from the users table on startup and then updated
+    incrementally by crud; windowed boards only see XP earned while running
+    (or whatever a shared backend still holds).
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend if backend is not None else InMemoryBackend()
+
+    @staticmethod
+    def board_name(metric: str, window: Optional[str] = None, now: Optional[datetime] = None) -> str:
+        if window is None:
+            return metric
+        period, _ = WINDOWS[window]
+        return f"{metric}:{window}:{period(now or datetime.now(timezone.utc))}"
+
+    def record_user(self, user_id: str, experience_points: Optional[int], streak_days: Optional[int]):
+        """Sync a user's global scores; the time windows only count awards."""
+        self.backend.set("xp", user_id, experience_points or 0)
+        self.backend.set("streak", user_id, streak_days or 0)
+
+    def award_xp(self, user_id: str, amount: int):
+        self.backend.incr("xp", user_id, amount)
+        if amount > 0:
+            self._record_window_xp(user_id, amount)
+
+    def _record_window_xp(self, user_id: str, amount: int):
+        now = datetime.now(timezone.utc)
+        for window, (_, ttl) in WINDOWS.items():
+            self.backend.incr(self.board_name("xp", window, now), user_id, amount, ttl=ttl)
+
+    def remove_user(self, user_id: str):
+        for metric in METRICS:
+            self.backend.remove(metric, user_id)
+        now = datetime.now(timezone.utc)
+        for window in WINDOWS:
+            self.backend.remove(self.board_name("xp", window, now), user_id)
+
+    def rebuild(self, rows: Iterable[Tuple[str, Optional[int], Optional[int]]]):
+        """Replace the global boards from ``(user_id, experience_points, streak_days)`` rows."""
+        rows = list(rows)
+        self.backend.replace("xp", ((user_id, xp or 0) for user_id, xp, _ in rows))
+        self.backend.replace("streak", ((user_id, streak or 0) for user_id, _, streak in rows))
+
+    def top(self, metric: str, n: int, window: Optional[str] = None) -> List[dict]:
+        entries = self.backend.top(self.board_name(metric, window), n)
+        return _ranked(entries)
+
+    def rank(self, metric: str, user_id: str, window: Optional[str] = None) -> Optional[dict]:
+        name = self.board_name(metric, window)
+        score = self.backend.score(name, user_id)
+        if score is None:
+            return None
+        return {"user_id": user_id, "rank": self.backend.rank(name, user_id), "score": score}
+
+    def top_among(self, metric: str, members: Iterable[str], n: int, window: Optional[str] = None) -> List[dict]:
+        """Top ``n`` of a member subset (e.g. a group); O(m log m) in the subset size."""
+        scores = self.backend.scores(self.board_name(metric, window), members)
+        entries = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return _ranked(entries)[:n]
+
+    def clear(self):
+        self.backend.clear()
+
+
+def _ranked(entries: List[Tuple[str, int]]) -> List[dict]:
+    ranked, rank, previous = [], 0, None
+    for position, (member, score) in enumerate(entries, start=1):
+        if score != previous:
+            rank, previous = position, score
+        ranked.append({"user_id": member, "rank": rank, "score": score})
+    return ranked
+
+
+leaderboard = Leaderboard(RedisBackend(LEADERBOARD_REDIS_URL) if LEADERBOARD_REDIS_URL else None)
@@ -1,16 +1,61 @@
+import asyncio
 import os
+from contextlib import asynccontextmanager
 
-from api.database import Base, engine
+from api import crud, group_progress, migrate, replicas, utils, xp
+from api.database import (DB_POOL_METRICS_INTERVAL, SessionLocal,
+                          dispose_engines, report_pool_metrics)
+from api.feed import group_feed
+from api.instrumentation import InstrumentationMiddleware
+from api.leaderboard import leaderboard
+from api.metrics import render_prometheus
 from api.routers import (achievements, auth, exploration, focus_sessions,
-                         goals, groups, users)
+                         goals, groups, internal, leaderboards, me, users)
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from fastapi.responses import PlainTextResponse
 
-# Create all tables
-Base.metadata.create_all(bind=engine)
+def rebuild_leaderboard():
+    with SessionLocal() as db:
+        leaderboard.rebuild(crud.get_leaderboard_rows(db))
 
-app = FastAPI(title="Orbitah API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Importing this module touches no database; the schema comes from Alembic migrations
+    if migrate.DB_MIGRATE_ON_STARTUP:
+        await asyncio.to_thread(migrate.upgrade_database)
+    await asyncio.to_thread(rebuild_leaderboard)
+    group_feed.start()
+    reporter = None
+    if DB_POOL_METRICS_INTERVAL > 0:
+        reporter = asyncio.create_task(report_pool_metrics(DB_POOL_METRICS_INTERVAL))
+    reconciler = None
+    if group_progress.GROUP_RECONCILE_INTERVAL > 0:
+        reconciler = asyncio.create_task(group_progress.run_group_reconciler())
+    replica_monitor = None
+    if replicas.REPLICAS and replicas.DB_REPLICA_CHECK_INTERVAL > 0:
+        replica_monitor = asyncio.create_task(replicas.run_replica_monitor())
+    xp_flusher = None
+    if xp.xp_buffer is not None:
+        await asyncio.to_thread(xp.recover_xp_journal)
+        xp_flusher = asyncio.create_task(xp.run_xp_flusher())
+    yield
+    if reporter is not None:
+        reporter.cancel()
+    if reconciler is not None:
+        reconciler.cancel()
+    if replica_monitor is not None:
+        replica_monitor.cancel()
+    if xp_flusher is not None:
+        xp_flusher.cancel()
+        await asyncio.to_thread(xp.flush_xp_buffer)
+        xp.xp_buffer.close()
+    group_feed.close()
+    utils.shutdown_password_executor()
+    await dispose_engines()
+
+app = FastAPI(title="Orbitah API", lifespan=lifespan)
 
 # Security middleware for production
 if os.getenv("ENVIRONMENT") == "production":
@@ -39,14 +84,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(replicas.ReadYourWritesMiddleware)
+
+# Outermost, so the recorded wall time covers the other middleware too
+app.add_middleware(InstrumentationMiddleware)
+
 app.include_router(auth.router)
 app.include_router(users.router)
+app.include_router(me.router)
 app.include_router(groups.router)
 app.include_router(goals.router)
 app.include_router(exploration.router)
 app.include_router(achievements.router)
 app.include_router(focus_sessions.router)
+app.include_router(leaderboards.router)
+app.include_router(internal.router)
 
 @app.get("/")
 def root():
     return {"message": "Welcome to the Orbitah API"}
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
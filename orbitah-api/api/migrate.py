@@ -0,0 +1,23 @@
+import os
+
+# Apply pending migrations from the lifespan startup hook. Handy for a single dev server;
+# with several workers or replicas run `alembic upgrade head` once before starting them instead
+DB_MIGRATE_ON_STARTUP = os.environ.get("DB_MIGRATE_ON_STARTUP", "false").lower() in ("1", "true", "yes")
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
+
+# alembic is imported inside the functions: workers that don't migrate never load it
+def alembic_config():
+    """Config for ``migrations/`` that skips alembic.ini, so the server's logging setup is left alone."""
+    from alembic.config import Config
+
+    config = Config()
+    config.set_main_option("script_location", MIGRATIONS_DIR)
+    return config
+
+def upgrade_database(revision: str = "head"):
+    """``alembic upgrade`` against SQLALCHEMY_DATABASE_URL."""
+    from alembic import command
+
+    command.upgrade(alembic_config(), revision)
@@ -1,27 +1,33 @@
 import uuid
+from datetime import datetime
 
 from sqlalchemy import (Boolean, Column, Date, DateTime, Float, ForeignKey,
-                        Integer, String, Table, Text)
+                        Index, Integer, String, Table, Text, UniqueConstraint)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
 from .database import Base
 
-# Association tables
+# Association tables; the group counters look them up by either side on every goal and focus write
 user_group = Table(
     'user_group', Base.metadata,
     Column('user_id', String, ForeignKey('users.id')),
-    Column('group_id', String, ForeignKey('groups.id'))
+    Column('group_id', String, ForeignKey('groups.id')),
+    Index('ix_user_group_user_id', 'user_id'),
+    Index('ix_user_group_group_id', 'group_id')
 )
 group_goal = Table(
     'group_goal', Base.metadata,
     Column('group_id', String, ForeignKey('groups.id')),
-    Column('goal_id', String, ForeignKey('goals.id'))
+    Column('goal_id', String, ForeignKey('goals.id')),
+    Index('ix_group_goal_goal_id', 'goal_id'),
+    Index('ix_group_goal_group_id', 'group_id')
 )
 goal_user = Table(
     'goal_user', Base.metadata,
     Column('goal_id', String, ForeignKey('goals.id')),
-    Column('user_id', String, ForeignKey('users.id'))
+    Column('user_id', String, ForeignKey('users.id')),
+    Index('ix_goal_user_goal_id', 'goal_id')
 )
 
 class User(Base):
@@ -51,12 +57,23 @@ class Group(Base):
     code = Column(String, unique=True, index=True)
     ship_type = Column(String)
     motto = Column(String)
+    # Server-maintained counters (crud keeps them in step; reconciliation repairs drift).
+    # progress = goals_completed / goals_total over the group's shared goals.
     progress = Column(Float, default=0.0)
+    goals_total = Column(Integer, nullable=False, default=0, server_default='0')
+    goals_completed = Column(Integer, nullable=False, default=0, server_default='0')
+    # Minutes focused by current members, from their focus session rollups
+    focus_minutes = Column(Integer, nullable=False, default=0, server_default='0')
     members = relationship('User', secondary=user_group, back_populates='groups')
     shared_goals = relationship('Goal', secondary=group_goal, back_populates='groups')
 
 class Goal(Base):
     __tablename__ = 'goals'
+    __table_args__ = (
+        # "my active goals due this week": equality columns first, range column last
+        Index('ix_goals_creator_status_due_date', 'creator_id', 'status', 'due_date'),
+        Index('ix_goals_status_due_date', 'status', 'due_date'),
+    )
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     title = Column(String)
     description = Column(Text)
@@ -76,11 +93,49 @@ class Goal(Base):
 class ExplorationState(Base):
     __tablename__ = 'exploration_states'
     user_id = Column(String, ForeignKey('users.id'), primary_key=True)
-    unlocked_locations = Column(Text)  # Store as comma-separated string
     current_location = Column(String)
     lore_progress = Column(String)
-    achievements = Column(Text)  # Store as comma-separated string
     user = relationship('User', back_populates='exploration_state')
+    location_unlocks = relationship(
+        'UnlockedLocation', order_by='UnlockedLocation.id',
+        cascade='all, delete-orphan', lazy='selectin'
+    )
+    achievement_unlocks = relationship(
+        'UnlockedAchievement', order_by='UnlockedAchievement.id',
+        cascade='all, delete-orphan', lazy='selectin'
+    )
+
+    # Exposed as plain lists for schemas.ExplorationState
+    @property
+    def unlocked_locations(self):
+        return [row.location for row in self.location_unlocks]
+
+    @property
+    def achievements(self):
+        return [row.achievement for row in self.achievement_unlocks]
+
+# One row per unlocked item, in unlock order; (item, user_id) serves "who unlocked X"
+class UnlockedLocation(Base):
+    __tablename__ = 'exploration_unlocked_locations'
+    __table_args__ = (
+        UniqueConstraint('user_id', 'location'),
+        Index('ix_exploration_unlocked_locations_location_user', 'location', 'user_id'),
+    )
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(String, ForeignKey('exploration_states.user_id', ondelete='CASCADE'), nullable=False)
+    location = Column(String, nullable=False)
+    unlocked_at = Column(DateTime, default=datetime.utcnow)
+
+class UnlockedAchievement(Base):
+    __tablename__ = 'exploration_unlocked_achievements'
+    __table_args__ = (
+        UniqueConstraint('user_id', 'achievement'),
+        Index('ix_exploration_unlocked_achievements_achievement_user', 'achievement', 'user_id'),
+    )
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(String, ForeignKey('exploration_states.user_id', ondelete='CASCADE'), nullable=False)
+    achievement = Column(String, nullable=False)
+    unlocked_at = Column(DateTime, default=datetime.utcnow)
 
 class Achievement(Base):
     __tablename__ = 'achievements'
@@ -93,10 +148,39 @@ class Achievement(Base):
 
 class FocusSession(Base):
     __tablename__ = 'focus_sessions'
+    __table_args__ = (
+        UniqueConstraint('user_id', 'idempotency_key', name='uq_focus_sessions_user_idempotency_key'),
+    )
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey('users.id'))
     method = Column(String)
     started_at = Column(DateTime)
     duration = Column(Integer)
     goal_id = Column(String, ForeignKey('goals.id'), nullable=True)
+    # Client-chosen key so retried bulk uploads don't insert the same session twice
+    idempotency_key = Column(String, nullable=True)
     user = relationship('User', back_populates='focus_sessions')
+
+class FocusUserRollup(Base):
+    """Focused minutes per user, day and method, kept in step with focus_sessions by crud."""
+    __tablename__ = 'focus_user_daily_rollups'
+    user_id = Column(String, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    day = Column(Date, primary_key=True)
+    method = Column(String, primary_key=True)
+    minutes = Column(Integer, nullable=False, default=0)
+    sessions = Column(Integer, nullable=False, default=0)
+
+class FocusGoalRollup(Base):
+    """Focused minutes per goal, day and method, kept in step with focus_sessions by crud."""
+    __tablename__ = 'focus_goal_daily_rollups'
+    goal_id = Column(String, ForeignKey('goals.id', ondelete='CASCADE'), primary_key=True)
+    day = Column(Date, primary_key=True)
+    method = Column(String, primary_key=True)
+    minutes = Column(Integer, nullable=False, default=0)
+    sessions = Column(Integer, nullable=False, default=0)
+
+class XPAwardBatch(Base):
+    """Journaled write-behind batches already applied, so replaying a journal never counts one twice."""
+    __tablename__ = 'xp_award_batches'
+    id = Column(String, primary_key=True)
+    applied_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,27 @@
+import os
+from typing import Iterable, List
+
+from fastapi import HTTPException, Query
+
+# Most ids one multi-get resolves; they become one IN list, well inside the bind parameter limits
+MULTI_GET_MAX_IDS = int(os.environ.get("MULTI_GET_MAX_IDS", "5000"))
+
+
+def unique_ids(ids: Iterable[str]) -> List[str]:
+    """``ids`` without blanks and repeats, in first-seen order; 413 above MULTI_GET_MAX_IDS."""
+    ids = list(dict.fromkeys(item.strip() for item in ids if item and item.strip()))
+    if len(ids) > MULTI_GET_MAX_IDS:
+        raise HTTPException(status_code=413, detail=f"At most {MULTI_GET_MAX_IDS} ids per request")
+    return ids
+
+def query_ids(ids: str = Query(..., description="Comma-separated ids")) -> List[str]:
+    """Dependency for ``GET .../by_ids?ids=a,b,c``."""
+    return unique_ids(ids.split(","))
+
+def in_order(rows, ids: List[str], key: str = "id") -> dict:
+    """``{"items", "missing"}`` for a multi-get: rows in the order of ``ids``, then the ids that matched none."""
+    by_id = {getattr(row, key): row for row in rows}
+    return {
+        "items": [by_id[item] for item in ids if item in by_id],
+        "missing": [item for item in ids if item not in by_id],
+    }
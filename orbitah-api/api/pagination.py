@@ -0,0 +1,42 @@
+import base64
+import binascii
+from typing import Optional
+
+from fastapi import HTTPException, Request, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(key: str) -> str:
+    return base64.urlsafe_b64encode(key.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> str:
+    try:
+        key = base64.b64decode(cursor + "=" * (-len(cursor) % 4), altchars=b"-_", validate=True).decode()
+    except (binascii.Error, UnicodeDecodeError):
+        key = ""
+    if not key:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return key
+
+def paginate(query, key_column, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    """Order by an indexed unique key; seek past ``cursor`` or fall back to ``skip``.
+
+    A cursor turns deep pages into an index range scan instead of walking and
+    discarding ``skip`` rows, and stays stable while rows are being inserted.
+    """
+    query = query.order_by(key_column)
+    if cursor is not None:
+        query = query.filter(key_column > decode_cursor(cursor))
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit).all()
+
+def set_next_cursor(request: Request, response: Response, rows, limit: int, key: str = "id"):
+    """Expose the next page as an opaque cursor; list bodies stay plain arrays."""
+    if limit <= 0 or len(rows) < limit:
+        return
+    cursor = encode_cursor(getattr(rows[-1], key))
+    response.headers[NEXT_CURSOR_HEADER] = cursor
+    next_url = request.url.remove_query_params("skip").include_query_params(cursor=cursor)
+    response.headers["Link"] = f'<{next_url}>; rel="next"'
@@ -0,0 +1,126 @@
+import logging
+import os
+import sys
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Development/staging diagnostics; both are off by default because EXPLAIN and stack walks cost a round trip
+# Log statements slower than this many milliseconds (0 disables)
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", "0"))
+# Run EXPLAIN for slow SELECTs and log the plan with them
+SLOW_QUERY_EXPLAIN = os.environ.get("SLOW_QUERY_EXPLAIN", "true").lower() in ("1", "true", "yes")
+# Flag a statement executed this many times within one request as a likely N+1 (0 disables)
+N_PLUS_ONE_THRESHOLD = int(os.environ.get("N_PLUS_ONE_THRESHOLD", "0"))
+# Fail the offending request instead of only logging it (meant for test runs)
+N_PLUS_ONE_RAISE = os.environ.get("N_PLUS_ONE_RAISE", "false").lower() in ("1", "true", "yes")
+
+EXPLAIN_PREFIXES = {"sqlite": "EXPLAIN QUERY PLAN ", "postgresql": "EXPLAIN ", "mysql": "EXPLAIN "}
+# Transaction control repeats legitimately (one per commit), so it is never an N+1
+_TRANSACTION_CONTROL = ("BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE")
+# Frames that only relay a call; attribution skips them to find the crud function or router
+_RELAY_MODULES = ("api.query_log", "api.instrumentation", "api.database", "api.async_crud")
+
+
+class NPlusOneQueryError(RuntimeError):
+    """A request repeated the same statement N_PLUS_ONE_THRESHOLD times."""
+
+
+class RequestQueries:
+    """Statements one request has executed, keyed by their SQL text."""
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.counts = Counter()
+
+    @property
+    def route(self) -> str:
+        route = self.scope.get("route")
+        path = getattr(route, "path", None) or self.scope.get("path", "?")
+        return f"{self.scope.get('method', '')} {path}".strip()
+
+
+_current: ContextVar[Optional[RequestQueries]] = ContextVar("request_queries", default=None)
+
+
+def start_request(scope):
+    """Track the statements of the request in ``scope``; pass the token to ``end_request``."""
+    return _current.set(RequestQueries(scope))
+
+def end_request(token):
+    _current.reset(token)
+
+
+def caller() -> str:
+    """``module.function:line`` of the api code that issued the current statement.
+
+    Helpers called from crud (pagination, ...) are reported with the crud
+    function that called them. Lazy loads triggered while FastAPI validates a
+    response model have no api frame of their own; they are attributed to
+    response serialization.
+    """
+    innermost = None
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if frame.f_code.co_name == "serialize_response" and module == "fastapi.routing":
+            return innermost or "response serialization"
+        if module.startswith("api.") and module not in _RELAY_MODULES:
+            location = f"{module.removeprefix('api.')}.{frame.f_code.co_name}:{frame.f_lineno}"
+            if module == "api.crud":
+                return location if innermost is None else f"{innermost} (from {location})"
+            innermost = innermost or location
+        frame = frame.f_back
+    return innermost or "unknown"
+
+def explain(conn, statement: str, parameters) -> Optional[str]:
+    """The plan of a SELECT, fetched on the statement's own connection; None when unavailable."""
+    prefix = EXPLAIN_PREFIXES.get(conn.dialect.name)
+    if prefix is None or not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return "\n".join(" ".join(str(column) for column in row) for row in cursor.fetchall())
+    except Exception as exc:
+        return f"(EXPLAIN failed: {exc})"
+    finally:
+        cursor.close()
+
+def _where(request: Optional[RequestQueries]) -> str:
+    return f"{request.route} via {caller()}" if request is not None else caller()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if SLOW_QUERY_MS > 0 and context is not None:
+        context.slow_query_started = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    request = _current.get()
+    started = getattr(context, "slow_query_started", None)
+    if started is not None:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms >= SLOW_QUERY_MS:
+            plan = explain(conn, statement, parameters) if SLOW_QUERY_EXPLAIN and not executemany else None
+            logger.warning(
+                "slow query (%.1f ms) in %s: %s%s",
+                elapsed_ms, _where(request), statement, f"\nplan:\n{plan}" if plan else ""
+            )
+    if N_PLUS_ONE_THRESHOLD <= 0 or request is None or statement.lstrip().upper().startswith(_TRANSACTION_CONTROL):
+        return
+    request.counts[statement] += 1
+    # Report once per statement and request, when it reaches the threshold
+    if request.counts[statement] != N_PLUS_ONE_THRESHOLD:
+        return
+    message = f"possible N+1: statement executed {N_PLUS_ONE_THRESHOLD} times in {_where(request)}: {statement}"
+    if N_PLUS_ONE_RAISE:
+        raise NPlusOneQueryError(message)
+    logger.warning(message)
@@ -0,0 +1,256 @@
+"""Read replicas: read-only routes on a replica, writes and fresh reads on the primary.
+
+Routes that only read depend on ``get_read_db`` instead of ``get_db``. It
+hands out a session on the next healthy replica, and the primary's own
+session when no replica is configured or caught up, or when the client
+committed a write within DB_REPLICA_STICKY_SECONDS (read-your-writes).
+"""
+import asyncio
+import hashlib
+import itertools
+import logging
+import os
+import time
+from contextvars import ContextVar
+from http.cookies import SimpleCookie
+from typing import List, Optional
+
+from fastapi import Depends
+from sqlalchemy import create_engine, event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session
+
+from .cache import TTLCache
+from .database import (ASYNC_DB_ENABLED, AsyncSessionLocal,
+                       InstrumentedAsyncQueuePool, InstrumentedQueuePool,
+                       SessionLocal, get_db, lazy_engine, pool_options,
+                       to_async_url)
+from .metrics import Gauge
+
+logger = logging.getLogger(__name__)
+
+# Comma-separated replica URLs (same driver as SQLALCHEMY_DATABASE_URL); empty sends every read to the primary
+SQLALCHEMY_REPLICA_URLS = [
+    url.strip() for url in os.environ.get("SQLALCHEMY_REPLICA_URLS", "").split(",") if url.strip()
+]
+# Replicas further behind the primary than this are skipped until they catch up
+DB_REPLICA_MAX_LAG_SECONDS = float(os.environ.get("DB_REPLICA_MAX_LAG_SECONDS", "10"))
+# Seconds between replica lag/health checks; 0 disables them and every replica counts as healthy
+DB_REPLICA_CHECK_INTERVAL = float(os.environ.get("DB_REPLICA_CHECK_INTERVAL", "5"))
+# After a client commits a write, its reads stay on the primary this long; keep it above the usual lag
+DB_REPLICA_STICKY_SECONDS = float(os.environ.get("DB_REPLICA_STICKY_SECONDS", "5"))
+DB_REPLICA_STICKY_MAX_CLIENTS = int(os.environ.get("DB_REPLICA_STICKY_MAX_CLIENTS", "10000"))
+
+# Carries the stickiness deadline across workers for clients that keep cookies
+STICKY_COOKIE = "db_read_primary_until"
+
+REPLICA_LAG_SECONDS = Gauge("db_replica_lag_seconds", "Replication lag of each replica at the last check")
+REPLICA_HEALTHY = Gauge("db_replica_healthy", "1 while a replica receives reads, 0 while reads skip it")
+
+# Seconds a replica is behind its primary. The LSN comparison keeps an idle but
+# caught-up standby at 0; on a server that is not a standby both sides are NULL.
+# Dialects without an entry are treated as caught up while they answer.
+LAG_QUERIES = {
+    "postgresql": (
+        "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+    ),
+}
+
+
+class Replica:
+    """One replica URL, its lazily created engines and its last health check."""
+
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.url = url
+        self.healthy = True
+        self.lag: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def engine(self):
+        def create():
+            poolclass = type(f"{self.name}QueuePool", (InstrumentedQueuePool,), {"metrics_name": self.name})
+            if self.url.startswith("sqlite"):
+                return create_engine(self.url, connect_args={"check_same_thread": False}, **pool_options(poolclass))
+            return create_engine(self.url, **pool_options(poolclass))
+        return lazy_engine(self.name, create)
+
+    def async_engine(self):
+        name = f"{self.name}_async"
+
+        def create():
+            poolclass = type(f"{name}QueuePool", (InstrumentedAsyncQueuePool,), {"metrics_name": name})
+            return create_async_engine(to_async_url(self.url), **pool_options(poolclass))
+        return lazy_engine(name, create)
+
+    def mark(self, healthy: bool, lag: Optional[float] = None, error: Optional[str] = None):
+        if healthy != self.healthy:
+            if healthy:
+                logger.info("replica %s is back (lag %.1fs)", self.name, lag or 0.0)
+            else:
+                logger.warning("replica %s skipped for reads: %s", self.name, error)
+        self.healthy, self.lag, self.error = healthy, lag, error
+        REPLICA_HEALTHY.set(int(healthy), replica=self.name)
+        if lag is not None:
+            REPLICA_LAG_SECONDS.set(lag, replica=self.name)
+
+    def status(self) -> dict:
+        return {"healthy": self.healthy, "lag_seconds": self.lag, "error": self.error}
+
+
+REPLICAS: List[Replica] = [Replica(f"replica{i}", url) for i, url in enumerate(SQLALCHEMY_REPLICA_URLS)]
+_round_robin = itertools.count()
+
+
+def replica_lag(conn) -> float:
+    query = LAG_QUERIES.get(conn.dialect.name)
+    if query is None:
+        conn.exec_driver_sql("SELECT 1")
+        return 0.0
+    return float(conn.exec_driver_sql(query).scalar() or 0.0)
+
+def check_replicas():
+    """Measure every replica's lag; unreachable or lagging ones stop receiving reads until the next check."""
+    for replica in REPLICAS:
+        try:
+            with replica.engine().connect() as conn:
+                lag = replica_lag(conn)
+        except sa_exc.DBAPIError as exc:
+            replica.mark(False, error=str(exc.orig))
+            continue
+        if lag > DB_REPLICA_MAX_LAG_SECONDS:
+            replica.mark(False, lag, f"{lag:.1f}s behind (limit {DB_REPLICA_MAX_LAG_SECONDS:g}s)")
+        else:
+            replica.mark(True, lag)
+
+async def run_replica_monitor(interval: float = DB_REPLICA_CHECK_INTERVAL):
+    while True:
+        await asyncio.to_thread(check_replicas)
+        await asyncio.sleep(interval)
+
+def pick_replica() -> Optional[Replica]:
+    """The next healthy replica in round-robin order; None sends the read to the primary."""
+    healthy = [replica for replica in REPLICAS if replica.healthy]
+    if not healthy:
+        return None
+    return healthy[next(_round_robin) % len(healthy)]
+
+def replica_statuses() -> dict:
+    return {replica.name: replica.status() for replica in REPLICAS}
+
+
+class RequestWrites:
+    """Whether the current request committed, and whether its reads must see the primary."""
+
+    def __init__(self, read_primary: bool):
+        self.read_primary = read_primary
+        self.committed = False
+
+
+_current: ContextVar[Optional[RequestWrites]] = ContextVar("request_writes", default=None)
+
+# Per-worker stickiness for bearer clients that don't keep cookies, keyed by a token digest
+_recent_writers = TTLCache(DB_REPLICA_STICKY_MAX_CLIENTS, DB_REPLICA_STICKY_SECONDS)
+
+
+@event.listens_for(Session, "after_commit")
+def _record_commit(session):
+    request = _current.get()
+    if request is not None:
+        request.committed = True
+
+def reads_from_primary() -> bool:
+    request = _current.get()
+    return request is not None and (request.read_primary or request.committed)
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+def _writer_key(scope) -> Optional[str]:
+    authorization = _header(scope, b"authorization")
+    return hashlib.sha256(authorization.encode()).hexdigest() if authorization else None
+
+def _sticky_until(scope) -> float:
+    cookie = _header(scope, b"cookie")
+    if not cookie:
+        return 0.0
+    morsel = SimpleCookie(cookie).get(STICKY_COOKIE)
+    try:
+        return float(morsel.value) if morsel is not None else 0.0
+    except ValueError:
+        return 0.0
+
+
+class ReadYourWritesMiddleware:
+    """Keeps a client's reads on the primary for a while after it commits a write.
+
+    The deadline travels in a cookie, so it holds across workers; clients that
+    don't keep cookies are also remembered per worker by their bearer token.
+    A no-op while no replica is configured.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not REPLICAS or DB_REPLICA_STICKY_SECONDS <= 0:
+            await self.app(scope, receive, send)
+            return
+        writer = _writer_key(scope)
+        request = RequestWrites(
+            _sticky_until(scope) > time.time() or (writer is not None and _recent_writers.get(writer) is not None)
+        )
+        token = _current.set(request)
+
+        async def send_with_stickiness(message):
+            if message["type"] == "http.response.start" and request.committed:
+                if writer is not None:
+                    _recent_writers.set(writer, True)
+                until = time.time() + DB_REPLICA_STICKY_SECONDS
+                cookie = f"{STICKY_COOKIE}={until:.3f}; Max-Age={int(DB_REPLICA_STICKY_SECONDS) + 1}; Path=/; HttpOnly; SameSite=Lax"
+                message = {**message, "headers": [*message.get("headers", []), (b"set-cookie", cookie.encode("latin-1"))]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stickiness)
+        finally:
+            _current.reset(token)
+
+
+def _replica_failed(replica: Replica, exc: sa_exc.DBAPIError):
+    # Skip it right away instead of waiting for the next check
+    if exc.connection_invalidated or isinstance(exc, sa_exc.OperationalError):
+        replica.mark(False, error=str(exc.orig))
+
+if ASYNC_DB_ENABLED:
+    async def get_read_db(db=Depends(get_db)):
+        replica = None if reads_from_primary() else pick_replica()
+        if replica is None:
+            yield db
+            return
+        async with AsyncSessionLocal(bind=replica.async_engine()) as read_db:
+            try:
+                yield read_db
+            except sa_exc.DBAPIError as exc:
+                _replica_failed(replica, exc)
+                raise
+else:
+    def get_read_db(db: Session = Depends(get_db)):
+        replica = None if reads_from_primary() else pick_replica()
+        if replica is None:
+            yield db
+            return
+        read_db = SessionLocal(bind=replica.engine())
+        try:
+            yield read_db
+        except sa_exc.DBAPIError as exc:
+            _replica_failed(replica, exc)
+            raise
+        finally:
+            read_db.close()
@@ -0,0 +1,143 @@
+import hashlib
+import os
+import threading
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .cache import TTLCache
+from .metrics import Counter
+
+# Safety net for changes made outside crud; crud invalidates entries explicitly
+RESPONSE_CACHE_TTL = float(os.environ.get("RESPONSE_CACHE_TTL", "300"))
+RESPONSE_CACHE_MAX_SIZE = int(os.environ.get("RESPONSE_CACHE_MAX_SIZE", "10000"))
+# Seconds clients may reuse a response without revalidating (0: always revalidate with If-None-Match)
+HTTP_CACHE_MAX_AGE = int(os.environ.get("HTTP_CACHE_MAX_AGE", "0"))
+# Per-user dashboards are invalidated by crud too, but aggregate many tables, so keep them short-lived
+DASHBOARD_CACHE_TTL = float(os.environ.get("DASHBOARD_CACHE_TTL", "30"))
+DASHBOARD_CACHE_MAX_SIZE = int(os.environ.get("DASHBOARD_CACHE_MAX_SIZE", "10000"))
+
+RESPONSE_CACHE_REQUESTS = Counter("response_cache_requests_total", "Cached endpoint lookups by namespace and result")
+
+# Session.info key holding invalidations that wait for the transaction to commit
+_PENDING = "response_cache_invalidations"
+
+
+class CachedResponse:
+    def __init__(self, body: bytes, headers: Optional[Dict[str, str]] = None, version: int = 0):
+        self.body = body
+        # Key version the entry was cached under; a later invalidation of the key makes it stale
+        self.version = version
+        self.etag = '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+        self.headers = headers or {}
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        if not if_none_match:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        # If-None-Match uses weak comparison, so W/"x" matches "x"
+        return "*" in tags or any(tag.removeprefix("W/") == self.etag for tag in tags)
+
+    def to_response(self, request: Request) -> Response:
+        cache_control = f"public, max-age={HTTP_CACHE_MAX_AGE}" if HTTP_CACHE_MAX_AGE > 0 else "no-cache"
+        headers = {"ETag": self.etag, "Cache-Control": cache_control}
+        if self.matches(request.headers.get("if-none-match")):
+            return Response(status_code=304, headers=headers)
+        return Response(content=self.body, media_type="application/json", headers={**self.headers, **headers})
+
+
+class ResponseCache:
+    """Serialized GET responses keyed by (namespace, key), invalidated by crud.
+
+    ``token`` is taken before reading the database and passed back to ``set``:
+    if the entry was invalidated in between, the possibly stale body is
+    returned to the caller but not cached.
+
+    ``variant`` keeps several bodies under one key, e.g. one per version of
+    another entry the body embeds; invalidating the key drops all of them.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self._entries = TTLCache(max_size, ttl)
+        self._lock = threading.Lock()
+        self._namespace_versions: Dict[str, int] = {}
+        self._key_versions: Dict[tuple, int] = {}
+
+    def token(self, namespace: str, key: str = ""):
+        with self._lock:
+            return self._namespace_versions.get(namespace, 0), self._key_versions.get((namespace, key), 0)
+
+    def get(self, namespace: str, key: str = "", variant=None) -> Optional[CachedResponse]:
+        version, key_version = self.token(namespace, key)
+        entry = self._entries.get((namespace, version, key, variant))
+        if entry is not None and entry.version != key_version:
+            entry = None
+        RESPONSE_CACHE_REQUESTS.inc(namespace=namespace, result="hit" if entry is not None else "miss")
+        return entry
+
+    def set(self, namespace: str, key: str, body: bytes, token, headers: Optional[Dict[str, str]] = None,
+            variant=None) -> CachedResponse:
+        entry = CachedResponse(body, headers, version=token[1])
+        with self._lock:
+            current = self._namespace_versions.get(namespace, 0), self._key_versions.get((namespace, key), 0)
+            if current == token:
+                self._entries.set((namespace, token[0], key, variant), entry)
+        return entry
+
+    def invalidate(self, namespace: str, key: Optional[str] = None):
+        """Drop one key, or with ``key=None`` every entry of the namespace."""
+        with self._lock:
+            if key is None:
+                self._namespace_versions[namespace] = self._namespace_versions.get(namespace, 0) + 1
+            else:
+                self._key_versions[(namespace, key)] = self._key_versions.get((namespace, key), 0) + 1
+                # Other variants of the key are stale by version and age out
+                self._entries.delete((namespace, self._namespace_versions.get(namespace, 0), key, None))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._namespace_versions.clear()
+            self._key_versions.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "requests": RESPONSE_CACHE_REQUESTS.snapshot(),
+            "ttl": self._entries.ttl,
+        }
+
+
+response_cache = ResponseCache(RESPONSE_CACHE_MAX_SIZE, RESPONSE_CACHE_TTL)
+# GET /me/dashboard, keyed by user id
+dashboard_cache = ResponseCache(DASHBOARD_CACHE_MAX_SIZE, DASHBOARD_CACHE_TTL)
+
+
+def invalidate_on_commit(db: Session, namespace: str, key: Optional[str] = None, cache: ResponseCache = response_cache):
+    """Invalidate once ``db`` commits, so no reader can re-cache the pre-commit state.
+
+    Pending invalidations of a rolled-back transaction are applied at the next
+    commit instead, which is merely an extra miss.
+    """
+    db.info.setdefault(_PENDING, set()).add((cache, namespace, key))
+
+@event.listens_for(Session, "after_commit")
+def _apply_invalidations(session):
+    for cache, namespace, key in session.info.pop(_PENDING, ()):
+        cache.invalidate(namespace, key)
+
+
+async def serve_cached(request: Request, namespace: str, key: str, render, cache: ResponseCache = response_cache,
+                       variant=None) -> Response:
+    """Answer from the cache, or from ``await render()`` -> ``(body, headers)`` on a miss.
+
+    ``render`` may raise (e.g. a 404 HTTPException); nothing is cached then.
+    """
+    entry = cache.get(namespace, key, variant)
+    if entry is None:
+        token = cache.token(namespace, key)
+        body, headers = await render()
+        entry = cache.set(namespace, key, body, token, headers, variant)
+    return entry.to_response(request)
@@ -1,37 +1,75 @@
-from typing import List
+from typing import List, Optional
 
-from api import crud, schemas
+from api import async_crud, models, schemas
 from api.database import get_db
-from fastapi import APIRouter, Depends, HTTPException
+from api.instrumentation import InstrumentedRoute, timed
+from api.multi_get import in_order, query_ids, unique_ids
+from api.pagination import NEXT_CURSOR_HEADER, set_next_cursor
+from api.replicas import get_read_db
+from api.response_cache import serve_cached
+from api.serialization import RowSerializer
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 
-router = APIRouter(prefix="/achievements", tags=["achievements"])
+router = APIRouter(prefix="/achievements", tags=["achievements"], route_class=InstrumentedRoute)
+
+AchievementRows = RowSerializer(schemas.Achievement, models.Achievement)
 
 @router.post("/", response_model=schemas.Achievement)
-def create_achievement(achievement: schemas.AchievementCreate, db: Session = Depends(get_db)):
-    return crud.create_achievement(db, achievement)
+async def create_achievement(achievement: schemas.AchievementCreate, db: Session = Depends(get_db)):
+    return await async_crud.create_achievement(db, achievement)
 
 @router.get("/", response_model=List[schemas.Achievement])
-def read_achievements(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_achievements(db, skip=skip, limit=limit)
+async def read_achievements(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Cached until an achievement changes; send If-None-Match to get a 304"""
+    async def render():
+        rows = await async_crud.get_achievements(db, skip=skip, limit=limit, cursor=cursor, columns=AchievementRows.columns)
+        page = Response()
+        set_next_cursor(request, page, rows, limit)
+        with timed("serialize"):
+            body = AchievementRows.dump(rows)
+        headers = {name: page.headers[name] for name in (NEXT_CURSOR_HEADER, "Link") if name in page.headers}
+        return body, headers
+    # The Link header embeds the request URL, so it is the key
+    return await serve_cached(request, "achievements", str(request.url), render)
+
+@router.get("/by_ids", response_model=schemas.MultiGetResult[schemas.Achievement])
+async def read_achievements_by_ids(ids: List[str] = Depends(query_ids), db: Session = Depends(get_read_db)):
+    """Achievements for ``?ids=a,b,c`` in one query and in that order; unknown ids are listed in ``missing``"""
+    return in_order(await async_crud.get_achievements_by_ids(db, ids), ids)
+
+@router.post("/by_ids", response_model=schemas.MultiGetResult[schemas.Achievement])
+async def read_achievements_by_id_list(batch: schemas.IdList, db: Session = Depends(get_read_db)):
+    """Same as ``GET /achievements/by_ids``, for id lists too long for a URL"""
+    ids = unique_ids(batch.ids)
+    return in_order(await async_crud.get_achievements_by_ids(db, ids), ids)
 
 @router.get("/{achievement_id}", response_model=schemas.Achievement)
-def read_achievement(achievement_id: str, db: Session = Depends(get_db)):
-    db_achievement = crud.get_achievement(db, achievement_id=achievement_id)
-    if db_achievement is None:
-        raise HTTPException(status_code=404, detail="Achievement not found")
-    return db_achievement
+async def read_achievement(request: Request, achievement_id: str, db: Session = Depends(get_db)):
+    async def render():
+        db_achievement = await async_crud.get_achievement(db, achievement_id=achievement_id)
+        if db_achievement is None:
+            raise HTTPException(status_code=404, detail="Achievement not found")
+        with timed("serialize"):
+            return schemas.Achievement.model_validate(db_achievement).model_dump_json().encode(), None
+    return await serve_cached(request, "achievement", achievement_id, render)
 
 @router.put("/{achievement_id}", response_model=schemas.Achievement)
-def update_achievement(achievement_id: str, achievement: schemas.AchievementUpdate, db: Session = Depends(get_db)):
-    db_achievement = crud.get_achievement(db, achievement_id=achievement_id)
+async def update_achievement(achievement_id: str, achievement: schemas.AchievementUpdate, db: Session = Depends(get_db)):
+    db_achievement = await async_crud.update_achievement(db, achievement_id, achievement)
     if db_achievement is None:
         raise HTTPException(status_code=404, detail="Achievement not found")
-    return crud.update_achievement(db, achievement_id, achievement)
+    return db_achievement
 
 @router.delete("/{achievement_id}", response_model=schemas.Achievement)
-def delete_achievement(achievement_id: str, db: Session = Depends(get_db)):
-    db_achievement = crud.get_achievement(db, achievement_id=achievement_id)
+async def delete_achievement(achievement_id: str, db: Session = Depends(get_db)):
+    db_achievement = await async_crud.delete_achievement(db, achievement_id)
     if db_achievement is None:
         raise HTTPException(status_code=404, detail="Achievement not found")
-    return crud.delete_achievement(db, achievement_id)
+    return db_achievement
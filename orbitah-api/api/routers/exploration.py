@@ -1,31 +1,82 @@
-from api import crud, schemas
+from typing import List, Optional
+
+from api import async_crud, schemas
 from api.database import get_db
-from fastapi import APIRouter, Depends, HTTPException
+from api.instrumentation import InstrumentedRoute
+from api.pagination import set_next_cursor
+from api.replicas import get_read_db
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 
-router = APIRouter(prefix="/exploration", tags=["exploration"])
+router = APIRouter(prefix="/exploration", tags=["exploration"], route_class=InstrumentedRoute)
 
 @router.post("/", response_model=schemas.ExplorationState)
-def create_exploration_state(state: schemas.ExplorationStateCreate, db: Session = Depends(get_db)):
-    return crud.create_exploration_state(db, state)
+async def create_exploration_state(state: schemas.ExplorationStateCreate, db: Session = Depends(get_db)):
+    return await async_crud.create_exploration_state(db, state)
 
 @router.get("/{user_id}", response_model=schemas.ExplorationState)
-def read_exploration_state(user_id: str, db: Session = Depends(get_db)):
-    db_state = crud.get_exploration_state(db, user_id=user_id)
+async def read_exploration_state(user_id: str, db: Session = Depends(get_read_db)):
+    db_state = await async_crud.get_exploration_state(db, user_id=user_id)
     if db_state is None:
         raise HTTPException(status_code=404, detail="Exploration state not found")
     return db_state
 
 @router.put("/{user_id}", response_model=schemas.ExplorationState)
-def update_exploration_state(user_id: str, state: schemas.ExplorationStateUpdate, db: Session = Depends(get_db)):
-    db_state = crud.get_exploration_state(db, user_id=user_id)
+async def update_exploration_state(user_id: str, state: schemas.ExplorationStateUpdate, db: Session = Depends(get_db)):
+    db_state = await async_crud.update_exploration_state(db, user_id, state)
     if db_state is None:
         raise HTTPException(status_code=404, detail="Exploration state not found")
-    return crud.update_exploration_state(db, user_id, state)
+    return db_state
 
 @router.delete("/{user_id}", response_model=schemas.ExplorationState)
-def delete_exploration_state(user_id: str, db: Session = Depends(get_db)):
-    db_state = crud.get_exploration_state(db, user_id=user_id)
+async def delete_exploration_state(user_id: str, db: Session = Depends(get_db)):
+    db_state = await async_crud.delete_exploration_state(db, user_id)
     if db_state is None:
         raise HTTPException(status_code=404, detail="Exploration state not found")
-    return crud.delete_exploration_state(db, user_id)
+    return db_state
+
+@router.post("/{user_id}/unlocked_locations", response_model=schemas.ExplorationState)
+async def unlock_location(user_id: str, unlock: schemas.LocationUnlock, db: Session = Depends(get_db)):
+    """Unlock one location without rewriting the list (idempotent)"""
+    db_state = await async_crud.unlock_location(db, user_id, unlock.location)
+    if db_state is None:
+        raise HTTPException(status_code=404, detail="Exploration state not found")
+    return db_state
+
+@router.post("/{user_id}/achievements", response_model=schemas.ExplorationState)
+async def unlock_achievement(user_id: str, unlock: schemas.AchievementUnlock, db: Session = Depends(get_db)):
+    """Unlock one achievement without rewriting the list (idempotent)"""
+    db_state = await async_crud.unlock_achievement(db, user_id, unlock.achievement)
+    if db_state is None:
+        raise HTTPException(status_code=404, detail="Exploration state not found")
+    return db_state
+
+@router.get("/unlocked_locations/{location}/users", response_model=List[str])
+async def read_users_with_location(
+    location: str,
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    """Ids of users who unlocked a location"""
+    rows = await async_crud.get_users_with_location(db, location, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(request, response, rows, limit, key="user_id")
+    return [row.user_id for row in rows]
+
+@router.get("/achievements/{achievement}/users", response_model=List[str])
+async def read_users_with_achievement(
+    achievement: str,
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    """Ids of users who unlocked an achievement"""
+    rows = await async_crud.get_users_with_achievement(db, achievement, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(request, response, rows, limit, key="user_id")
+    return [row.user_id for row in rows]
@@ -1,37 +1,132 @@
-from typing import List
+import os
+from datetime import date
+from typing import Any, Dict, List, Literal, Optional
 
-from api import crud, schemas
+from api import async_crud, crud, models, schemas
 from api.database import get_db
-from fastapi import APIRouter, Depends, HTTPException
+from api.export import stream_export
+from api.instrumentation import InstrumentedRoute, timed
+from api.multi_get import in_order, query_ids, unique_ids
+from api.pagination import set_next_cursor
+from api.replicas import get_read_db
+from api.serialization import JSONBytesResponse, RowSerializer
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
-router = APIRouter(prefix="/focus_sessions", tags=["focus_sessions"])
+# Largest batch accepted by POST /focus_sessions/bulk
+FOCUS_SESSION_BULK_MAX_ITEMS = int(os.environ.get("FOCUS_SESSION_BULK_MAX_ITEMS", "5000"))
+
+router = APIRouter(prefix="/focus_sessions", tags=["focus_sessions"], route_class=InstrumentedRoute)
+
+FocusSessionRows = RowSerializer(schemas.FocusSession, models.FocusSession)
 
 @router.post("/", response_model=schemas.FocusSession)
-def create_focus_session(session: schemas.FocusSessionCreate, db: Session = Depends(get_db)):
-    return crud.create_focus_session(db, session)
+async def create_focus_session(session: schemas.FocusSessionCreate, db: Session = Depends(get_db)):
+    return await async_crud.create_focus_session(db, session)
+
+@router.post("/bulk", response_model=schemas.FocusSessionBulkResult)
+async def create_focus_sessions_bulk(items: List[Dict[str, Any]] = Body(...), db: Session = Depends(get_db)):
+    """Insert a batch of sessions; invalid items are reported instead of failing the batch"""
+    if len(items) > FOCUS_SESSION_BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {FOCUS_SESSION_BULK_MAX_ITEMS} sessions per request")
+    results = [None] * len(items)
+    valid = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, schemas.FocusSessionBulkItem.model_validate(item)))
+        except ValidationError as exc:
+            results[index] = schemas.FocusSessionBulkItemResult(
+                index=index, status="error", errors=exc.errors(include_url=False, include_context=False, include_input=False)
+            )
+    outcomes = await async_crud.create_focus_sessions_bulk(db, [session for _, session in valid]) if valid else []
+    for (index, _), (status, session_id, errors) in zip(valid, outcomes):
+        results[index] = schemas.FocusSessionBulkItemResult(index=index, status=status, id=session_id, errors=errors)
+    return schemas.FocusSessionBulkResult(
+        created=sum(r.status == "created" for r in results),
+        duplicates=sum(r.status == "duplicate" for r in results),
+        failed=sum(r.status == "error" for r in results),
+        results=results
+    )
 
 @router.get("/", response_model=List[schemas.FocusSession])
-def read_focus_sessions(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_focus_sessions(db, skip=skip, limit=limit)
+async def read_focus_sessions(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    rows = await async_crud.get_focus_sessions(db, skip=skip, limit=limit, cursor=cursor, columns=FocusSessionRows.columns)
+    with timed("serialize"):
+        response = JSONBytesResponse(FocusSessionRows.dump(rows))
+    set_next_cursor(request, response, rows, limit)
+    return response
+
+@router.get("/export")
+async def export_focus_sessions(
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    user_id: Optional[str] = None,
+    goal_id: Optional[str] = None,
+    method: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: Session = Depends(get_read_db)
+):
+    """Stream every matching session as NDJSON or CSV; start/end are inclusive days of started_at"""
+    query = crud.focus_sessions_export_query(user_id=user_id, goal_id=goal_id, method=method, start=start, end=end)
+    return stream_export(db, query, fmt, "focus_sessions")
+
+@router.get("/stats/users/{user_id}", response_model=List[schemas.FocusStatsBucket])
+async def read_user_focus_stats(
+    user_id: str,
+    group_by: Literal["day", "week", "method"] = "day",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: Session = Depends(get_read_db)
+):
+    """Focused minutes of a user per day, week or method, read from the daily rollups"""
+    return await async_crud.get_user_focus_stats(db, user_id, group_by=group_by, start=start, end=end)
+
+@router.get("/stats/goals/{goal_id}", response_model=List[schemas.FocusStatsBucket])
+async def read_goal_focus_stats(
+    goal_id: str,
+    group_by: Literal["day", "week", "method"] = "day",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: Session = Depends(get_read_db)
+):
+    """Focused minutes on a goal per day, week or method, read from the daily rollups"""
+    return await async_crud.get_goal_focus_stats(db, goal_id, group_by=group_by, start=start, end=end)
+
+@router.get("/by_ids", response_model=schemas.MultiGetResult[schemas.FocusSession])
+async def read_focus_sessions_by_ids(ids: List[str] = Depends(query_ids), db: Session = Depends(get_read_db)):
+    """Focus sessions for ``?ids=a,b,c`` in one query and in that order; unknown ids are listed in ``missing``"""
+    return in_order(await async_crud.get_focus_sessions_by_ids(db, ids), ids)
+
+@router.post("/by_ids", response_model=schemas.MultiGetResult[schemas.FocusSession])
+async def read_focus_sessions_by_id_list(batch: schemas.IdList, db: Session = Depends(get_read_db)):
+    """Same as ``GET /focus_sessions/by_ids``, for id lists too long for a URL"""
+    ids = unique_ids(batch.ids)
+    return in_order(await async_crud.get_focus_sessions_by_ids(db, ids), ids)
 
 @router.get("/{session_id}", response_model=schemas.FocusSession)
-def read_focus_session(session_id: str, db: Session = Depends(get_db)):
-    db_session = crud.get_focus_session(db, session_id=session_id)
+async def read_focus_session(session_id: str, db: Session = Depends(get_read_db)):
+    db_session = await async_crud.get_focus_session(db, session_id=session_id)
     if db_session is None:
         raise HTTPException(status_code=404, detail="Focus session not found")
     return db_session
 
 @router.put("/{session_id}", response_model=schemas.FocusSession)
-def update_focus_session(session_id: str, session: schemas.FocusSessionUpdate, db: Session = Depends(get_db)):
-    db_session = crud.get_focus_session(db, session_id=session_id)
+async def update_focus_session(session_id: str, session: schemas.FocusSessionUpdate, db: Session = Depends(get_db)):
+    db_session = await async_crud.update_focus_session(db, session_id, session)
     if db_session is None:
         raise HTTPException(status_code=404, detail="Focus session not found")
-    return crud.update_focus_session(db, session_id, session)
+    return db_session
 
 @router.delete("/{session_id}", response_model=schemas.FocusSession)
-def delete_focus_session(session_id: str, db: Session = Depends(get_db)):
-    db_session = crud.get_focus_session(db, session_id=session_id)
+async def delete_focus_session(session_id: str, db: Session = Depends(get_db)):
+    db_session = await async_crud.delete_focus_session(db, session_id)
     if db_session is None:
         raise HTTPException(status_code=404, detail="Focus session not found")
-    return crud.delete_focus_session(db, session_id)
+    return db_session
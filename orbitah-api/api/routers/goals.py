@@ -1,37 +1,102 @@
-from typing import List
+from datetime import date
+from typing import List, Literal, Optional
 
-from api import crud, schemas
+from api import async_crud, crud, models, schemas
 from api.database import get_db
-from fastapi import APIRouter, Depends, HTTPException
+from api.export import stream_export
+from api.instrumentation import InstrumentedRoute, timed
+from api.multi_get import in_order, query_ids, unique_ids
+from api.pagination import set_next_cursor
+from api.replicas import get_read_db
+from api.serialization import JSONBytesResponse, RowSerializer
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 
-router = APIRouter(prefix="/goals", tags=["goals"])
+router = APIRouter(prefix="/goals", tags=["goals"], route_class=InstrumentedRoute)
+
+GoalRows = RowSerializer(schemas.Goal, models.Goal)
 
 @router.post("/", response_model=schemas.Goal)
-def create_goal(goal: schemas.GoalCreate, db: Session = Depends(get_db)):
-    return crud.create_goal(db, goal)
+async def create_goal(goal: schemas.GoalCreate, db: Session = Depends(get_db)):
+    if goal.group_id is not None and await async_crud.get_group(db, group_id=goal.group_id) is None:
+        raise HTTPException(status_code=404, detail="Group not found")
+    return await async_crud.create_goal(db, goal)
 
 @router.get("/", response_model=List[schemas.Goal])
-def read_goals(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_goals(db, skip=skip, limit=limit)
+async def read_goals(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    creator_id: Optional[str] = None,
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    due_from: Optional[date] = None,
+    due_to: Optional[date] = None,
+    db: Session = Depends(get_read_db)
+):
+    """List goals, optionally filtered by creator, status, category and due date range (inclusive)"""
+    rows = await async_crud.get_goals(
+        db,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        creator_id=creator_id,
+        status=status,
+        category=category,
+        due_from=due_from,
+        due_to=due_to,
+        columns=GoalRows.columns
+    )
+    with timed("serialize"):
+        response = JSONBytesResponse(GoalRows.dump(rows))
+    set_next_cursor(request, response, rows, limit)
+    return response
+
+@router.get("/export")
+async def export_goals(
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    creator_id: Optional[str] = None,
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    due_from: Optional[date] = None,
+    due_to: Optional[date] = None,
+    db: Session = Depends(get_read_db)
+):
+    """Stream every matching goal as NDJSON or CSV; same filters as the list endpoint"""
+    query = crud.goals_export_query(
+        creator_id=creator_id, status=status, category=category, due_from=due_from, due_to=due_to
+    )
+    return stream_export(db, query, fmt, "goals")
+
+@router.get("/by_ids", response_model=schemas.MultiGetResult[schemas.Goal])
+async def read_goals_by_ids(ids: List[str] = Depends(query_ids), db: Session = Depends(get_read_db)):
+    """Goals for ``?ids=a,b,c`` in one query and in that order; unknown ids are listed in ``missing``"""
+    return in_order(await async_crud.get_goals_by_ids(db, ids), ids)
+
+@router.post("/by_ids", response_model=schemas.MultiGetResult[schemas.Goal])
+async def read_goals_by_id_list(batch: schemas.IdList, db: Session = Depends(get_read_db)):
+    """Same as ``GET /goals/by_ids``, for id lists too long for a URL"""
+    ids = unique_ids(batch.ids)
+    return in_order(await async_crud.get_goals_by_ids(db, ids), ids)
 
 @router.get("/{goal_id}", response_model=schemas.Goal)
-def read_goal(goal_id: str, db: Session = Depends(get_db)):
-    db_goal = crud.get_goal(db, goal_id=goal_id)
+async def read_goal(goal_id: str, db: Session = Depends(get_read_db)):
+    db_goal = await async_crud.get_goal(db, goal_id=goal_id)
     if db_goal is None:
         raise HTTPException(status_code=404, detail="Goal not found")
     return db_goal
 
 @router.put("/{goal_id}", response_model=schemas.Goal)
-def update_goal(goal_id: str, goal: schemas.GoalUpdate, db: Session = Depends(get_db)):
-    db_goal = crud.get_goal(db, goal_id=goal_id)
+async def update_goal(goal_id: str, goal: schemas.GoalUpdate, db: Session = Depends(get_db)):
+    db_goal = await async_crud.update_goal(db, goal_id, goal)
     if db_goal is None:
         raise HTTPException(status_code=404, detail="Goal not found")
-    return crud.update_goal(db, goal_id, goal)
+    return db_goal
 
 @router.delete("/{goal_id}", response_model=schemas.Goal)
-def delete_goal(goal_id: str, db: Session = Depends(get_db)):
-    db_goal = crud.get_goal(db, goal_id=goal_id)
+async def delete_goal(goal_id: str, db: Session = Depends(get_db)):
+    db_goal = await async_crud.delete_goal(db, goal_id)
     if db_goal is None:
         raise HTTPException(status_code=404, detail="Goal not found")
-    return crud.delete_goal(db, goal_id)
+    return db_goal
@@ -1,37 +1,88 @@
-from typing import List
+from typing import List, Optional
 
-from api import crud, schemas
-from api.database import get_db
-from fastapi import APIRouter, Depends, HTTPException
+from api import async_crud, schemas
+from api.database import get_db, run_db
+from api.feed import group_feed, sse_events, websocket_events
+from api.instrumentation import InstrumentedRoute, timed
+from api.pagination import set_next_cursor
+from api.replicas import get_read_db
+from api.response_cache import serve_cached
+from fastapi import (APIRouter, Depends, HTTPException, Request, Response,
+                     WebSocket, WebSocketException, status)
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-router = APIRouter(prefix="/groups", tags=["groups"])
+router = APIRouter(prefix="/groups", tags=["groups"], route_class=InstrumentedRoute)
 
 @router.post("/", response_model=schemas.Group)
-def create_group(group: schemas.GroupCreate, db: Session = Depends(get_db)):
-    return crud.create_group(db, group)
+async def create_group(group: schemas.GroupCreate, db: Session = Depends(get_db)):
+    return await async_crud.create_group(db, group)
 
 @router.get("/", response_model=List[schemas.Group])
-def read_groups(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_groups(db, skip=skip, limit=limit)
+async def read_groups(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    rows = await async_crud.get_groups(db, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(request, response, rows, limit)
+    return rows
 
 @router.get("/{group_id}", response_model=schemas.Group)
-def read_group(group_id: str, db: Session = Depends(get_db)):
-    db_group = crud.get_group(db, group_id=group_id)
+async def read_group(request: Request, group_id: str, db: Session = Depends(get_db)):
+    """Cached until the group, its goals or its members' focus minutes change"""
+    async def render():
+        db_group = await async_crud.get_group(db, group_id=group_id)
+        if db_group is None:
+            raise HTTPException(status_code=404, detail="Group not found")
+        with timed("serialize"):
+            return schemas.Group.model_validate(db_group).model_dump_json().encode(), None
+    return await serve_cached(request, "group", group_id, render)
+
+async def _member_ids(db, group_id: str):
+    db_group = await async_crud.get_group(db, group_id=group_id)
     if db_group is None:
+        return None
+    member_ids = [member.id for member in db_group.members]
+    # Feeds stay open for minutes: end the read-only transaction so its connection goes back to the pool
+    await run_db(db, lambda session: session.rollback())
+    return member_ids
+
+@router.get("/{group_id}/feed")
+async def read_group_feed(group_id: str, db: Session = Depends(get_db)):
+    """Server-Sent Events stream of the group's goal, focus session and XP activity"""
+    member_ids = await _member_ids(db, group_id)
+    if member_ids is None:
         raise HTTPException(status_code=404, detail="Group not found")
-    return db_group
+    subscription = group_feed.subscribe(group_id, member_ids)
+    return StreamingResponse(
+        sse_events(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/{group_id}/feed/ws")
+async def group_feed_websocket(websocket: WebSocket, group_id: str, db: Session = Depends(get_db)):
+    """Same events as the SSE feed, one JSON message each"""
+    member_ids = await _member_ids(db, group_id)
+    if member_ids is None:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Group not found")
+    await websocket.accept()
+    await websocket_events(websocket, group_feed.subscribe(group_id, member_ids))
 
 @router.put("/{group_id}", response_model=schemas.Group)
-def update_group(group_id: str, group: schemas.GroupUpdate, db: Session = Depends(get_db)):
-    db_group = crud.get_group(db, group_id=group_id)
+async def update_group(group_id: str, group: schemas.GroupUpdate, db: Session = Depends(get_db)):
+    db_group = await async_crud.update_group(db, group_id, group)
     if db_group is None:
         raise HTTPException(status_code=404, detail="Group not found")
-    return crud.update_group(db, group_id, group)
+    return db_group
 
 @router.delete("/{group_id}", response_model=schemas.Group)
-def delete_group(group_id: str, db: Session = Depends(get_db)):
-    db_group = crud.get_group(db, group_id=group_id)
+async def delete_group(group_id: str, db: Session = Depends(get_db)):
+    db_group = await async_crud.delete_group(db, group_id)
     if db_group is None:
         raise HTTPException(status_code=404, detail="Group not found")
-    return crud.delete_group(db, group_id)
+    return db_group
@@ -0,0 +1,71 @@
+from api import async_crud, auth, database, group_progress, replicas, schemas, utils, xp
+from api.cache import token_cache
+from api.database import POOL_CHECKOUT_SECONDS, POOL_CHECKOUT_TIMEOUTS, get_db
+from api.feed import group_feed
+from api.instrumentation import InstrumentedRoute
+from api.response_cache import response_cache
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+router = APIRouter(prefix="/internal", tags=["internal"], route_class=InstrumentedRoute)
+
+@router.get("/db-pool")
+async def read_db_pool():
+    """Connection pool usage, checkout latency histograms and replica health"""
+    return {
+        "pools": database.pool_statuses(),
+        "replicas": replicas.replica_statuses(),
+        "checkout_seconds": POOL_CHECKOUT_SECONDS.snapshot(),
+        "checkout_timeouts": POOL_CHECKOUT_TIMEOUTS.snapshot(),
+    }
+
+@router.get("/password-hasher")
+async def read_password_hasher():
+    """bcrypt worker pool saturation, latency and queue wait"""
+    return {
+        "executor": utils.PASSWORD_HASH_EXECUTOR,
+        "workers": utils.PASSWORD_HASH_WORKERS,
+        "max_queue": utils.PASSWORD_HASH_MAX_QUEUE,
+        "in_flight": utils.PASSWORD_HASH_IN_FLIGHT.value(),
+        "rejected": utils.PASSWORD_HASH_REJECTED.snapshot(),
+        "hash_seconds": utils.PASSWORD_HASH_SECONDS.snapshot(),
+        "queue_wait_seconds": utils.PASSWORD_HASH_QUEUE_WAIT_SECONDS.snapshot(),
+    }
+
+@router.get("/auth-cache")
+async def read_auth_cache():
+    """Token cache hit/miss counters and size"""
+    return token_cache.stats()
+
+@router.get("/response-cache")
+async def read_response_cache():
+    """Cached GET responses: hit/miss counters per namespace and size"""
+    return response_cache.stats()
+
+@router.get("/xp-buffer")
+async def read_xp_buffer():
+    """XP write-behind backlog and flush latency"""
+    return {
+        "enabled": xp.xp_buffer is not None,
+        "journal": xp.XP_JOURNAL_DIR if xp.xp_buffer is not None else None,
+        "pending_users": xp.XP_PENDING_USERS.value(),
+        "awards": xp.XP_AWARDS.snapshot(),
+        "flush_seconds": xp.XP_FLUSH_SECONDS.snapshot(),
+    }
+
+@router.get("/group-feed")
+async def read_group_feed():
+    """Feed subscribers on this worker, their deepest backlog and overflow disconnects"""
+    return group_feed.stats()
+
+@router.post("/groups/{group_id}/reconcile")
+async def reconcile_group(
+    group_id: str,
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(auth.get_current_active_user)
+):
+    """Recompute one group's progress counters now (requires authentication)"""
+    drifted = await async_crud.reconcile_group_progress(db, [group_id])
+    if drifted:
+        group_progress.GROUP_PROGRESS_DRIFT.inc(len(drifted))
+    return {"group_id": group_id, "repaired": bool(drifted)}
@@ -0,0 +1,59 @@
+from typing import List, Literal, Optional
+
+from api import async_crud, auth, schemas
+from api.instrumentation import InstrumentedRoute
+from api.leaderboard import leaderboard
+from api.replicas import get_read_db
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+router = APIRouter(prefix="/leaderboards", tags=["leaderboards"], route_class=InstrumentedRoute)
+
+Metric = Literal["xp", "streak"]
+Window = Optional[Literal["day", "week"]]
+
+def _check_window(metric: str, window: Optional[str]):
+    if window is not None and metric != "xp":
+        raise HTTPException(status_code=400, detail="Time windows are only tracked for xp")
+
+@router.get("/{metric}", response_model=List[schemas.LeaderboardEntry])
+async def read_leaderboard(metric: Metric, window: Window = None, limit: int = Query(10, ge=1, le=1000)):
+    """Global top players by XP or streak; window=day|week ranks XP earned in the current UTC day/ISO week"""
+    _check_window(metric, window)
+    return leaderboard.top(metric, limit, window=window)
+
+@router.get("/{metric}/me", response_model=schemas.LeaderboardEntry)
+async def read_my_rank(
+    metric: Metric,
+    window: Window = None,
+    current_user: schemas.User = Depends(auth.get_current_active_user)
+):
+    """Rank of the authenticated user (requires authentication)"""
+    _check_window(metric, window)
+    entry = leaderboard.rank(metric, current_user.id, window=window)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="User not ranked")
+    return entry
+
+@router.get("/{metric}/users/{user_id}", response_model=schemas.LeaderboardEntry)
+async def read_user_rank(metric: Metric, user_id: str, window: Window = None):
+    _check_window(metric, window)
+    entry = leaderboard.rank(metric, user_id, window=window)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="User not ranked")
+    return entry
+
+@router.get("/{metric}/groups/{group_id}", response_model=List[schemas.LeaderboardEntry])
+async def read_group_leaderboard(
+    metric: Metric,
+    group_id: str,
+    window: Window = None,
+    limit: int = Query(10, ge=1, le=1000),
+    db: Session = Depends(get_read_db)
+):
+    """Top members of a group, ranked among themselves"""
+    _check_window(metric, window)
+    db_group = await async_crud.get_group(db, group_id=group_id)
+    if db_group is None:
+        raise HTTPException(status_code=404, detail="Group not found")
+    return leaderboard.top_among(metric, [member.id for member in db_group.members], limit, window=window)
@@ -0,0 +1,31 @@
+from api import async_crud, auth, schemas
+from api.database import get_db
+from api.instrumentation import InstrumentedRoute, timed
+from api.response_cache import dashboard_cache, response_cache, serve_cached
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.orm import Session
+
+router = APIRouter(prefix="/me", tags=["me"], route_class=InstrumentedRoute)
+
+@router.get("/dashboard", response_model=schemas.Dashboard)
+async def read_dashboard(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(auth.get_current_active_user)
+):
+    """User, group, active goals, recent sessions, exploration and achievements in one request.
+
+    Cached per user until one of their writes commits; the group section is
+    cached under the group's version, so it is as fresh as GET /groups/{id}.
+    """
+    group_id = current_user.group_id
+    group_version = response_cache.token("group", group_id) if group_id else None
+
+    async def render():
+        sections = await async_crud.get_dashboard(db, current_user.id, group_id)
+        with timed("serialize"):
+            dashboard = schemas.Dashboard.model_validate({"user": current_user, **sections}, from_attributes=True)
+            return dashboard.model_dump_json().encode(), None
+    return await serve_cached(
+        request, "dashboard", current_user.id, render, cache=dashboard_cache, variant=group_version
+    )
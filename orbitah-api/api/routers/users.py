@@ -1,43 +1,78 @@
-from typing import List
+from typing import List, Optional
 
-from api import auth, crud, schemas
+from api import async_crud, auth, models, schemas, utils, xp
 from api.database import get_db
-from fastapi import APIRouter, Depends, HTTPException, status
+from api.instrumentation import InstrumentedRoute, timed
+from api.multi_get import in_order, query_ids, unique_ids
+from api.pagination import set_next_cursor
+from api.replicas import get_read_db
+from api.serialization import JSONBytesResponse, RowSerializer
+from fastapi import (APIRouter, Depends, HTTPException, Request, Response,
+                     status)
 from sqlalchemy.orm import Session
 
-router = APIRouter(prefix="/users", tags=["users"])
+router = APIRouter(prefix="/users", tags=["users"], route_class=InstrumentedRoute)
+
+# Only the UserResponse columns are selected, so hashed_password is never read
+UserRows = RowSerializer(schemas.UserResponse, models.User)
 
 @router.post("/", response_model=schemas.UserResponse)
-def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = crud.get_user_by_email(db, email=user.email)
+async def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
+    db_user = await async_crud.get_user_by_email(db, email=user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
-    return crud.create_user(db, user)
+    hashed_password = await utils.get_password_hash_async(user.password)
+    return await async_crud.create_user(db, user, hashed_password=hashed_password)
 
 @router.get("/", response_model=List[schemas.UserResponse])
-def read_users(
+async def read_users(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
     current_user: schemas.User = Depends(auth.get_current_active_user)
 ):
     """Get all users (requires authentication)"""
-    return crud.get_users(db, skip=skip, limit=limit)
+    rows = await async_crud.get_users(db, skip=skip, limit=limit, cursor=cursor, columns=UserRows.columns)
+    with timed("serialize"):
+        response = JSONBytesResponse(UserRows.dump(rows))
+    set_next_cursor(request, response, rows, limit)
+    return response
+
+@router.get("/by_ids", response_model=schemas.MultiGetResult[schemas.UserResponse])
+async def read_users_by_ids(
+    ids: List[str] = Depends(query_ids),
+    db: Session = Depends(get_read_db),
+    current_user: schemas.User = Depends(auth.get_current_active_user)
+):
+    """Users for ``?ids=a,b,c`` in one query and in that order; unknown ids are listed in ``missing`` (requires authentication)"""
+    return in_order(await async_crud.get_users_by_ids(db, ids), ids)
+
+@router.post("/by_ids", response_model=schemas.MultiGetResult[schemas.UserResponse])
+async def read_users_by_id_list(
+    batch: schemas.IdList,
+    db: Session = Depends(get_read_db),
+    current_user: schemas.User = Depends(auth.get_current_active_user)
+):
+    """Same as ``GET /users/by_ids``, for id lists too long for a URL"""
+    ids = unique_ids(batch.ids)
+    return in_order(await async_crud.get_users_by_ids(db, ids), ids)
 
 @router.get("/{user_id}", response_model=schemas.UserResponse)
-def read_user(
+async def read_user(
     user_id: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: schemas.User = Depends(auth.get_current_active_user)
 ):
     """Get user by ID (requires authentication)"""
-    db_user = crud.get_user(db, user_id=user_id)
+    db_user = await async_crud.get_user(db, user_id=user_id)
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return db_user
 
 @router.put("/{user_id}", response_model=schemas.UserResponse)
-def update_user(
+async def update_user(
     user_id: str,
     user: schemas.UserUpdate,
     db: Session = Depends(get_db),
@@ -46,13 +81,13 @@ def update_user(
     """Update user (requires authentication and can only update own profile)"""
     if current_user.id != user_id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
-    db_user = crud.get_user(db, user_id=user_id)
+    db_user = await async_crud.update_user(db, user_id, user)
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
-    return crud.update_user(db, user_id, user)
+    return db_user
 
 @router.delete("/{user_id}", response_model=schemas.UserResponse)
-def delete_user(
+async def delete_user(
     user_id: str,
     db: Session = Depends(get_db),
     current_user: schemas.User = Depends(auth.get_current_active_user)
@@ -60,7 +95,36 @@ def delete_user(
     """Delete user (requires authentication and can only delete own account)"""
     if current_user.id != user_id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
-    db_user = crud.get_user(db, user_id=user_id)
+    db_user = await async_crud.delete_user(db, user_id)
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
-    return crud.delete_user(db, user_id)
+    return db_user
+
+@router.post("/{user_id}/xp", response_model=schemas.XPAwardResult)
+async def award_xp(
+    user_id: str,
+    award: schemas.XPAward,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(auth.get_current_active_user)
+):
+    """Add XP atomically (requires authentication, can only award own account, at most XP_AWARD_MAX).
+
+    With XP_WRITE_BEHIND the award is buffered and answered with 202; the
+    buffered total is applied by the next flush.
+    """
+    if current_user.id != user_id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    if award.amount > xp.XP_AWARD_MAX:
+        raise HTTPException(status_code=422, detail=f"amount can be at most {xp.XP_AWARD_MAX}")
+    if xp.xp_buffer is not None:
+        if await async_crud.get_user(db, user_id=user_id) is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        pending = await xp.xp_buffer.add_async(user_id, award.amount)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {"user_id": user_id, "awarded": award.amount, "experience_points": None, "pending": pending}
+    total = await async_crud.award_xp(db, user_id, award.amount)
+    if total is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    xp.XP_AWARDS.inc(path="direct")
+    return {"user_id": user_id, "awarded": award.amount, "experience_points": total, "pending": 0}
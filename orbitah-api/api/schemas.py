@@ -1,7 +1,10 @@
 from datetime import date, datetime
-from typing import List, Optional, Union
+from typing import Any, Generic, List, Optional, TypeVar, Union
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
+
+
+ItemT = TypeVar("ItemT")
 
 
 class UserBase(BaseModel):
@@ -29,10 +32,26 @@ class UserUpdate(BaseModel):
     focus_preference: Optional[str] = None
     group_id: Optional[str] = None
     current_location: Optional[str] = None
-    experience_points: Optional[int] = None
     rank: Optional[str] = None
     streak_days: Optional[int] = None
 
+    @model_validator(mode="before")
+    @classmethod
+    def no_experience_points(cls, data):
+        # A read-modify-write of the total would lose concurrent awards; XP only changes through awards
+        if isinstance(data, dict) and "experience_points" in data:
+            raise ValueError("experience_points can't be set directly; use POST /users/{user_id}/xp")
+        return data
+
+class XPAward(BaseModel):
+    amount: int = Field(..., gt=0)
+
+class XPAwardResult(BaseModel):
+    user_id: str
+    awarded: int
+    experience_points: Optional[int] = None  # None while the award is buffered
+    pending: int = 0
+
 class User(UserBase):
     id: str
     class Config:
@@ -71,7 +90,6 @@ class GroupBase(BaseModel):
     code: str
     ship_type: Optional[str] = None
     motto: Optional[str] = None
-    progress: Optional[float] = 0.0
 
 class GroupCreate(GroupBase):
     pass
@@ -81,12 +99,23 @@ class GroupUpdate(BaseModel):
     code: Optional[str] = None
     ship_type: Optional[str] = None
     motto: Optional[str] = None
-    progress: Optional[float] = None
 
 class Group(GroupBase):
     id: str
+    # Maintained by the server from the group's goals and members' focus sessions
+    progress: float = 0.0
+    goals_total: int = 0
+    goals_completed: int = 0
+    focus_minutes: int = 0
     members: List[str] = []
     shared_goals: List[str] = []
+
+    @field_validator("members", "shared_goals", mode="before")
+    @classmethod
+    def related_ids(cls, value):
+        # ORM collections hold User/Goal rows; the API exposes their ids
+        return [getattr(item, "id", item) for item in value or []]
+
     class Config:
         from_attributes = True
 
@@ -150,6 +179,12 @@ class ExplorationState(ExplorationStateBase):
     class Config:
         from_attributes = True
 
+class LocationUnlock(BaseModel):
+    location: str
+
+class AchievementUnlock(BaseModel):
+    achievement: str
+
 class AchievementBase(BaseModel):
     code: str
     name: str
@@ -193,3 +228,46 @@ class FocusSession(FocusSessionBase):
     id: str
     class Config:
         from_attributes = True
+
+class FocusSessionBulkItem(FocusSessionCreate):
+    idempotency_key: Optional[str] = None
+
+class FocusSessionBulkItemResult(BaseModel):
+    index: int
+    status: str  # "created", "duplicate" or "error"
+    id: Optional[str] = None
+    errors: Optional[List[Any]] = None
+
+class FocusSessionBulkResult(BaseModel):
+    created: int
+    duplicates: int
+    failed: int
+    results: List[FocusSessionBulkItemResult]
+
+class FocusStatsBucket(BaseModel):
+    bucket: str  # ISO day, ISO date of the week's Monday, or method name
+    minutes: int
+    sessions: int
+
+class LeaderboardEntry(BaseModel):
+    user_id: str
+    rank: int
+    score: int
+
+class Dashboard(BaseModel):
+    """Everything the dashboard page shows, in one response"""
+    user: UserResponse
+    group: Optional[Group] = None
+    active_goals: List[Goal] = []
+    recent_sessions: List[FocusSession] = []
+    exploration: Optional[ExplorationState] = None
+    # Definitions of the achievements the user has unlocked
+    achievements: List[Achievement] = []
+
+class IdList(BaseModel):
+    ids: List[str]
+
+class MultiGetResult(BaseModel, Generic[ItemT]):
+    """Rows of a multi-get in the requested order, plus the ids that matched nothing"""
+    items: List[ItemT]
+    missing: List[str] = []
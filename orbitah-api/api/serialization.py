@@ -0,0 +1,51 @@
+"""Fast path for large list responses: selected columns straight to JSON bytes.
+
+The default path builds an ORM instance per row (identity map, instance
+state), validates each one into the response schema with ``from_attributes``
+and only then encodes it. List endpoints instead select just the columns the
+schema exposes, turn the plain row tuples into dicts shaped like the schema
+and encode them in one call.
+"""
+from typing import List
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from sqlalchemy import inspect
+
+try:
+    import orjson
+except ImportError:  # optional; pydantic-core encodes the rows instead
+    orjson = None
+
+
+class JSONBytesResponse(Response):
+    """A body that is already encoded JSON, returned without FastAPI re-validating or re-encoding it."""
+    media_type = "application/json"
+
+
+class RowSerializer:
+    """Encodes rows of ``model`` columns as a JSON array of ``schema`` objects.
+
+    Pass ``columns`` to the crud list function, then ``dump`` the rows it
+    returns. Schema fields that are not columns get their schema default.
+    Without orjson the rows are validated and encoded by a list
+    ``TypeAdapter`` built once here.
+    """
+
+    def __init__(self, schema, model):
+        mapper_columns = inspect(model).columns
+        self.columns = [getattr(model, name) for name in schema.model_fields if name in mapper_columns]
+        self._keys = [column.key for column in self.columns]
+        # Schema field order, so the output matches what the schema itself would encode
+        self._template = {name: field.get_default(call_default_factory=True) for name, field in schema.model_fields.items()}
+        self.adapter = TypeAdapter(List[schema])
+
+    def dicts(self, rows) -> List[dict]:
+        template, keys = self._template, self._keys
+        return [{**template, **dict(zip(keys, row))} for row in rows]
+
+    def dump(self, rows) -> bytes:
+        items = self.dicts(rows)
+        if orjson is not None:
+            return orjson.dumps(items)
+        return self.adapter.dump_json(self.adapter.validate_python(items))
@@ -1,9 +1,92 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
+from .instrumentation import timed
+from .metrics import Counter, Gauge, Histogram
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt runs in a dedicated pool so login storms can't starve request handling.
+# "process" sidesteps the GIL; "thread" is cheaper to start (tests, small hosts).
+PASSWORD_HASH_EXECUTOR = os.environ.get("PASSWORD_HASH_EXECUTOR", "process")
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 2)))
+# Calls allowed to wait for a free worker before new ones are rejected with 503
+PASSWORD_HASH_MAX_QUEUE = int(os.environ.get("PASSWORD_HASH_MAX_QUEUE", str(PASSWORD_HASH_WORKERS * 8)))
+
+PASSWORD_HASH_SECONDS = Histogram("password_hash_seconds", "bcrypt CPU time per call")
+PASSWORD_HASH_QUEUE_WAIT_SECONDS = Histogram(
+    "password_hash_queue_wait_seconds", "Time a bcrypt call waited for a free worker"
+)
+PASSWORD_HASH_IN_FLIGHT = Gauge("password_hash_in_flight", "bcrypt calls running or queued")
+PASSWORD_HASH_REJECTED = Counter("password_hash_rejected_total", "bcrypt calls rejected while saturated")
+
+_executor = None
+_executor_lock = threading.Lock()
+_in_flight = 0
+
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password):
     return pwd_context.hash(password)
+
+def _timed(fn, *args):
+    # Runs in the worker; wall-clock stamps are comparable across processes
+    started = time.time()
+    result = fn(*args)
+    return result, started, time.time()
+
+def get_password_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            if PASSWORD_HASH_EXECUTOR == "thread":
+                _executor = ThreadPoolExecutor(PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+            else:
+                _executor = ProcessPoolExecutor(PASSWORD_HASH_WORKERS)
+        return _executor
+
+def shutdown_password_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+async def _run_bounded(op, fn, *args):
+    global _in_flight
+    with _executor_lock:
+        if _in_flight >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_QUEUE:
+            PASSWORD_HASH_REJECTED.inc(op=op)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent password operations, retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        _in_flight += 1
+        PASSWORD_HASH_IN_FLIGHT.set(_in_flight)
+    submitted = time.time()
+    try:
+        loop = asyncio.get_running_loop()
+        with timed("bcrypt"):
+            result, started, finished = await loop.run_in_executor(get_password_executor(), _timed, fn, *args)
+    finally:
+        with _executor_lock:
+            _in_flight -= 1
+            PASSWORD_HASH_IN_FLIGHT.set(_in_flight)
+    PASSWORD_HASH_QUEUE_WAIT_SECONDS.observe(max(started - submitted, 0.0), op=op)
+    PASSWORD_HASH_SECONDS.observe(finished - started, op=op)
+    return result
+
+# bcrypt is CPU-bound; async handlers must never run it on the event loop
+async def verify_password_async(plain_password, hashed_password):
+    return await _run_bounded("verify", verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password):
+    return await _run_bounded("hash", get_password_hash, password)
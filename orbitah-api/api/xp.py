@@ -0,0 +1,251 @@
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import suppress
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from . import crud
+from .database import SessionLocal
+from .leaderboard import leaderboard
+from .metrics import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+# Largest single award a client may claim through POST /users/{user_id}/xp
+XP_AWARD_MAX = int(os.environ.get("XP_AWARD_MAX", "100"))
+# Merge awards in memory and apply them in batches instead of one UPDATE + commit each
+XP_WRITE_BEHIND = os.environ.get("XP_WRITE_BEHIND", "false").lower() in ("1", "true", "yes")
+# Seconds between flushes; also the most unflushed XP a crash can lose without a journal
+XP_FLUSH_INTERVAL = float(os.environ.get("XP_FLUSH_INTERVAL", "1.0"))
+# Flush early once this many users have pending awards
+XP_FLUSH_MAX_USERS = int(os.environ.get("XP_FLUSH_MAX_USERS", "1000"))
+# Directory for an append-only award journal; awards are replayed from it after a crash
+XP_JOURNAL_DIR = os.environ.get("XP_JOURNAL_DIR")
+# fsync every journaled award (survives power loss) or leave it to the OS (survives process crashes)
+XP_JOURNAL_FSYNC = os.environ.get("XP_JOURNAL_FSYNC", "true").lower() in ("1", "true", "yes")
+
+XP_AWARDS = Counter("xp_awards_total", "XP awards by path (direct/buffered)")
+XP_PENDING_USERS = Gauge("xp_pending_users", "Users with buffered, unflushed XP")
+XP_FLUSH_SECONDS = Histogram("xp_flush_seconds", "Time to apply one write-behind batch")
+
+# Each process appends to its own <pid>-<id>.jsonl and holds an flock on it while it is live
+JOURNAL_SUFFIX = ".jsonl"
+BATCH_SUFFIX = ".batch"
+# Applied batch ids are kept this long to recognise replays
+BATCH_RETENTION = timedelta(days=7)
+
+
+def _is_file(path: str, handle) -> bool:
+    """Whether ``path`` still names the file ``handle`` has open."""
+    try:
+        return os.path.samestat(os.stat(path), os.fstat(handle.fileno()))
+    except FileNotFoundError:
+        return False
+
+
+class XPWriteBehind:
+    """Per-user XP deltas merged in memory and flushed as one batch per interval.
+
+    Without a journal, awards accepted since the last flush are lost if the
+    process dies (a clean shutdown flushes). With ``journal_dir`` each award is
+    appended to a journal before it is acknowledged; a flush seals the journal
+    into ``<batch id>.batch`` and the batch id is committed with the updates,
+    so replaying journals after a crash applies every award exactly once.
+    Workers can share ``journal_dir``: each one writes its own journal and
+    recovery skips journals another live process still holds.
+    """
+
+    def __init__(self, journal_dir: Optional[str] = None, fsync: bool = True, max_users: int = XP_FLUSH_MAX_USERS):
+        self.journal_dir = journal_dir
+        self.fsync = fsync
+        self.max_users = max_users
+        self._pending: Dict[str, int] = {}
+        self._failed = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._journal = None
+        self._journal_path = None
+        self.wakeup = asyncio.Event()
+        if journal_dir:
+            os.makedirs(journal_dir, exist_ok=True)
+
+    def _open_journal(self):
+        while self._journal is None:
+            path = os.path.join(self.journal_dir, f"{os.getpid()}-{uuid.uuid4().hex}{JOURNAL_SUFFIX}")
+            journal = open(path, "a")
+            fcntl.flock(journal.fileno(), fcntl.LOCK_EX)
+            # Another worker's recovery may have sealed the new file before the lock was taken
+            if _is_file(path, journal):
+                self._journal, self._journal_path = journal, path
+            else:
+                journal.close()
+        return self._journal
+
+    def _close_journal(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = self._journal_path = None
+
+    def _append(self, user_id: str, amount: int):
+        with self._lock:
+            if self.journal_dir:
+                journal = self._open_journal()
+                journal.write(json.dumps([user_id, amount]) + "\n")
+                journal.flush()
+                if self.fsync:
+                    os.fsync(journal.fileno())
+            pending = self._pending[user_id] = self._pending.get(user_id, 0) + amount
+            size = len(self._pending)
+        XP_AWARDS.inc(path="buffered")
+        XP_PENDING_USERS.set(size)
+        leaderboard.award_xp(user_id, amount)
+        return pending, size
+
+    def add(self, user_id: str, amount: int) -> int:
+        """Buffer an award; returns the user's pending total."""
+        pending, size = self._append(user_id, amount)
+        if size >= self.max_users:
+            self.wakeup.set()
+        return pending
+
+    async def add_async(self, user_id: str, amount: int) -> int:
+        """``add`` for request handlers: the journal write and fsync run in the threadpool."""
+        pending, size = await run_in_threadpool(self._append, user_id, amount)
+        # wakeup is an asyncio.Event, so it is only set from the loop
+        if size >= self.max_users:
+            self.wakeup.set()
+        return pending
+
+    def pending(self, user_id: str) -> int:
+        with self._lock:
+            return self._pending.get(user_id, 0)
+
+    def _seal(self):
+        """Swap out the pending awards, sealing the journal into a batch file.
+
+        The awards stay pending if the journal can't be sealed.
+        """
+        with self._lock:
+            batch_id = None
+            if self._pending and self._journal is not None:
+                batch_id = uuid.uuid4().hex
+                os.rename(self._journal_path, os.path.join(self.journal_dir, batch_id + BATCH_SUFFIX))
+                self._close_journal()
+            awards, self._pending = self._pending, {}
+        XP_PENDING_USERS.set(0)
+        return batch_id, awards
+
+    def _apply(self, db, batch_id, awards):
+        start = time.perf_counter()
+        crud.apply_xp_batch(db, awards, batch_id=batch_id)
+        XP_FLUSH_SECONDS.observe(time.perf_counter() - start)
+        if batch_id is not None:
+            # Another worker's recovery may have replayed (and removed) it already
+            with suppress(FileNotFoundError):
+                os.remove(os.path.join(self.journal_dir, batch_id + BATCH_SUFFIX))
+
+    def flush(self, db) -> int:
+        """Apply everything buffered so far; returns the number of users updated.
+
+        A batch that fails is retried as-is (same batch id) on the next flush.
+        """
+        with self._flush_lock:
+            sealed = self._seal()
+            batches, self._failed = self._failed, []
+            batches.append(sealed)
+            flushed = 0
+            for batch_id, awards in batches:
+                if not awards:
+                    continue
+                try:
+                    self._apply(db, batch_id, awards)
+                    flushed += len(awards)
+                except Exception:
+                    db.rollback()
+                    logger.exception("xp flush failed; %d users will be retried", len(awards))
+                    self._failed.append((batch_id, awards))
+            return flushed
+
+    def recover(self, db) -> int:
+        """Replay journals left by a previous process; returns the number of batches applied."""
+        if not self.journal_dir:
+            return 0
+        with self._lock:
+            self._close_journal()
+        for name in os.listdir(self.journal_dir):
+            if name.endswith(JOURNAL_SUFFIX):
+                self._seal_orphan(os.path.join(self.journal_dir, name))
+        applied = 0
+        for name in sorted(os.listdir(self.journal_dir)):
+            if not name.endswith(BATCH_SUFFIX):
+                continue
+            awards = {}
+            try:
+                with open(os.path.join(self.journal_dir, name)) as journal:
+                    for line in journal:
+                        try:
+                            user_id, amount = json.loads(line)
+                        except ValueError:
+                            # A torn last line: that award was never acknowledged
+                            continue
+                        awards[user_id] = awards.get(user_id, 0) + amount
+            except FileNotFoundError:
+                continue
+            batch_id = name[:-len(BATCH_SUFFIX)]
+            applied += crud.apply_xp_batch(db, awards, batch_id=batch_id)
+            with suppress(FileNotFoundError):
+                os.remove(os.path.join(self.journal_dir, name))
+        crud.prune_xp_award_batches(db, datetime.utcnow() - BATCH_RETENTION)
+        return applied
+
+    def _seal_orphan(self, path: str):
+        """Turn the journal of a dead process into a batch; journals still locked by a live one are skipped."""
+        try:
+            journal = open(path)
+        except FileNotFoundError:
+            return
+        with journal:
+            try:
+                fcntl.flock(journal.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return
+            # Sealed by someone else between listdir and the lock
+            if _is_file(path, journal):
+                os.rename(path, os.path.join(self.journal_dir, uuid.uuid4().hex + BATCH_SUFFIX))
+
+    def close(self):
+        with self._lock:
+            self._close_journal()
+
+
+def flush_xp_buffer():
+    with SessionLocal() as db:
+        return xp_buffer.flush(db)
+
+def recover_xp_journal():
+    with SessionLocal() as db:
+        return xp_buffer.recover(db)
+
+async def run_xp_flusher(interval: float = XP_FLUSH_INTERVAL):
+    """Flush the write-behind buffer every ``interval`` seconds, or sooner when it fills up."""
+    while True:
+        try:
+            await asyncio.wait_for(xp_buffer.wakeup.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+        xp_buffer.wakeup.clear()
+        try:
+            await asyncio.to_thread(flush_xp_buffer)
+        except Exception:
+            logger.exception("xp flush failed")
+
+
+xp_buffer = XPWriteBehind(XP_JOURNAL_DIR, fsync=XP_JOURNAL_FSYNC) if XP_WRITE_BEHIND else None
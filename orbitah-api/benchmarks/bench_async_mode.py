@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Compare requests per second of the sync (threadpool) and async database modes.
+
+Each mode boots its own uvicorn process against a fresh database, seeds a few
+rows and is then driven by the same concurrent httpx load for a fixed time.
+
+    python benchmarks/bench_async_mode.py --concurrency 200 --duration 15
+    python benchmarks/bench_async_mode.py --database-url postgresql+psycopg2://...
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+import httpx
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_server(mode, database_url, port):
+    env = {
+        **os.environ,
+        "SQLALCHEMY_DATABASE_URL": database_url,
+        "ASYNC_DB_ENABLED": "true" if mode == "async" else "false",
+    }
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.main:app",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=API_DIR, env=env,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/").status_code == 200:
+                return proc
+        except httpx.TransportError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError(f"{mode} server did not start on port {port}")
+
+
+def seed(base_url, goals):
+    suffix = uuid.uuid4().hex[:8]
+    user = {"username": f"bench_{suffix}", "email": f"bench_{suffix}@example.com", "password": "benchpassword"}
+    with httpx.Client(base_url=base_url) as client:
+        user_id = client.post("/auth/register", json=user).json()["id"]
+        token = client.post("/auth/login", json={"email": user["email"], "password": user["password"]}).json()["access_token"]
+        for i in range(goals):
+            client.post("/goals/", json={"title": f"Goal {i}", "type": "personal", "status": "active", "creator_id": user_id})
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def drive(base_url, headers, concurrency, duration):
+    paths = ["/goals/?limit=20", "/users/?limit=20", "/auth/me"]
+    latencies = []
+    errors = 0
+    stop_at = time.perf_counter() + duration
+
+    async def worker(n):
+        nonlocal errors
+        i = n
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            response = await client.get(paths[i % len(paths)], headers=headers)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+            i += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="sync SQLAlchemy URL; defaults to a temporary SQLite file per mode")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--goals", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for offset, mode in enumerate(("sync", "async")):
+            database_url = args.database_url or f"sqlite:///{tmp}/bench_{mode}.db"
+            port = args.port + offset
+            proc = start_server(mode, database_url, port)
+            try:
+                base_url = f"http://127.0.0.1:{port}"
+                headers = seed(base_url, args.goals)
+                results[mode] = asyncio.run(drive(base_url, headers, args.concurrency, args.duration))
+            finally:
+                proc.terminate()
+                proc.wait()
+
+    print(f"{'mode':<6} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for mode, r in results.items():
+        print(f"{mode:<6} {r['requests']:>9} {r['errors']:>7} {r['rps']:>9.1f} {r['p50_ms']:>8.1f} {r['p99_ms']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Throughput and peak RSS of the streaming focus session export vs paging through the list endpoint.
+
+Seeds ``--rows`` focus sessions (10M by default; the database file is reused
+between runs), then exports all of them in a fresh subprocess per mode so each
+peak RSS is measured on its own:
+
+- ``ndjson`` / ``csv``: the body of ``GET /focus_sessions/export``
+- ``pages``: ``crud.get_focus_sessions`` cursor pages serialized through
+  ``schemas.FocusSession``, i.e. what a client walking ``GET /focus_sessions/`` costs
+
+    python benchmarks/bench_export.py
+    python benchmarks/bench_export.py --rows 1000000 --database-url postgresql+psycopg2://...
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from api import crud, models, schemas  # noqa: E402
+from api.database import Base  # noqa: E402
+from api.export import stream_export  # noqa: E402
+from api.pagination import encode_cursor  # noqa: E402
+
+MODES = ("ndjson", "csv", "pages")
+
+
+def seed(db, rows, batch=50000):
+    existing = db.query(func.count(models.FocusSession.id)).scalar()
+    started_at = datetime(2024, 1, 1)
+    user_ids = [str(uuid.uuid4()) for _ in range(100)]
+    for offset in range(existing, rows, batch):
+        db.execute(insert(models.FocusSession), [
+            {
+                "id": str(uuid.uuid4()),
+                "user_id": user_ids[i % len(user_ids)],
+                "method": "pomodoro",
+                "started_at": started_at + timedelta(minutes=i),
+                "duration": 25,
+            }
+            for i in range(offset, min(offset + batch, rows))
+        ])
+        db.commit()
+        print(f"  seeded {min(offset + batch, rows):,}/{rows:,}", end="\r", flush=True)
+    print()
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+async def export_stream(db, fmt):
+    response = stream_export(db, crud.focus_sessions_export_query(), fmt, "focus_sessions")
+    size = 0
+    async for chunk in response.body_iterator:
+        size += len(chunk)
+    return size
+
+
+def export_pages(db, limit=1000):
+    size, cursor = 0, None
+    while True:
+        rows = crud.get_focus_sessions(db, limit=limit, cursor=cursor)
+        size += sum(len(schemas.FocusSession.model_validate(row).model_dump_json()) + 1 for row in rows)
+        if len(rows) < limit:
+            return size
+        cursor = encode_cursor(rows[-1].id)
+        db.expunge_all()
+
+
+def run(database_url, mode):
+    """Child process: export everything once and print the measurements as JSON."""
+    db = sessionmaker(bind=create_engine(database_url))()
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    size = export_pages(db) if mode == "pages" else asyncio.run(export_stream(db, mode))
+    print(json.dumps({
+        "seconds": time.perf_counter() - start,
+        "megabytes": size / 1e6,
+        "peak_rss_mb": peak_rss_mb(),
+        "baseline_rss_mb": baseline,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///./bench_export.db")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--run", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        return run(args.database_url, args.run)
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        seed(db, args.rows)
+    engine.dispose()
+
+    print(f"{'mode':<8} {'seconds':>9} {'rows/s':>11} {'MB out':>9} {'peak RSS MB':>12} {'baseline MB':>12}")
+    for mode in args.modes:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--database-url", args.database_url, "--run", mode],
+            check=True, capture_output=True, text=True
+        ).stdout
+        result = json.loads(output.splitlines()[-1])
+        print(
+            f"{mode:<8} {result['seconds']:>9.1f} {args.rows / result['seconds']:>11,.0f} {result['megabytes']:>9,.0f}"
+            f" {result['peak_rss_mb']:>12.0f} {result['baseline_rss_mb']:>12.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
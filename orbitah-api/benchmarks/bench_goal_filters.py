@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Latency of filtered ``GET /goals/`` queries with and without the composite goal indexes.
+
+Seeds ``--rows`` goals (5M by default; the database file is reused between
+runs) spread over ``--users`` creators, then times ``crud.get_goals`` for a
+few typical filters, first with the ``ix_goals_*`` indexes dropped and then
+with them rebuilt.
+
+    python benchmarks/bench_goal_filters.py
+    python benchmarks/bench_goal_filters.py --rows 500000 --database-url postgresql+psycopg2://...
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from api import crud, models  # noqa: E402
+from api.database import Base  # noqa: E402
+
+STATUSES = ["active"] * 3 + ["completed"] * 6 + ["abandoned"]
+CATEGORIES = ["fitness", "study", "work", "health", "social", "creative", "finance", "travel"]
+FIRST_DUE = date(2024, 1, 1)
+
+
+def seed(db, rows, users, batch=50000):
+    user_ids = [row.id for row in db.query(models.User.id).limit(users)]
+    if len(user_ids) < users:
+        new_users = [
+            {"id": str(uuid.uuid4()), "username": f"bench_{i}", "email": f"bench_{i}@example.com"}
+            for i in range(len(user_ids), users)
+        ]
+        db.execute(insert(models.User), new_users)
+        db.commit()
+        user_ids += [user["id"] for user in new_users]
+
+    rng = random.Random(42)
+    existing = db.query(func.count(models.Goal.id)).scalar()
+    for offset in range(existing, rows, batch):
+        db.execute(insert(models.Goal), [
+            {
+                "id": str(uuid.uuid4()),
+                "title": f"goal {i}",
+                "type": "personal",
+                "status": rng.choice(STATUSES),
+                "creator_id": rng.choice(user_ids),
+                "category": rng.choice(CATEGORIES),
+                "due_date": FIRST_DUE + timedelta(days=rng.randrange(730)),
+            }
+            for i in range(offset, min(offset + batch, rows))
+        ])
+        db.commit()
+        print(f"  seeded {min(offset + batch, rows):,}/{rows:,}", end="\r", flush=True)
+    print()
+    return user_ids
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def goal_indexes():
+    return [index for index in models.Goal.__table__.indexes if index.name.startswith("ix_goals_")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///./bench_goals.db")
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    user_ids = seed(db, args.rows, args.users)
+
+    me = user_ids[0]
+    week = (date(2024, 6, 3), date(2024, 6, 9))
+    cases = {
+        "my active goals due this week": dict(creator_id=me, status="active", due_from=week[0], due_to=week[1]),
+        "my goals": dict(creator_id=me),
+        "active, due this week": dict(status="active", due_from=week[0], due_to=week[1]),
+        "active fitness goals": dict(category="fitness", status="active"),
+    }
+
+    results = {}
+    for label, create in (("no indexes", False), ("indexes", True)):
+        for index in goal_indexes():
+            index.drop(bind=engine, checkfirst=True)
+            if create:
+                index.create(bind=engine)
+        for name, filters in cases.items():
+            results.setdefault(name, {})[label] = timed(
+                lambda: crud.get_goals(db, limit=args.limit, **filters), args.repeat
+            )
+            db.expunge_all()
+
+    print(f"{'filter':<32} {'no indexes ms':>14} {'indexes ms':>11}")
+    for name, timings in results.items():
+        print(f"{name:<32} {timings['no indexes']:>14.2f} {timings['indexes']:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Page-N latency of offset vs keyset (cursor) pagination over focus sessions.
+
+Seeds ``--rows`` focus sessions (10M by default; the database file is reused
+between runs) and times ``crud.get_focus_sessions`` at increasing depths, once
+with ``skip`` and once with the cursor of the row just before that page.
+
+    python benchmarks/bench_keyset_pagination.py
+    python benchmarks/bench_keyset_pagination.py --rows 1000000 --database-url postgresql+psycopg2://...
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from api import crud, models  # noqa: E402
+from api.database import Base  # noqa: E402
+from api.pagination import encode_cursor  # noqa: E402
+
+
+def seed(db, rows, batch=50000):
+    existing = db.query(func.count(models.FocusSession.id)).scalar()
+    started_at = datetime(2024, 1, 1)
+    user_id = str(uuid.uuid4())
+    for offset in range(existing, rows, batch):
+        db.execute(insert(models.FocusSession), [
+            {
+                "id": str(uuid.uuid4()),
+                "user_id": user_id,
+                "method": "pomodoro",
+                "started_at": started_at + timedelta(minutes=i),
+                "duration": 25,
+            }
+            for i in range(offset, min(offset + batch, rows))
+        ])
+        db.commit()
+        print(f"  seeded {min(offset + batch, rows):,}/{rows:,}", end="\r", flush=True)
+    print()
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///./bench_pagination.db")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    seed(db, args.rows)
+
+    depths = [0] + [d for d in (10_000, 100_000, 1_000_000, 5_000_000, 9_000_000) if d < args.rows]
+    print(f"{'page depth':>12} {'offset ms':>10} {'cursor ms':>10}")
+    for depth in depths:
+        offset_ms = timed(lambda: crud.get_focus_sessions(db, skip=depth, limit=args.limit), args.repeat)
+        cursor = None
+        if depth:
+            # Id of the last row on the previous page, i.e. what the client got as next_cursor
+            before = crud.get_focus_sessions(db, skip=depth - 1, limit=1)[0].id
+            cursor = encode_cursor(before)
+        cursor_ms = timed(lambda: crud.get_focus_sessions(db, limit=args.limit, cursor=cursor), args.repeat)
+        print(f"{depth:>12,} {offset_ms:>10.2f} {cursor_ms:>10.2f}")
+        db.expunge_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Rows/sec of the list endpoints' serialization, ORM path vs column fast path.
+
+For each list router (users, goals, focus_sessions, achievements) times one
+page of ``--limit`` rows through the crud list function and into JSON bytes:
+
+- before: ORM instances validated into the schema with ``from_attributes``
+  and encoded by pydantic (what a ``response_model`` return does)
+- after: ``RowSerializer`` columns and ``dump`` (orjson when installed)
+- after, no orjson: the same rows through the precompiled list TypeAdapter
+
+    python benchmarks/bench_list_serialization.py
+    python benchmarks/bench_list_serialization.py --limit 100 --database-url postgresql+psycopg2://...
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from api import crud, models, schemas, serialization  # noqa: E402
+from api.database import Base  # noqa: E402
+from api.routers.achievements import AchievementRows  # noqa: E402
+from api.routers.focus_sessions import FocusSessionRows  # noqa: E402
+from api.routers.goals import GoalRows  # noqa: E402
+from api.routers.users import UserRows  # noqa: E402
+
+ROUTERS = [
+    ("users", models.User, schemas.UserResponse, crud.get_users, UserRows),
+    ("goals", models.Goal, schemas.Goal, crud.get_goals, GoalRows),
+    ("focus_sessions", models.FocusSession, schemas.FocusSession, crud.get_focus_sessions, FocusSessionRows),
+    ("achievements", models.Achievement, schemas.Achievement, crud.get_achievements, AchievementRows),
+]
+
+
+def seed_values(model, i, started_at):
+    if model is models.User:
+        return {"username": f"user{i}", "email": f"user{i}@example.com", "hashed_password": "x" * 60,
+                "experience_points": i, "streak_days": i % 30}
+    if model is models.Goal:
+        return {"title": f"Goal {i}", "description": "Read one chapter", "type": "personal", "status": "active",
+                "creator_id": "bench", "created_at": started_at + timedelta(minutes=i), "rewards_xp": 10}
+    if model is models.FocusSession:
+        return {"user_id": "bench", "method": "pomodoro", "started_at": started_at + timedelta(minutes=i), "duration": 25}
+    return {"code": f"achievement_{i}", "name": f"Achievement {i}", "description": "Earned", "xp_reward": 50}
+
+
+def seed(db, rows):
+    started_at = datetime(2024, 1, 1)
+    for _, model, *_ in ROUTERS:
+        existing = db.query(func.count(model.id)).scalar()
+        if existing < rows:
+            db.execute(insert(model), [
+                {"id": str(uuid.uuid4()), **seed_values(model, i, started_at)} for i in range(existing, rows)
+            ])
+    db.commit()
+
+
+def rows_per_sec(db, fn, rows, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+        db.expunge_all()
+    return rows / statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///./bench_serialization.db")
+    parser.add_argument("--limit", type=int, default=1000, help="rows per page")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    seed(db, args.limit)
+    orjson = serialization.orjson
+
+    print(f"{args.limit} rows per page; orjson {'installed' if orjson else 'not installed'}")
+    print(f"{'router':>16} {'before rows/s':>14} {'after rows/s':>13} {'no orjson':>10} {'speedup':>8}")
+    for name, _, schema, get_page, rows in ROUTERS:
+        adapter = rows.adapter
+
+        def before():
+            return adapter.dump_json(adapter.validate_python(get_page(db, limit=args.limit), from_attributes=True))
+
+        def after():
+            return rows.dump(get_page(db, limit=args.limit, columns=rows.columns))
+
+        before_rate = rows_per_sec(db, before, args.limit, args.repeat)
+        after_rate = rows_per_sec(db, after, args.limit, args.repeat)
+        serialization.orjson = None
+        try:
+            fallback_rate = rows_per_sec(db, after, args.limit, args.repeat)
+        finally:
+            serialization.orjson = orjson
+        print(f"{name:>16} {before_rate:>14,.0f} {after_rate:>13,.0f} {fallback_rate:>10,.0f} {after_rate / before_rate:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
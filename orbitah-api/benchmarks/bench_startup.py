@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Cold start to first response of ``uvicorn --workers N``.
+
+Starts the server against a database that is already migrated (the deploy
+step runs ``alembic upgrade head`` once, before any worker) and polls ``/``
+until it answers 200. ``--compare REF`` runs the same measurement on a
+``git worktree`` of another revision, e.g. the tree from before startup work
+moved into the lifespan hooks:
+
+    python benchmarks/bench_startup.py --workers 4
+    python benchmarks/bench_startup.py --workers 4 --compare HEAD~1
+    python benchmarks/bench_startup.py --database-url postgresql+psycopg2://... --compare HEAD~1
+"""
+
+import argparse
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+API_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def migrate(tree, database_url):
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"], cwd=tree, check=True, capture_output=True,
+        env={**os.environ, "SQLALCHEMY_DATABASE_URL": database_url}
+    )
+
+
+def cold_start(tree, database_url, workers, timeout) -> float:
+    port = free_port()
+    env = {**os.environ, "SQLALCHEMY_DATABASE_URL": database_url, "PYTHONDONTWRITEBYTECODE": "1"}
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.main:app", "--port", str(port), "--workers", str(workers),
+         "--log-level", "warning"],
+        cwd=tree, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"server in {tree} exited with {server.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError(f"no response from {tree} within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def measure(label, tree, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{tmp}/startup.db"
+        migrate(tree, database_url)
+        samples = [cold_start(tree, database_url, args.workers, args.timeout) for _ in range(args.repeat)]
+    print(f"{label:>12} median {statistics.median(samples) * 1000:8.0f} ms   min {min(samples) * 1000:8.0f} ms")
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--database-url", help="already-created database to start against (default: a fresh SQLite file)")
+    parser.add_argument("--compare", metavar="REF", help="git revision to measure the same way for comparison")
+    args = parser.parse_args()
+
+    print(f"uvicorn --workers {args.workers}, {args.repeat} cold starts each")
+    current = measure("this tree", API_ROOT, args)
+    if not args.compare:
+        return
+
+    repo = subprocess.run(["git", "rev-parse", "--show-toplevel"], cwd=API_ROOT, check=True,
+                          capture_output=True, text=True).stdout.strip()
+    worktree = tempfile.mkdtemp(prefix="bench-startup-")
+    subprocess.run(["git", "worktree", "add", "--detach", worktree, args.compare], cwd=repo, check=True,
+                   capture_output=True)
+    try:
+        before = measure(args.compare, os.path.join(worktree, os.path.relpath(API_ROOT, repo)), args)
+    finally:
+        subprocess.run(["git", "worktree", "remove", "--force", worktree], cwd=repo, capture_output=True)
+        shutil.rmtree(worktree, ignore_errors=True)
+    print(f"{'change':>12} {(before - current) * 1000:+8.0f} ms ({before / current:.2f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
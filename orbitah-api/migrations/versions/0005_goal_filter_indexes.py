@@ -0,0 +1,39 @@
+"""goal filter indexes
+
+Composite indexes behind the GET /goals/ filters. On PostgreSQL they are
+built CONCURRENTLY so a large goals table stays writable meanwhile.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 20:22:54.733448
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = (
+    ('ix_goals_creator_status_due_date', ['creator_id', 'status', 'due_date']),
+    ('ix_goals_status_due_date', ['status', 'due_date']),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            op.create_index(name, 'goals', columns, unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.drop_index(name, table_name='goals', postgresql_concurrently=True)
@@ -0,0 +1,43 @@
+"""association table indexes
+
+Indexes behind the group counter maintenance, which looks up user_group,
+group_goal and goal_user by either side on every goal and focus session
+write. On PostgreSQL they are built CONCURRENTLY so writes continue.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 22:05:12.418906
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, Sequence[str], None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = (
+    ('ix_user_group_user_id', 'user_group', ['user_id']),
+    ('ix_user_group_group_id', 'user_group', ['group_id']),
+    ('ix_group_goal_goal_id', 'group_goal', ['goal_id']),
+    ('ix_group_goal_group_id', 'group_goal', ['group_id']),
+    ('ix_goal_user_goal_id', 'goal_user', ['goal_id']),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
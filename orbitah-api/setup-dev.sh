@@ -9,10 +9,10 @@ export SQLALCHEMY_DATABASE_URL="postgresql+psycopg2://orbitah:orbitahpassword@lo
 echo "📊 Using database: orbitahdb_dev"
 echo "🔗 Database URL: $SQLALCHEMY_DATABASE_URL"
 
-# Create tables in development database
-echo "🔧 Creating database tables..."
+# Apply migrations to the development database
+echo "🔧 Applying database migrations..."
 cd /Users/hectorgarciabeita/Hec-Projects/Orbitah/orbitah-api
-python -c "from api.database import Base, engine; Base.metadata.create_all(bind=engine); print('✅ Tables created successfully')"
+alembic upgrade head && echo "✅ Database schema is up to date"
 
 # Start the API server
 echo "🚀 Starting API server..."
@@ -0,0 +1,72 @@
+import time
+import uuid
+
+import pytest
+from api import async_crud, schemas
+from api.cache import InMemoryBackend, TokenCache, token_cache
+
+
+@pytest.fixture
+def test_user_data():
+    suffix = uuid.uuid4().hex[:8]
+    return {
+        "username": f"cache_user_{suffix}",
+        "email": f"cache_{suffix}@example.com",
+        "password": "testpassword123"
+    }
+
+@pytest.fixture
+def auth_headers(client, test_user_data):
+    client.post("/auth/register", json=test_user_data)
+    response = client.post("/auth/login", json={
+        "email": test_user_data["email"],
+        "password": test_user_data["password"]
+    })
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def test_repeated_requests_hit_cache(client, auth_headers, monkeypatch):
+    """Test that only the first authenticated request resolves the user from the database"""
+    assert client.get("/auth/me", headers=auth_headers).status_code == 200
+    calls = []
+    original = async_crud.get_user_by_email
+
+    async def counting_get_user_by_email(*args, **kwargs):
+        calls.append(args)
+        return await original(*args, **kwargs)
+
+    monkeypatch.setattr(async_crud, "get_user_by_email", counting_get_user_by_email)
+    hits_before = token_cache.stats()["hits"]
+    for _ in range(3):
+        assert client.get("/auth/me", headers=auth_headers).status_code == 200
+    assert calls == []
+    assert token_cache.stats()["hits"] == hits_before + 3
+
+def test_update_user_invalidates_cache(client, auth_headers):
+    """Test that profile changes are visible on the next request"""
+    user_id = client.get("/auth/me", headers=auth_headers).json()["id"]
+    client.put(f"/users/{user_id}", json={"username": "renamed_cache_user"}, headers=auth_headers)
+    assert client.get("/auth/me", headers=auth_headers).json()["username"] == "renamed_cache_user"
+
+def test_email_change_revokes_cached_token(client, auth_headers):
+    """Test that a token stops working once its subject no longer matches"""
+    user_id = client.get("/auth/me", headers=auth_headers).json()["id"]
+    client.put(f"/users/{user_id}", json={"email": f"moved_{user_id[:8]}@example.com"}, headers=auth_headers)
+    assert client.get("/auth/me", headers=auth_headers).status_code == 401
+
+def test_shared_backend_serves_other_workers():
+    """Test that a second process-local cache resolves tokens through the shared backend"""
+    backend = InMemoryBackend()
+    user = schemas.UserResponse(id="u1", username="shared", email="shared@example.com")
+    expires_at = time.time() + 600
+    TokenCache(100, 60, backend=backend).set("token-1", user, expires_at)
+
+    other_worker = TokenCache(100, 60, backend=backend)
+    assert other_worker.get("token-1") == user
+    other_worker.invalidate_user("u1")
+    assert TokenCache(100, 60, backend=backend).get("token-1") is None
+
+def test_entries_expire_with_token():
+    cache = TokenCache(100, 60)
+    user = schemas.UserResponse(id="u2", username="expired", email="expired@example.com")
+    cache.set("token-2", user, expires_at=0)
+    assert cache.get("token-2") is None
@@ -0,0 +1,75 @@
+import uuid
+
+import pytest
+
+
+@pytest.fixture
+def account(client):
+    suffix = uuid.uuid4().hex[:8]
+    group = client.post("/groups/", json={"name": "Dash", "code": f"d{suffix}"}).json()
+    user = {"username": f"dash_{suffix}", "email": f"dash_{suffix}@example.com", "password": "testpassword123"}
+    user_id = client.post("/auth/register", json={**user, "group_id": group["id"]}).json()["id"]
+    response = client.post("/auth/login", json={"email": user["email"], "password": user["password"]})
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    for title, goal_status in (("Active", "active"), ("Done", "completed")):
+        client.post("/goals/", json={"title": title, "type": "personal", "status": goal_status, "creator_id": user_id})
+    for hour in range(12):
+        client.post("/focus_sessions/", json={
+            "user_id": user_id, "method": "pomodoro", "started_at": f"2024-01-01T{hour:02d}:00:00", "duration": 25
+        })
+    client.post("/achievements/", json={"code": f"dash_{suffix}", "name": "Dashing"})
+    client.post("/exploration/", json={"user_id": user_id, "achievements": [f"dash_{suffix}"], "unlocked_locations": ["moon"]})
+    return user_id, group["id"], headers
+
+def test_dashboard_sections_in_batched_queries(client, account, assert_max_queries):
+    user_id, group_id, headers = account
+    # The token's user, exploration and its two unlock lists, the group and its
+    # two id lists, goals, sessions and achievements: one each, however many rows
+    with assert_max_queries(10):
+        response = client.get("/me/dashboard", headers=headers)
+    assert response.status_code == 200
+    dashboard = response.json()
+    assert dashboard["user"]["id"] == user_id
+    assert dashboard["group"]["id"] == group_id and dashboard["group"]["focus_minutes"] == 0
+    assert [goal["title"] for goal in dashboard["active_goals"]] == ["Active"]
+    assert len(dashboard["recent_sessions"]) == 10
+    assert dashboard["recent_sessions"][0]["started_at"] == "2024-01-01T11:00:00"
+    assert dashboard["exploration"]["unlocked_locations"] == ["moon"]
+    assert [achievement["name"] for achievement in dashboard["achievements"]] == ["Dashing"]
+
+def test_dashboard_requires_authentication(client):
+    assert client.get("/me/dashboard").status_code == 401
+
+def test_dashboard_is_cached_per_user(client, account, assert_max_queries):
+    user_id, _, headers = account
+    first = client.get("/me/dashboard", headers=headers)
+    with assert_max_queries(0):
+        again = client.get("/me/dashboard", headers={**headers, "If-None-Match": first.headers["etag"]})
+    assert again.status_code == 304
+
+    # Someone else's activity leaves this dashboard cached
+    other = client.post("/users/", json={"username": f"o_{uuid.uuid4().hex[:8]}", "email": f"o_{uuid.uuid4().hex[:8]}@example.com", "password": "x"})
+    client.post("/focus_sessions/", json={
+        "user_id": other.json()["id"], "method": "pomodoro", "started_at": "2024-02-01T09:00:00", "duration": 5
+    })
+    with assert_max_queries(0):
+        assert client.get("/me/dashboard", headers=headers).json() == first.json()
+
+@pytest.mark.parametrize("write", ["goal", "session", "exploration", "group"])
+def test_writes_invalidate_the_dashboard(client, account, write):
+    user_id, group_id, headers = account
+    before = client.get("/me/dashboard", headers=headers).json()
+    if write == "goal":
+        client.post("/goals/", json={"title": "New", "type": "personal", "status": "active", "creator_id": user_id})
+    elif write == "session":
+        client.post("/focus_sessions/", json={
+            "user_id": user_id, "method": "flow", "started_at": "2024-03-01T09:00:00", "duration": 50
+        })
+    elif write == "exploration":
+        client.post(f"/exploration/{user_id}/unlocked_locations", json={"location": "mars"})
+    else:
+        client.put(f"/groups/{group_id}", json={"motto": "Onwards"})
+    after = client.get("/me/dashboard", headers=headers).json()
+    assert after != before
+    assert after == client.get("/me/dashboard", headers=headers).json()
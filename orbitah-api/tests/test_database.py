@@ -0,0 +1,35 @@
+import asyncio
+
+from api import async_crud, models, schemas
+from api.database import Base, to_async_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+
+def test_to_async_url():
+    assert to_async_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+    assert to_async_url("postgresql+psycopg2://u:p@db:5432/orbitahdb") == "postgresql+asyncpg://u:p@db:5432/orbitahdb"
+    assert to_async_url("postgresql://u:p@db/orbitahdb") == "postgresql+asyncpg://u:p@db/orbitahdb"
+
+def test_async_crud_with_sync_session(test_db):
+    """Sync sessions are driven through the threadpool"""
+    group = asyncio.run(async_crud.create_group(test_db, schemas.GroupCreate(name="Sync Crew", code="sync-crew")))
+    assert asyncio.run(async_crud.get_group(test_db, group.id)).name == "Sync Crew"
+
+def test_async_crud_with_async_session(tmp_path):
+    """AsyncSessions run the same crud functions in their greenlet"""
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/async.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+        async with AsyncSessionLocal() as db:
+            group = await async_crud.create_group(db, schemas.GroupCreate(name="Async Crew", code="async-crew"))
+            groups = await async_crud.get_groups(db)
+        await engine.dispose()
+        return group, groups
+
+    group, groups = asyncio.run(scenario())
+    assert isinstance(group, models.Group)
+    # Relationships are loaded before the session goes away
+    assert group.members == []
+    assert [g.id for g in groups] == [group.id]
@@ -0,0 +1,60 @@
+import uuid
+
+import pytest
+from api import models
+
+
+@pytest.fixture
+def user_id(test_db):
+    suffix = uuid.uuid4().hex[:8]
+    user = models.User(username=f"explorer_{suffix}", email=f"explorer_{suffix}@example.com")
+    test_db.add(user)
+    test_db.commit()
+    return user.id
+
+@pytest.fixture
+def state(client, user_id):
+    response = client.post("/exploration/", json={
+        "user_id": user_id,
+        "unlocked_locations": ["earth", "moon"],
+        "achievements": ["first_flight"]
+    })
+    assert response.status_code == 200
+    return response.json()
+
+def test_lists_round_trip(client, state, user_id):
+    response = client.get(f"/exploration/{user_id}")
+    assert response.status_code == 200
+    assert response.json()["unlocked_locations"] == ["earth", "moon"]
+    assert response.json()["achievements"] == ["first_flight"]
+
+def test_update_replaces_lists(client, state, user_id):
+    response = client.put(f"/exploration/{user_id}", json={"unlocked_locations": ["moon", "mars"]})
+    assert response.status_code == 200
+    assert response.json()["unlocked_locations"] == ["moon", "mars"]
+    assert response.json()["achievements"] == ["first_flight"]
+
+def test_unlock_appends_single_row(client, state, user_id, assert_max_queries):
+    """Test that unlocking one location is one INSERT, not a rewrite of the list"""
+    with assert_max_queries(8) as statements:
+        response = client.post(f"/exploration/{user_id}/unlocked_locations", json={"location": "mars"})
+    assert response.status_code == 200
+    assert response.json()["unlocked_locations"] == ["earth", "moon", "mars"]
+    writes = [s for s in statements if not s.lstrip().upper().startswith("SELECT")]
+    assert len(writes) == 1 and writes[0].lstrip().upper().startswith("INSERT")
+
+def test_unlock_is_idempotent(client, state, user_id):
+    client.post(f"/exploration/{user_id}/achievements", json={"achievement": "orbit"})
+    response = client.post(f"/exploration/{user_id}/achievements", json={"achievement": "orbit"})
+    assert response.status_code == 200
+    assert response.json()["achievements"] == ["first_flight", "orbit"]
+
+def test_unlock_missing_state(client):
+    response = client.post("/exploration/nobody/unlocked_locations", json={"location": "mars"})
+    assert response.status_code == 404
+
+def test_who_unlocked_location(client, state, user_id):
+    response = client.get("/exploration/unlocked_locations/moon/users")
+    assert response.status_code == 200
+    assert response.json() == [user_id]
+    assert client.get("/exploration/unlocked_locations/pluto/users").json() == []
@@ -0,0 +1,90 @@
+import asyncio
+import csv
+import io
+import json
+import uuid
+from datetime import date, datetime
+
+import pytest
+from api import models
+from api.export import iter_partitions
+from sqlalchemy import select
+
+
+@pytest.fixture
+def user_ids(test_db):
+    users = []
+    for _ in range(2):
+        suffix = uuid.uuid4().hex[:8]
+        users.append(models.User(username=f"exporter_{suffix}", email=f"exporter_{suffix}@example.com"))
+    test_db.add_all(users)
+    test_db.commit()
+    return [user.id for user in users]
+
+@pytest.fixture
+def sessions(test_db, user_ids):
+    me, other = user_ids
+    rows = [
+        models.FocusSession(user_id=me, method="pomodoro", started_at=datetime(2024, 1, 1, 9), duration=25),
+        models.FocusSession(user_id=me, method="deep", started_at=datetime(2024, 1, 2, 23, 30), duration=90),
+        models.FocusSession(user_id=me, method="pomodoro", started_at=datetime(2024, 1, 3, 0, 0), duration=25),
+        models.FocusSession(user_id=other, method="pomodoro", started_at=datetime(2024, 1, 2, 9), duration=50),
+    ]
+    test_db.add_all(rows)
+    test_db.commit()
+    return [row.id for row in rows]
+
+def _ndjson(response):
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines()]
+
+def test_focus_sessions_ndjson(client, user_ids, sessions):
+    response = client.get("/focus_sessions/export", params={"user_id": user_ids[0]})
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert 'filename="focus_sessions.ndjson"' in response.headers["content-disposition"]
+    rows = _ndjson(response)
+    assert {row["id"] for row in rows} == set(sessions[:3])
+    first = next(row for row in rows if row["id"] == sessions[0])
+    assert first == {
+        "id": sessions[0], "user_id": user_ids[0], "goal_id": None,
+        "method": "pomodoro", "started_at": "2024-01-01T09:00:00", "duration": 25
+    }
+
+def test_focus_sessions_date_range_is_inclusive(client, user_ids, sessions):
+    rows = _ndjson(client.get("/focus_sessions/export", params={
+        "user_id": user_ids[0], "start": "2024-01-02", "end": "2024-01-02"
+    }))
+    assert [row["id"] for row in rows] == [sessions[1]]
+
+def test_focus_sessions_csv(client, user_ids, sessions):
+    response = client.get("/focus_sessions/export", params={"format": "csv", "method": "pomodoro", "user_id": user_ids[1]})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    reader = list(csv.reader(io.StringIO(response.text)))
+    assert reader[0] == ["id", "user_id", "goal_id", "method", "started_at", "duration"]
+    assert reader[1:] == [[sessions[3], user_ids[1], "", "pomodoro", "2024-01-02T09:00:00", "50"]]
+
+def test_goals_export_filters(client, test_db, user_ids):
+    me, other = user_ids
+    test_db.add_all([
+        models.Goal(creator_id=me, title="a", type="personal", status="active", due_date=date(2024, 1, 3)),
+        models.Goal(creator_id=me, title="b", type="personal", status="completed", due_date=date(2024, 1, 3)),
+        models.Goal(creator_id=other, title="c", type="personal", status="active", due_date=date(2024, 1, 3)),
+    ])
+    test_db.commit()
+    rows = _ndjson(client.get("/goals/export", params={"creator_id": me, "status": "active", "due_to": "2024-01-31"}))
+    assert [(row["title"], row["due_date"]) for row in rows] == [("a", "2024-01-03")]
+
+    response = client.get("/goals/export", params={"format": "csv", "creator_id": me})
+    assert len(list(csv.DictReader(io.StringIO(response.text)))) == 2
+
+def test_unknown_format(client):
+    assert client.get("/goals/export", params={"format": "xml"}).status_code == 422
+
+def test_partitions_are_bounded(test_db, user_ids, sessions):
+    statement = select(models.FocusSession.id).where(models.FocusSession.user_id == user_ids[0])
+
+    async def sizes():
+        return [len(partition) async for partition in iter_partitions(test_db, statement, batch_size=2)]
+
+    assert asyncio.run(sizes()) == [2, 1]
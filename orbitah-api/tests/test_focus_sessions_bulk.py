@@ -0,0 +1,70 @@
+import uuid
+
+import pytest
+from api import models
+
+
+@pytest.fixture
+def user_id(test_db):
+    suffix = uuid.uuid4().hex[:8]
+    user = models.User(username=f"syncer_{suffix}", email=f"syncer_{suffix}@example.com")
+    test_db.add(user)
+    test_db.commit()
+    return user.id
+
+def _session(user_id, minute, **extra):
+    return {
+        "user_id": user_id,
+        "method": "pomodoro",
+        "started_at": f"2024-01-01T10:{minute:02d}:00",
+        "duration": 25,
+        **extra
+    }
+
+def test_bulk_insert(client, user_id, assert_max_queries):
+    """Test that a batch is written with one multi-row INSERT"""
+    items = [_session(user_id, i) for i in range(50)]
+    with assert_max_queries(4) as statements:
+        response = client.post("/focus_sessions/bulk", json=items)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 50 and data["failed"] == 0
+    assert [r["index"] for r in data["results"]] == list(range(50))
+    assert sum(s.lstrip().upper().startswith("INSERT INTO FOCUS_SESSIONS") for s in statements) == 1
+    assert client.get(f"/focus_sessions/{data['results'][0]['id']}").json()["user_id"] == user_id
+
+def test_bulk_reports_errors_per_item(client, user_id):
+    items = [
+        _session(user_id, 0),
+        {"user_id": user_id, "method": "pomodoro"},
+        _session("missing-user", 1),
+        _session(user_id, 2, goal_id="missing-goal"),
+    ]
+    response = client.post("/focus_sessions/bulk", json=items)
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["status"] for r in results] == ["created", "error", "error", "error"]
+    assert {e["loc"][0] for e in results[1]["errors"]} == {"started_at", "duration"}
+    assert results[2]["errors"] == ["Unknown user_id"]
+    assert results[3]["errors"] == ["Unknown goal_id"]
+
+def test_bulk_retry_is_idempotent(client, user_id, test_db):
+    items = [_session(user_id, i, idempotency_key=f"k{i}") for i in range(3)]
+    first = client.post("/focus_sessions/bulk", json=items).json()
+    retry = client.post("/focus_sessions/bulk", json=items + [_session(user_id, 9, idempotency_key="k9")]).json()
+    assert first["created"] == 3
+    assert retry["created"] == 1 and retry["duplicates"] == 3
+    assert [r["id"] for r in retry["results"][:3]] == [r["id"] for r in first["results"]]
+    assert test_db.query(models.FocusSession).filter(models.FocusSession.user_id == user_id).count() == 4
+
+def test_bulk_repeated_key_in_batch(client, user_id):
+    items = [_session(user_id, 0, idempotency_key="same"), _session(user_id, 1, idempotency_key="same")]
+    results = client.post("/focus_sessions/bulk", json=items).json()["results"]
+    assert [r["status"] for r in results] == ["created", "duplicate"]
+    assert results[0]["id"] == results[1]["id"]
+
+def test_bulk_too_many_items(client, user_id, monkeypatch):
+    from api.routers import focus_sessions
+    monkeypatch.setattr(focus_sessions, "FOCUS_SESSION_BULK_MAX_ITEMS", 2)
+    response = client.post("/focus_sessions/bulk", json=[_session(user_id, i) for i in range(3)])
+    assert response.status_code == 413
@@ -0,0 +1,78 @@
+import uuid
+
+import pytest
+from api import models
+
+
+@pytest.fixture
+def user_id(test_db):
+    suffix = uuid.uuid4().hex[:8]
+    user = models.User(username=f"focus_{suffix}", email=f"focus_{suffix}@example.com")
+    test_db.add(user)
+    test_db.commit()
+    return user.id
+
+@pytest.fixture
+def goal_id(test_db, user_id):
+    goal = models.Goal(creator_id=user_id, title="Ship it")
+    test_db.add(goal)
+    test_db.commit()
+    return goal.id
+
+def _create(client, user_id, started_at, duration, method="pomodoro", goal_id=None):
+    response = client.post("/focus_sessions/", json={
+        "user_id": user_id,
+        "method": method,
+        "started_at": started_at,
+        "duration": duration,
+        "goal_id": goal_id
+    })
+    assert response.status_code == 200
+    return response.json()["id"]
+
+def _stats(client, path, **params):
+    response = client.get(f"/focus_sessions/stats/{path}", params=params)
+    assert response.status_code == 200
+    return [(b["bucket"], b["minutes"], b["sessions"]) for b in response.json()]
+
+def test_stats_by_day_week_and_method(client, user_id):
+    _create(client, user_id, "2024-01-01T09:00:00", 25)
+    _create(client, user_id, "2024-01-01T18:00:00", 50, method="deep_work")
+    _create(client, user_id, "2024-01-03T09:00:00", 25)
+    _create(client, user_id, "2024-01-08T09:00:00", 10)
+    assert _stats(client, f"users/{user_id}") == [
+        ("2024-01-01", 75, 2), ("2024-01-03", 25, 1), ("2024-01-08", 10, 1)
+    ]
+    assert _stats(client, f"users/{user_id}", group_by="week") == [("2024-01-01", 100, 3), ("2024-01-08", 10, 1)]
+    assert _stats(client, f"users/{user_id}", group_by="method") == [("deep_work", 50, 1), ("pomodoro", 60, 3)]
+    assert _stats(client, f"users/{user_id}", start="2024-01-02", end="2024-01-07") == [("2024-01-03", 25, 1)]
+
+def test_stats_follow_updates_and_deletes(client, user_id, goal_id):
+    session_id = _create(client, user_id, "2024-01-01T09:00:00", 25, goal_id=goal_id)
+    client.put(f"/focus_sessions/{session_id}", json={"started_at": "2024-01-02T09:00:00", "duration": 40})
+    assert _stats(client, f"users/{user_id}") == [("2024-01-02", 40, 1)]
+    assert _stats(client, f"goals/{goal_id}") == [("2024-01-02", 40, 1)]
+    client.delete(f"/focus_sessions/{session_id}")
+    assert _stats(client, f"users/{user_id}") == []
+    assert _stats(client, f"goals/{goal_id}") == []
+
+def test_stats_include_bulk_uploads(client, user_id, goal_id):
+    items = [
+        {"user_id": user_id, "method": "pomodoro", "started_at": "2024-01-01T09:00:00", "duration": 25,
+         "goal_id": goal_id, "idempotency_key": f"k{i}"}
+        for i in range(4)
+    ]
+    client.post("/focus_sessions/bulk", json=items)
+    client.post("/focus_sessions/bulk", json=items)
+    assert _stats(client, f"goals/{goal_id}") == [("2024-01-01", 100, 4)]
+
+def test_stats_read_rollups_only(client, user_id, assert_max_queries):
+    for day in range(1, 6):
+        _create(client, user_id, f"2024-01-0{day}T09:00:00", 25)
+    with assert_max_queries(1) as statements:
+        _stats(client, f"users/{user_id}", group_by="week")
+    assert "focus_sessions" not in statements[0].split("FROM")[1]
+
+def test_stats_invalid_group_by(client, user_id):
+    response = client.get(f"/focus_sessions/stats/users/{user_id}", params={"group_by": "year"})
+    assert response.status_code == 422
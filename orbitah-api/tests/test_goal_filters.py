@@ -0,0 +1,59 @@
+import uuid
+from datetime import date
+
+import pytest
+from api import models
+from sqlalchemy import text
+
+
+@pytest.fixture
+def creators(test_db):
+    users = []
+    for _ in range(2):
+        suffix = uuid.uuid4().hex[:8]
+        users.append(models.User(username=f"planner_{suffix}", email=f"planner_{suffix}@example.com"))
+    test_db.add_all(users)
+    test_db.commit()
+    return [user.id for user in users]
+
+@pytest.fixture
+def goals(test_db, creators):
+    me, other = creators
+    rows = {
+        "due_this_week": models.Goal(creator_id=me, title="a", type="personal", status="active", category="fitness", due_date=date(2024, 1, 3)),
+        "due_later": models.Goal(creator_id=me, title="b", type="personal", status="active", category="study", due_date=date(2024, 2, 1)),
+        "done": models.Goal(creator_id=me, title="c", type="personal", status="completed", category="fitness", due_date=date(2024, 1, 2)),
+        "someone_else": models.Goal(creator_id=other, title="d", type="personal", status="active", category="fitness", due_date=date(2024, 1, 4)),
+    }
+    test_db.add_all(rows.values())
+    test_db.commit()
+    return {name: goal.id for name, goal in rows.items()}
+
+def _ids(client, **params):
+    response = client.get("/goals/", params=params)
+    assert response.status_code == 200
+    return {goal["id"] for goal in response.json()}
+
+def test_filter_my_active_goals_due_this_week(client, creators, goals):
+    ids = _ids(client, creator_id=creators[0], status="active", due_from="2024-01-01", due_to="2024-01-07")
+    assert ids == {goals["due_this_week"]}
+
+def test_filter_by_category_and_status(client, creators, goals):
+    assert _ids(client, category="fitness", status="active") == {goals["due_this_week"], goals["someone_else"]}
+    assert _ids(client, creator_id=creators[0]) == {goals["due_this_week"], goals["due_later"], goals["done"]}
+
+def test_filters_compose_with_cursor(client, creators, goals):
+    params = {"creator_id": creators[0], "limit": 2}
+    first = client.get("/goals/", params=params)
+    second = client.get("/goals/", params={**params, "cursor": first.headers["X-Next-Cursor"]})
+    seen = [g["id"] for g in first.json()] + [g["id"] for g in second.json()]
+    assert sorted(seen) == sorted([goals["due_this_week"], goals["due_later"], goals["done"]])
+
+def test_filter_uses_composite_index(test_db, creators, goals):
+    if test_db.get_bind().dialect.name != "sqlite":
+        pytest.skip("EXPLAIN QUERY PLAN is SQLite-specific")
+    statement = test_db.query(models.Goal.id).filter(
+        models.Goal.creator_id == creators[0], models.Goal.status == "active", models.Goal.due_date <= date(2024, 1, 7)
+    ).statement.compile(test_db.get_bind(), compile_kwargs={"literal_binds": True})
+    plan = " ".join(str(row[-1]) for row in test_db.execute(text(f"EXPLAIN QUERY PLAN {statement}")))
+    assert "ix_goals_creator_status_due_date" in plan
@@ -0,0 +1,96 @@
+import asyncio
+import uuid
+
+import pytest
+from api import crud, models
+from api.feed import GroupFeed, group_feed, publish_on_commit, sse_events
+from starlette.websockets import WebSocketDisconnect
+
+
+@pytest.fixture
+def crew(test_db):
+    suffix = uuid.uuid4().hex[:8]
+    members = [models.User(username=f"feed{i}_{suffix}", email=f"feed{i}_{suffix}@example.com") for i in range(2)]
+    outsider = models.User(username=f"outsider_{suffix}", email=f"outsider_{suffix}@example.com")
+    group = models.Group(name="feed", code=f"f{suffix}", members=members)
+    test_db.add_all([group, outsider])
+    test_db.commit()
+    return group, members, outsider
+
+def test_websocket_receives_group_activity(client, test_db, crew):
+    group, (member, _), outsider = crew
+    with client.websocket_connect(f"/groups/{group.id}/feed/ws") as ws:
+        client.post("/focus_sessions/", json={
+            "user_id": outsider.id, "method": "pomodoro", "started_at": "2024-01-01T08:00:00", "duration": 10
+        })
+        client.post("/focus_sessions/", json={
+            "user_id": member.id, "method": "pomodoro", "started_at": "2024-01-01T09:00:00", "duration": 25
+        })
+        event = ws.receive_json()
+        assert event["type"] == "focus_session.created"
+        assert event["group_id"] == group.id
+        assert event["session"]["user_id"] == member.id and event["session"]["duration"] == 25
+
+        goal = client.post("/goals/", json={
+            "title": "Dock", "type": "group", "status": "active", "creator_id": member.id, "group_id": group.id
+        }).json()
+        event = ws.receive_json()
+        assert event["type"] == "goal.created"
+        assert event["goal"]["id"] == goal["id"] and event["goals_total"] == 1
+
+        client.put(f"/goals/{goal['id']}", json={"status": "completed"})
+        event = ws.receive_json()
+        assert (event["type"], event["goals_completed"], event["progress"]) == ("goal.completed", 1, 1.0)
+
+        crud.award_xp(test_db, member.id, 15)
+        event = ws.receive_json()
+        assert (event["type"], event["user_id"], event["amount"]) == ("xp.awarded", member.id, 15)
+    assert group_feed.stats()["subscribers"] == 0
+
+def test_unknown_group(client):
+    with pytest.raises(WebSocketDisconnect) as exc:
+        with client.websocket_connect("/groups/missing/feed/ws"):
+            pass
+    assert exc.value.code == 1008
+    assert client.get("/groups/missing/feed").status_code == 404
+
+def test_rolled_back_events_are_dropped(test_db, crew):
+    _, (member, _), _ = crew
+    publish_on_commit(test_db, "user", member.id, "xp.awarded", amount=1)
+    test_db.rollback()
+    assert "group_feed_events" not in test_db.info
+
+def test_slow_subscriber_is_cut_off():
+    feed = GroupFeed(queue_size=3)
+
+    async def scenario():
+        subscription = feed.subscribe("g", ["u"])
+        for amount in range(5):
+            feed.publish("user", "u", {"type": "xp.awarded", "amount": amount})
+        await asyncio.sleep(0)
+        events = [await subscription.get() for _ in range(3)]
+        subscription.close()
+        return subscription.overflowed, events
+
+    overflowed, events = asyncio.run(scenario())
+    assert overflowed
+    assert [event["amount"] for event in events[:2]] == [1, 2]
+    assert events[2] is None
+    assert feed.stats()["subscribers"] == 0
+
+def test_sse_framing():
+    feed = GroupFeed()
+
+    async def scenario():
+        subscription = feed.subscribe("g", [])
+        stream = sse_events(subscription)
+        chunks = [await stream.__anext__()]
+        feed.publish("group", "g", {"type": "goal.deleted", "goal": {"id": "x"}})
+        chunks.append(await stream.__anext__())
+        await stream.aclose()
+        return chunks
+
+    connected, event = asyncio.run(scenario())
+    assert connected == ": connected\n\n"
+    assert event.startswith("event: goal.deleted\ndata: {")
+    assert '"group_id": "g"' in event
@@ -0,0 +1,48 @@
+import uuid
+
+import pytest
+from api import models
+
+
+@pytest.fixture
+def crews(test_db):
+    """Twenty groups with three members and two shared goals each"""
+    groups = []
+    for i in range(20):
+        suffix = uuid.uuid4().hex[:8]
+        members = [
+            models.User(username=f"crew_{suffix}_{n}", email=f"crew_{suffix}_{n}@example.com")
+            for n in range(3)
+        ]
+        test_db.add_all(members)
+        test_db.flush()
+        goals = [
+            models.Goal(title=f"Goal {n}", type="shared", status="active", creator_id=members[0].id)
+            for n in range(2)
+        ]
+        group = models.Group(name=f"Crew {i}", code=f"crew-{suffix}", members=members, shared_goals=goals)
+        test_db.add(group)
+        groups.append(group)
+    test_db.commit()
+    assert all(goal.creator_id for g in groups for goal in g.shared_goals)
+    return {g.id: ({u.id for u in g.members}, {goal.id for goal in g.shared_goals}) for g in groups}
+
+def test_list_groups_loads_relationships_in_batches(client, crews, assert_max_queries):
+    """Test that a page of groups costs a fixed number of queries"""
+    # groups + one selectin query per collection
+    with assert_max_queries(3):
+        response = client.get("/groups/", params={"limit": 100})
+    assert response.status_code == 200
+    data = {g["id"]: g for g in response.json()}
+    assert set(data) == set(crews)
+    for group_id, (member_ids, goal_ids) in crews.items():
+        assert set(data[group_id]["members"]) == member_ids
+        assert set(data[group_id]["shared_goals"]) == goal_ids
+
+def test_get_group_returns_member_ids(client, crews, assert_max_queries):
+    group_id, (member_ids, goal_ids) = next(iter(crews.items()))
+    with assert_max_queries(3):
+        response = client.get(f"/groups/{group_id}")
+    assert response.status_code == 200
+    assert set(response.json()["members"]) == member_ids
+    assert set(response.json()["shared_goals"]) == goal_ids
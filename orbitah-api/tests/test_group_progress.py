@@ -0,0 +1,103 @@
+import uuid
+
+import pytest
+from api import crud, models, schemas
+
+
+@pytest.fixture
+def crew(test_db):
+    suffix = uuid.uuid4().hex[:8]
+    members = [models.User(username=f"crew{i}_{suffix}", email=f"crew{i}_{suffix}@example.com") for i in range(2)]
+    group = models.Group(name="crew", code=f"c{suffix}", members=members)
+    test_db.add(group)
+    test_db.commit()
+    return group, members
+
+def _goal(client, group, creator, status="active"):
+    response = client.post("/goals/", json={
+        "title": "Reach orbit", "type": "group", "status": status, "creator_id": creator.id, "group_id": group.id
+    })
+    assert response.status_code == 200
+    return response.json()["id"]
+
+def _progress(client, group):
+    data = client.get(f"/groups/{group.id}").json()
+    return data["progress"], data["goals_total"], data["goals_completed"], data["focus_minutes"]
+
+def test_goal_changes_move_progress(client, crew):
+    group, (owner, _) = crew
+    first = _goal(client, group, owner)
+    _goal(client, group, owner)
+    assert _progress(client, group) == (0.0, 2, 0, 0)
+    client.put(f"/goals/{first}", json={"status": "completed"})
+    assert _progress(client, group)[:3] == (0.5, 2, 1)
+    client.put(f"/goals/{first}", json={"title": "Renamed"})
+    assert _progress(client, group)[:3] == (0.5, 2, 1)
+    client.delete(f"/goals/{first}")
+    assert _progress(client, group)[:3] == (0.0, 1, 0)
+
+def test_goal_for_missing_group(client, crew):
+    _, (owner, _) = crew
+    response = client.post("/goals/", json={
+        "title": "x", "type": "group", "status": "active", "creator_id": owner.id, "group_id": "missing"
+    })
+    assert response.status_code == 404
+
+def test_member_sessions_move_focus_minutes(client, crew):
+    group, members = crew
+    session = client.post("/focus_sessions/", json={
+        "user_id": members[0].id, "method": "pomodoro", "started_at": "2024-01-01T09:00:00", "duration": 25
+    }).json()
+    client.post("/focus_sessions/bulk", json=[
+        {"user_id": members[1].id, "method": "pomodoro", "started_at": "2024-01-01T10:00:00", "duration": 50}
+    ])
+    assert _progress(client, group)[3] == 75
+    client.put(f"/focus_sessions/{session['id']}", json={"duration": 30})
+    assert _progress(client, group)[3] == 80
+    client.delete(f"/focus_sessions/{session['id']}")
+    assert _progress(client, group)[3] == 50
+
+def test_deleted_member_takes_their_focus_minutes(client, test_db, crew):
+    group, members = crew
+    for member, duration in zip(members, (25, 50)):
+        crud.create_focus_session(test_db, schemas.FocusSessionCreate(
+            user_id=member.id, method="pomodoro", started_at="2024-01-01T09:00:00", duration=duration
+        ))
+    crud.delete_user(test_db, members[0].id)
+    assert _progress(client, group)[3] == 50
+    assert crud.reconcile_group_progress(test_db, [group.id]) == []
+
+def test_progress_is_not_client_writable(client, crew):
+    group, _ = crew
+    client.put(f"/groups/{group.id}", json={"progress": 0.99})
+    assert client.get(f"/groups/{group.id}").json()["progress"] == 0.0
+
+def test_reconcile_repairs_drift(client, test_db, crew):
+    group, (owner, member) = crew
+    _goal(client, group, owner, status="completed")
+    crud.create_focus_session(test_db, schemas.FocusSessionCreate(
+        user_id=member.id, method="pomodoro", started_at="2024-01-01T09:00:00", duration=40
+    ))
+    # Drift: counters overwritten, and a goal linked behind crud's back
+    test_db.execute(models.Group.__table__.update().values(goals_total=7, focus_minutes=1, progress=0.1))
+    other = models.Goal(title="b", type="group", status="active", creator_id=owner.id)
+    test_db.add(other)
+    test_db.flush()
+    test_db.execute(models.group_goal.insert().values(group_id=group.id, goal_id=other.id))
+    test_db.commit()
+
+    assert crud.reconcile_group_progress(test_db, [group.id]) == [group.id]
+    test_db.expire_all()
+    assert _progress(client, group) == (0.5, 2, 1, 40)
+    assert crud.reconcile_group_progress(test_db, [group.id]) == []
+
+def test_reconcile_endpoint(client, crew):
+    group, _ = crew
+    assert client.post(f"/internal/groups/{group.id}/reconcile").status_code == 401
+
+    suffix = uuid.uuid4().hex[:8]
+    user = {"username": f"ops_{suffix}", "email": f"ops_{suffix}@example.com", "password": "testpassword123"}
+    client.post("/auth/register", json=user)
+    token = client.post("/auth/login", json={"email": user["email"], "password": user["password"]}).json()["access_token"]
+    response = client.post(f"/internal/groups/{group.id}/reconcile", headers={"Authorization": f"Bearer {token}"})
+    assert response.json() == {"group_id": group.id, "repaired": False}
@@ -0,0 +1,93 @@
+import uuid
+
+import pytest
+from api import instrumentation, models
+from api.instrumentation import PHASE_SECONDS, REQUEST_SECONDS, SQL_STATEMENTS
+from api.metrics import render_prometheus
+
+
+def _count(metric, **labels):
+    return sum(sample["count"] for sample in metric.snapshot() if labels.items() <= sample["labels"].items())
+
+def _server_timing(response):
+    timings = {}
+    for part in response.headers["server-timing"].split(", "):
+        name, duration, *rest = part.split(";")
+        timings[name] = (float(duration.removeprefix("dur=")), rest)
+    return timings
+
+@pytest.fixture
+def server_timing(monkeypatch):
+    monkeypatch.setattr(instrumentation, "SERVER_TIMING_ENABLED", True)
+
+@pytest.fixture
+def goal_id(test_db):
+    suffix = uuid.uuid4().hex[:8]
+    user = models.User(username=f"timed_{suffix}", email=f"timed_{suffix}@example.com")
+    test_db.add(user)
+    test_db.flush()
+    goal = models.Goal(creator_id=user.id, title="timed", type="personal", status="active")
+    test_db.add(goal)
+    test_db.commit()
+    return goal.id
+
+def test_requests_are_recorded_per_route_template(client, goal_id):
+    labels = {"route": "/goals/{goal_id}", "method": "GET", "status": "200"}
+    before = _count(REQUEST_SECONDS, **labels)
+    sql_before = _count(SQL_STATEMENTS, route="/goals/{goal_id}")
+    serialize_before = _count(PHASE_SECONDS, route="/goals/{goal_id}", phase="serialize")
+
+    assert client.get(f"/goals/{goal_id}").status_code == 200
+    assert _count(REQUEST_SECONDS, **labels) == before + 1
+    assert _count(SQL_STATEMENTS, route="/goals/{goal_id}") == sql_before + 1
+    assert _count(PHASE_SECONDS, route="/goals/{goal_id}", phase="serialize") == serialize_before + 1
+
+    client.get("/no/such/path")
+    assert _count(REQUEST_SECONDS, route=instrumentation.UNMATCHED_ROUTE, status="404") >= 1
+
+def test_server_timing_is_opt_in(client, goal_id):
+    assert "server-timing" not in client.get(f"/goals/{goal_id}").headers
+
+def test_server_timing_breakdown(client, goal_id, server_timing):
+    timings = _server_timing(client.get(f"/goals/{goal_id}"))
+    assert set(timings) == {"app", "sql", "bcrypt", "jwt", "serialize"}
+    assert timings["sql"][0] > 0 and timings["sql"][1] == ['desc="statements=1"']
+    assert timings["bcrypt"][0] == timings["jwt"][0] == 0
+    assert timings["app"][0] >= timings["sql"][0] + timings["serialize"][0]
+
+def test_login_charges_bcrypt_and_jwt(client, server_timing):
+    suffix = uuid.uuid4().hex[:8]
+    credentials = {"email": f"timed_{suffix}@example.com", "password": "testpassword123"}
+    client.post("/auth/register", json={"username": f"timed_{suffix}", **credentials})
+    response = client.post("/auth/login", json=credentials)
+    assert response.status_code == 200
+    timings = _server_timing(response)
+    assert timings["bcrypt"][0] > 0 and timings["jwt"][0] > 0
+
+def test_prometheus_exposition(client, goal_id):
+    client.get(f"/goals/{goal_id}")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = response.text.splitlines()
+    assert "# TYPE http_request_duration_seconds histogram" in lines
+    assert any(
+        line.startswith('http_request_duration_seconds_bucket{method="GET",route="/goals/{goal_id}",status="200",le="+Inf"}')
+        for line in lines
+    )
+    assert any(line.startswith('http_request_phase_seconds_sum{phase="sql",route="/goals/{goal_id}"}') for line in lines)
+    assert "# TYPE password_hash_rejected_total counter" in lines
+
+def test_label_values_are_escaped():
+    class Fake:
+        kind = "counter"
+        description = 'multi\nline'
+
+        def snapshot(self):
+            return [{"labels": {"path": 'a"b\\c'}, "value": 2}]
+
+    assert render_prometheus({"fake_total": Fake()}).splitlines() == [
+        "# HELP fake_total multi\\nline",
+        "# TYPE fake_total counter",
+        'fake_total{path="a\\"b\\\\c"} 2',
+    ]
@@ -0,0 +1,21 @@
+from api.metrics import Histogram
+
+
+def test_db_pool_endpoint(client):
+    """Test the pool usage endpoint"""
+    response = client.get("/internal/db-pool")
+    assert response.status_code == 200
+    data = response.json()
+    pool = data["pools"]["sync"]
+    for field in ("size", "checked_in", "checked_out", "overflow", "timeout", "recycle", "pre_ping"):
+        assert field in pool
+    assert "checkout_seconds" in data
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("test_histogram_seconds", "test", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, route="/x")
+    [series] = histogram.snapshot()
+    assert series["labels"] == {"route": "/x"}
+    assert series["count"] == 3
+    assert series["buckets"] == {"0.1": 1, "1.0": 2, "+Inf": 3}
@@ -0,0 +1,89 @@
+import uuid
+
+import pytest
+from api import crud, models, schemas
+from api.leaderboard import InMemoryBackend, Leaderboard, SortedBoard, leaderboard
+
+
+def _user(test_db, xp=0, streak=0):
+    suffix = uuid.uuid4().hex[:8]
+    return crud.create_user(
+        test_db,
+        schemas.UserCreate(username=f"player_{suffix}", email=f"player_{suffix}@example.com",
+                           password="x", experience_points=xp, streak_days=streak),
+        hashed_password="x"
+    )
+
+@pytest.fixture
+def auth_headers(client):
+    suffix = uuid.uuid4().hex[:8]
+    user = {"username": f"me_{suffix}", "email": f"me_{suffix}@example.com", "password": "testpassword123"}
+    client.post("/auth/register", json=user)
+    response = client.post("/auth/login", json={"email": user["email"], "password": user["password"]})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def test_sorted_board_ranks_with_ties():
+    board = SortedBoard()
+    for member, score in [("a", 10), ("b", 30), ("c", 20), ("d", 20)]:
+        board.set(member, score)
+    assert board.top(3) == [("b", 30), ("c", 20), ("d", 20)]
+    assert [board.rank(m) for m in "abcd"] == [4, 1, 2, 2]
+    board.incr("a", 25)
+    board.remove("b")
+    assert board.top(2) == [("a", 35), ("c", 20)]
+    assert board.rank("b") is None and len(board) == 3
+
+def test_pluggable_backend():
+    board = Leaderboard(InMemoryBackend())
+    board.rebuild([("u1", 100, 3), ("u2", 50, 7), ("u3", None, None)])
+    assert [e["user_id"] for e in board.top("xp", 10)] == ["u1", "u2", "u3"]
+    assert board.rank("streak", "u2") == {"user_id": "u2", "rank": 1, "score": 7}
+    board.award_xp("u2", 60)
+    assert board.rank("xp", "u2")["rank"] == 1
+    assert board.top("xp", 1, window="week") == [{"user_id": "u2", "rank": 1, "score": 60}]
+
+def test_crud_writes_update_leaderboard(client, test_db):
+    low, high = _user(test_db, xp=10), _user(test_db, xp=500, streak=4)
+    assert [e["user_id"] for e in client.get("/leaderboards/xp").json()] == [high.id, low.id]
+    crud.award_xp(test_db, low.id, 890)
+    assert client.get("/leaderboards/xp", params={"limit": 1}).json() == [{"user_id": low.id, "rank": 1, "score": 900}]
+    assert client.get(f"/leaderboards/xp/users/{high.id}").json()["rank"] == 2
+    assert client.get("/leaderboards/xp", params={"window": "day"}).json() == [{"user_id": low.id, "rank": 1, "score": 890}]
+    # Profile edits sync the streak but never count toward the windows
+    crud.update_user(test_db, high.id, schemas.UserUpdate(streak_days=9))
+    assert client.get(f"/leaderboards/streak/users/{high.id}").json()["score"] == 9
+    assert client.get("/leaderboards/xp", params={"window": "day"}).json() == [{"user_id": low.id, "rank": 1, "score": 890}]
+    crud.delete_user(test_db, high.id)
+    assert client.get(f"/leaderboards/xp/users/{high.id}").status_code == 404
+
+def test_my_rank(client, test_db, auth_headers):
+    _user(test_db, streak=3)
+    response = client.get("/leaderboards/streak/me", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["rank"] == 2
+    assert client.get("/leaderboards/streak/me").status_code == 401
+
+def test_group_leaderboard(client, test_db):
+    members = [_user(test_db, xp=xp) for xp in (5, 40, 20)]
+    outsider = _user(test_db, xp=1000)
+    group = models.Group(name="crew", code=uuid.uuid4().hex[:6], members=members)
+    test_db.add(group)
+    test_db.commit()
+    ranked = client.get(f"/leaderboards/xp/groups/{group.id}", params={"limit": 2}).json()
+    assert ranked == [
+        {"user_id": members[1].id, "rank": 1, "score": 40},
+        {"user_id": members[2].id, "rank": 2, "score": 20},
+    ]
+    assert outsider.id not in {e["user_id"] for e in ranked}
+    assert client.get("/leaderboards/xp/groups/missing").status_code == 404
+
+def test_rebuild_from_database(test_db):
+    user = _user(test_db, xp=77)
+    leaderboard.clear()
+    assert leaderboard.rank("xp", user.id) is None
+    leaderboard.rebuild(crud.get_leaderboard_rows(test_db))
+    assert leaderboard.rank("xp", user.id)["score"] == 77
+
+def test_windows_only_for_xp(client):
+    assert client.get("/leaderboards/streak", params={"window": "week"}).status_code == 400
+    assert client.get("/leaderboards/level").status_code == 422
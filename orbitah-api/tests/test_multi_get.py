@@ -0,0 +1,57 @@
+import uuid
+from datetime import datetime
+
+import pytest
+from api import models, multi_get
+
+
+@pytest.fixture
+def goal_ids(test_db):
+    suffix = uuid.uuid4().hex[:8]
+    user = models.User(username=f"many_{suffix}", email=f"many_{suffix}@example.com")
+    test_db.add(user)
+    test_db.flush()
+    goals = [models.Goal(creator_id=user.id, title=f"goal {i}", type="personal", status="active") for i in range(5)]
+    test_db.add_all(goals)
+    test_db.add(models.FocusSession(id=f"fs_{suffix}", user_id=user.id, method="flow", started_at=datetime(2024, 1, 1), duration=5))
+    test_db.commit()
+    return [goal.id for goal in goals]
+
+def test_get_keeps_requested_order_and_reports_missing(client, goal_ids, assert_max_queries):
+    ids = [goal_ids[3], "missing", goal_ids[0], goal_ids[3], goal_ids[1]]
+    with assert_max_queries(1) as statements:
+        response = client.get("/goals/by_ids", params={"ids": ",".join(ids)})
+    assert response.status_code == 200
+    assert " IN (" in statements[0]
+    body = response.json()
+    assert [goal["id"] for goal in body["items"]] == [goal_ids[3], goal_ids[0], goal_ids[1]]
+    assert body["missing"] == ["missing"]
+
+def test_post_body_for_long_lists(client, goal_ids, assert_max_queries):
+    ids = goal_ids + [f"gone-{i}" for i in range(3000)]
+    with assert_max_queries(1):
+        response = client.post("/goals/by_ids", json={"ids": ids})
+    assert [goal["id"] for goal in response.json()["items"]] == goal_ids
+    assert len(response.json()["missing"]) == 3000
+
+def test_too_many_ids(client, monkeypatch):
+    monkeypatch.setattr(multi_get, "MULTI_GET_MAX_IDS", 2)
+    assert client.get("/goals/by_ids", params={"ids": "a,b,c"}).status_code == 413
+    assert client.post("/achievements/by_ids", json={"ids": ["a", "b", "c"]}).status_code == 413
+    assert client.post("/achievements/by_ids", json={"ids": ["a", "a", "b"]}).json() == {"items": [], "missing": ["a", "b"]}
+
+def test_other_resources(client, goal_ids, test_db):
+    user_id = test_db.get(models.Goal, goal_ids[0]).creator_id
+    session_id = test_db.query(models.FocusSession.id).filter_by(user_id=user_id).scalar()
+    response = client.get("/focus_sessions/by_ids", params={"ids": f"{session_id},nope"})
+    assert response.json()["items"][0]["duration"] == 5 and response.json()["missing"] == ["nope"]
+    assert client.get("/users/by_ids", params={"ids": user_id}).status_code == 401
+
+def test_users_require_authentication(client, goal_ids, test_db):
+    user_id = test_db.get(models.Goal, goal_ids[0]).creator_id
+    suffix = uuid.uuid4().hex[:8]
+    credentials = {"email": f"reader_{suffix}@example.com", "password": "testpassword123"}
+    client.post("/auth/register", json={"username": f"reader_{suffix}", **credentials})
+    headers = {"Authorization": f"Bearer {client.post('/auth/login', json=credentials).json()['access_token']}"}
+    response = client.post("/users/by_ids", json={"ids": [user_id]}, headers=headers)
+    assert [user["id"] for user in response.json()["items"]] == [user_id]
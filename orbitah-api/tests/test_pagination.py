@@ -0,0 +1,39 @@
+import pytest
+from api.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+
+
+@pytest.fixture
+def achievements(client):
+    ids = []
+    for i in range(5):
+        response = client.post("/achievements/", json={"code": f"page_{i}", "name": f"Page {i}"})
+        ids.append(response.json()["id"])
+    return sorted(ids)
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor("3f2a-id")) == "3f2a-id"
+
+def test_cursor_pages_cover_all_rows(client, achievements):
+    """Test walking a list endpoint with next cursors"""
+    seen = []
+    response = client.get("/achievements/", params={"limit": 2})
+    while True:
+        assert response.status_code == 200
+        seen.extend(a["id"] for a in response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+        assert 'rel="next"' in response.headers["Link"]
+        response = client.get("/achievements/", params={"limit": 2, "cursor": cursor})
+    assert seen == achievements
+
+def test_skip_limit_still_supported(client, achievements):
+    response = client.get("/achievements/", params={"skip": 3, "limit": 10})
+    assert response.status_code == 200
+    assert [a["id"] for a in response.json()] == achievements[3:]
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+def test_invalid_cursor(client):
+    response = client.get("/goals/", params={"cursor": "%%%"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
@@ -0,0 +1,22 @@
+import asyncio
+
+from api import utils
+
+
+def test_hash_and_verify_in_worker_pool():
+    hashed = asyncio.run(utils.get_password_hash_async("s3cret-password"))
+    assert asyncio.run(utils.verify_password_async("s3cret-password", hashed))
+    assert not asyncio.run(utils.verify_password_async("wrong-password", hashed))
+    assert utils.PASSWORD_HASH_SECONDS.snapshot()
+    assert utils.PASSWORD_HASH_QUEUE_WAIT_SECONDS.snapshot()
+
+def test_login_returns_503_when_hasher_saturated(client, monkeypatch):
+    """Test that a saturated hashing pool sheds load instead of queueing"""
+    monkeypatch.setattr(utils, "_in_flight", utils.PASSWORD_HASH_WORKERS + utils.PASSWORD_HASH_MAX_QUEUE)
+    response = client.post("/auth/register", json={
+        "username": "saturated_user",
+        "email": "saturated@example.com",
+        "password": "testpassword123"
+    })
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
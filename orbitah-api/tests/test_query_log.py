@@ -0,0 +1,73 @@
+import logging
+import uuid
+
+import pytest
+from api import crud, models, query_log
+from api.query_log import NPlusOneQueryError
+
+
+@pytest.fixture
+def user_id(test_db):
+    suffix = uuid.uuid4().hex[:8]
+    user = models.User(username=f"querylog_{suffix}", email=f"querylog_{suffix}@example.com")
+    test_db.add(user)
+    test_db.commit()
+    return user.id
+
+@pytest.fixture
+def request_scope():
+    token = query_log.start_request({"type": "http", "method": "GET", "path": "/users/abc"})
+    yield query_log._current.get()
+    query_log.end_request(token)
+
+def test_repeated_statement_fails_with_route_and_caller(test_db, user_id, request_scope):
+    for _ in range(4):
+        crud.get_user(test_db, user_id)
+    with pytest.raises(NPlusOneQueryError) as exc:
+        crud.get_user(test_db, user_id)
+    message = str(exc.value)
+    assert "executed 5 times in GET /users/abc via crud.get_user:" in message
+    assert "FROM users" in message
+
+def test_log_only_mode_reports_once(test_db, user_id, request_scope, monkeypatch, caplog):
+    monkeypatch.setattr(query_log, "N_PLUS_ONE_RAISE", False)
+    with caplog.at_level(logging.WARNING, logger="api.query_log"):
+        for _ in range(8):
+            crud.get_user(test_db, user_id)
+    assert [record.getMessage().split(":")[0] for record in caplog.records] == ["possible N+1"]
+
+def test_statements_outside_requests_are_not_counted(test_db, user_id, monkeypatch, caplog):
+    monkeypatch.setattr(query_log, "N_PLUS_ONE_RAISE", False)
+    with caplog.at_level(logging.WARNING, logger="api.query_log"):
+        for _ in range(8):
+            crud.get_user(test_db, user_id)
+    assert query_log._current.get() is None
+    assert not [record for record in caplog.records if "possible N+1" in record.getMessage()]
+
+def test_transaction_control_is_not_counted(test_db, request_scope):
+    connection = test_db.connection()
+    for _ in range(8):
+        connection.exec_driver_sql("SAVEPOINT repeated")
+        connection.exec_driver_sql("RELEASE SAVEPOINT repeated")
+    assert request_scope.counts == {}
+
+def test_slow_query_is_logged_with_plan(test_db, user_id, monkeypatch, caplog):
+    monkeypatch.setattr(query_log, "SLOW_QUERY_MS", 1e-9)
+    with caplog.at_level(logging.WARNING, logger="api.query_log"):
+        crud.get_user(test_db, user_id)
+    [record] = [r for r in caplog.records if "FROM users" in r.getMessage()]
+    message = record.getMessage()
+    assert message.startswith("slow query (")
+    assert " in crud.get_user:" in message
+    assert "\nplan:\n" in message
+
+def test_requests_are_attributed_to_their_route(client, test_db, user_id, monkeypatch, caplog):
+    goal = models.Goal(creator_id=user_id, title="slow", type="personal", status="active")
+    test_db.add(goal)
+    test_db.commit()
+    monkeypatch.setattr(query_log, "SLOW_QUERY_MS", 1e-9)
+    monkeypatch.setattr(query_log, "SLOW_QUERY_EXPLAIN", False)
+    with caplog.at_level(logging.WARNING, logger="api.query_log"):
+        assert client.get(f"/goals/{goal.id}").status_code == 200
+    assert any("in GET /goals/{goal_id} via crud.get_goal:" in r.getMessage() for r in caplog.records)
+    assert not any("plan:" in r.getMessage() for r in caplog.records)
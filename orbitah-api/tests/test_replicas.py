@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+from api import database, models, replicas
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    """A second SQLite database standing in for a replica that lags behind the test database"""
+    url = f"sqlite:///{tmp_path}/replica.db"
+    engine = create_engine(url)
+    database.Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add(models.Group(name="Only on the replica", code="replica-only"))
+        db.commit()
+    engine.dispose()
+
+    replica = replicas.Replica("replica0", url)
+    monkeypatch.setattr(replicas, "REPLICAS", [replica])
+    monkeypatch.setattr(replicas, "DB_REPLICA_CHECK_INTERVAL", 0)
+    replicas._recent_writers.clear()
+    yield replica
+    asyncio.run(database.dispose_engines())
+
+def group_codes(client, **kwargs):
+    response = client.get("/groups/", **kwargs)
+    assert response.status_code == 200
+    return {group["code"] for group in response.json()}
+
+def test_reads_go_to_the_replica(client, test_db, replica):
+    test_db.add(models.Group(name="Only on the primary", code="primary-only"))
+    test_db.commit()
+
+    assert group_codes(client) == {"replica-only"}
+    # Writes and cached lookups keep using the primary
+    assert client.post("/groups/", json={"name": "New", "code": "new-crew"}).status_code == 200
+
+def test_commits_keep_the_client_on_the_primary(client, replica):
+    response = client.post("/groups/", json={"name": "Fresh", "code": "fresh-crew"})
+    assert replicas.STICKY_COOKIE in response.headers["set-cookie"]
+    assert "fresh-crew" in group_codes(client)
+
+    client.cookies.clear()
+    assert group_codes(client) == {"replica-only"}
+
+    # Bearer clients that drop cookies are remembered by this worker
+    headers = {"Authorization": "Bearer some-token"}
+    client.post("/groups/", json={"name": "Token", "code": "token-crew"}, headers=headers)
+    client.cookies.clear()
+    assert "token-crew" in group_codes(client, headers=headers)
+    assert group_codes(client, headers={"Authorization": "Bearer other-token"}) == {"replica-only"}
+
+def test_reads_without_a_commit_do_not_stick(client, replica):
+    response = client.get("/groups/")
+    assert "set-cookie" not in response.headers
+    assert group_codes(client) == {"replica-only"}
+
+def test_lagging_replica_falls_back_to_the_primary(client, replica, monkeypatch):
+    monkeypatch.setattr(replicas, "replica_lag", lambda conn: 60.0)
+    replicas.check_replicas()
+    assert replica.status() == {"healthy": False, "lag_seconds": 60.0, "error": "60.0s behind (limit 10s)"}
+    assert "replica-only" not in group_codes(client)
+
+    monkeypatch.setattr(replicas, "replica_lag", lambda conn: 0.5)
+    replicas.check_replicas()
+    assert replica.healthy
+    assert group_codes(client) == {"replica-only"}
+
+def test_unreachable_replica_falls_back_to_the_primary(client, tmp_path, monkeypatch):
+    replica = replicas.Replica("replica0", f"sqlite:///{tmp_path}/missing/replica.db")
+    monkeypatch.setattr(replicas, "REPLICAS", [replica])
+    replicas.check_replicas()
+    assert not replica.healthy and "unable to open" in replica.error
+    assert "replica-only" not in group_codes(client)
+    asyncio.run(database.dispose_engines())
+
+def test_pool_report_includes_replicas(client, replica):
+    group_codes(client)
+    data = client.get("/internal/db-pool").json()
+    assert data["replicas"] == {"replica0": {"healthy": True, "lag_seconds": None, "error": None}}
+    assert "replica0" in data["pools"]
+
+def test_cached_list_sees_a_write_right_away(client, replica):
+    # The achievements list is response-cached, so it must never be filled from a lagging replica
+    assert client.get("/achievements/").json() == []
+    response = client.post("/achievements/", json={"code": "first-light", "name": "First light"})
+    assert response.status_code == 200
+    sticky = dict(client.cookies)
+
+    # Another client misses the cache first, then the writer gets the cached body
+    client.cookies.clear()
+    assert [a["code"] for a in client.get("/achievements/").json()] == ["first-light"]
+    client.cookies.update(sticky)
+    assert [a["code"] for a in client.get("/achievements/").json()] == ["first-light"]
@@ -0,0 +1,97 @@
+import uuid
+
+import pytest
+from api import models
+from api.response_cache import CachedResponse
+
+
+def _new_achievement(client, name, **fields):
+    suffix = uuid.uuid4().hex[:8]
+    return client.post("/achievements/", json={"code": f"{name}_{suffix}", "name": f"{name} {suffix}", **fields})
+
+@pytest.fixture
+def achievement(client):
+    response = _new_achievement(client, "orbit", description="Reach orbit")
+    assert response.status_code == 200
+    return response.json()
+
+@pytest.fixture
+def group(test_db):
+    suffix = uuid.uuid4().hex[:8]
+    member = models.User(username=f"cached_{suffix}", email=f"cached_{suffix}@example.com")
+    db_group = models.Group(name="cached", code=f"k{suffix}", members=[member])
+    test_db.add(db_group)
+    test_db.commit()
+    return db_group, member
+
+def test_etag_and_not_modified(client, achievement):
+    response = client.get(f"/achievements/{achievement['id']}")
+    assert response.status_code == 200
+    assert response.json() == achievement
+    etag = response.headers["etag"]
+    assert etag.startswith('"') and response.headers["cache-control"] == "no-cache"
+
+    revalidated = client.get(f"/achievements/{achievement['id']}", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+    assert client.get(f"/achievements/{achievement['id']}", headers={"If-None-Match": '"other"'}).status_code == 200
+
+def test_hit_skips_the_database(client, achievement, assert_max_queries):
+    client.get(f"/achievements/{achievement['id']}")
+    client.get("/achievements/?limit=1")
+    with assert_max_queries(0):
+        assert client.get(f"/achievements/{achievement['id']}").status_code == 200
+        assert client.get("/achievements/?limit=1").status_code == 200
+
+def test_list_keeps_cursor_headers(client, achievement):
+    _new_achievement(client, "moon")
+    first = client.get("/achievements/?limit=1")
+    cached = client.get("/achievements/?limit=1")
+    assert cached.json() == first.json()
+    assert cached.headers["x-next-cursor"] == first.headers["x-next-cursor"]
+    assert cached.headers["link"] == first.headers["link"]
+
+def test_mutations_invalidate(client, achievement):
+    path = f"/achievements/{achievement['id']}"
+    etag = client.get(path).headers["etag"]
+    listed = client.get("/achievements/?limit=1000").json()
+
+    client.put(path, json={"description": "Reach a higher orbit"})
+    response = client.get(path, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["description"] == "Reach a higher orbit"
+
+    created = _new_achievement(client, "moon").json()
+    assert len(client.get("/achievements/?limit=1000").json()) == len(listed) + 1
+
+    client.delete(f"/achievements/{created['id']}")
+    assert client.get(f"/achievements/{created['id']}").status_code == 404
+    assert len(client.get("/achievements/?limit=1000").json()) == len(listed)
+
+def test_group_invalidated_by_goal_changes(client, group):
+    db_group, member = group
+    before = client.get(f"/groups/{db_group.id}")
+    goal = client.post("/goals/", json={
+        "title": "Dock", "type": "group", "status": "active", "creator_id": member.id, "group_id": db_group.id
+    }).json()
+    after = client.get(f"/groups/{db_group.id}", headers={"If-None-Match": before.headers["etag"]})
+    assert after.status_code == 200
+    assert after.json()["shared_goals"] == [goal["id"]]
+
+    client.put(f"/goals/{goal['id']}", json={"status": "completed"})
+    assert client.get(f"/groups/{db_group.id}").json()["goals_completed"] == 1
+
+def test_group_invalidated_by_rename(client, group):
+    db_group, _ = group
+    client.get(f"/groups/{db_group.id}")
+    client.put(f"/groups/{db_group.id}", json={"motto": "Ad astra"})
+    assert client.get(f"/groups/{db_group.id}").json()["motto"] == "Ad astra"
+
+def test_weak_and_wildcard_validators():
+    entry = CachedResponse(b"[]")
+    assert entry.matches(f"W/{entry.etag}")
+    assert entry.matches(f'"stale", {entry.etag}')
+    assert entry.matches("*")
+    assert not entry.matches('"stale"')
+    assert not entry.matches(None)
@@ -0,0 +1,58 @@
+import json
+import uuid
+from datetime import date, datetime
+
+import pytest
+from api import models, schemas, serialization
+from api.serialization import RowSerializer
+from sqlalchemy import select
+
+
+@pytest.fixture
+def goal_rows(test_db):
+    suffix = uuid.uuid4().hex[:8]
+    user = models.User(username=f"rows_{suffix}", email=f"rows_{suffix}@example.com", hashed_password="secret")
+    test_db.add(user)
+    test_db.flush()
+    test_db.add_all([
+        models.Goal(creator_id=user.id, title="plain", type="personal", status="active"),
+        models.Goal(
+            creator_id=user.id, title="dated", type="group", status="completed", created_by_ai=True,
+            created_at=datetime(2024, 5, 1, 9, 30, 15, 250), due_date=date(2024, 6, 1), rewards_xp=None
+        ),
+    ])
+    test_db.commit()
+    user_id = user.id
+    test_db.expunge_all()
+    return user_id
+
+def test_fast_path_matches_the_schema_encoding(test_db, goal_rows, monkeypatch):
+    goal_serializer = RowSerializer(schemas.Goal, models.Goal)
+    rows = test_db.execute(select(*goal_serializer.columns).where(models.Goal.creator_id == goal_rows)).all()
+    orm_rows = test_db.query(models.Goal).filter(models.Goal.creator_id == goal_rows).all()
+    expected = goal_serializer.adapter.dump_json(goal_serializer.adapter.validate_python(orm_rows, from_attributes=True))
+
+    assert goal_serializer.dump(rows) == expected
+    monkeypatch.setattr(serialization, "orjson", None)
+    assert goal_serializer.dump(rows) == expected
+
+def test_list_endpoints_skip_orm_instances(client, test_db, goal_rows):
+    response = client.get("/goals/", params={"creator_id": goal_rows, "limit": 1})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert len(response.json()) == 1 and response.json()[0]["assigned_user_ids"] == []
+    assert "X-Next-Cursor" in response.headers
+    assert not any(isinstance(obj, models.Goal) for obj in test_db.identity_map.values())
+
+def test_user_list_never_reads_password_hashes(client, goal_rows, assert_max_queries):
+    suffix = uuid.uuid4().hex[:8]
+    credentials = {"email": f"lister_{suffix}@example.com", "password": "testpassword123"}
+    client.post("/auth/register", json={"username": f"lister_{suffix}", **credentials})
+    headers = {"Authorization": f"Bearer {client.post('/auth/login', json=credentials).json()['access_token']}"}
+    client.get("/users/", headers=headers)
+    with assert_max_queries(1) as statements:
+        response = client.get("/users/", headers=headers)
+    assert "hashed_password" not in statements[0]
+    users = json.loads(response.content)
+    assert goal_rows in [user["id"] for user in users]
+    assert all("hashed_password" not in user for user in users)
@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+
+from api import database, migrate
+from sqlalchemy import create_engine, inspect
+
+API_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_importing_the_app_touches_no_database():
+    # An unreachable server: import must neither connect nor build a pool
+    script = (
+        "import sys\n"
+        "import api.main\n"
+        "from api import database\n"
+        "assert database._engines == {}, database._engines\n"
+        "assert 'psycopg2' not in sys.modules\n"
+    )
+    env = {**os.environ, "SQLALCHEMY_DATABASE_URL": "postgresql+psycopg2://nobody:x@127.0.0.1:1/none"}
+    result = subprocess.run([sys.executable, "-c", script], cwd=API_ROOT, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+def test_engine_is_created_once_on_first_use(client):
+    client.get("/")
+    engine = database.get_engine()
+    assert database.get_engine() is engine
+    with database.SessionLocal() as db:
+        assert db.get_bind() is engine
+
+def test_upgrade_database_creates_the_schema(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path}/migrated.db"
+    monkeypatch.setattr(database, "SQLALCHEMY_DATABASE_URL", url)
+    migrate.upgrade_database()
+
+    engine = create_engine(url)
+    tables = set(inspect(engine).get_table_names())
+    engine.dispose()
+    assert set(database.Base.metadata.tables) <= tables
+    assert "alembic_version" in tables
@@ -0,0 +1,74 @@
+import uuid
+from datetime import datetime
+
+import pytest
+from api import models
+
+
+@pytest.fixture
+def rows(test_db):
+    suffix = uuid.uuid4().hex[:8]
+    user = models.User(username=f"writer_{suffix}", email=f"writer_{suffix}@example.com")
+    group = models.Group(name="writers", code=f"w{suffix}", members=[user])
+    achievement = models.Achievement(code=f"write_{suffix}", name="Write")
+    test_db.add_all([group, achievement])
+    test_db.flush()
+    goal = models.Goal(creator_id=user.id, title="Draft", type="personal", status="active")
+    session = models.FocusSession(user_id=user.id, method="pomodoro", started_at=datetime(2024, 1, 1, 9), duration=25)
+    test_db.add_all([goal, session])
+    test_db.commit()
+    return {"user": user.id, "group": group.id, "achievement": achievement.id, "goal": goal.id, "session": session.id}
+
+def test_update_is_a_single_statement(client, rows, assert_max_queries):
+    # Previously: existence check, crud re-fetch, UPDATE and a post-commit refresh
+    with assert_max_queries(1):
+        response = client.put(f"/achievements/{rows['achievement']}", json={"name": "Rewrite"})
+    assert response.status_code == 200
+    assert response.json()["name"] == "Rewrite" and response.json()["code"].startswith("write_")
+
+    with assert_max_queries(1):
+        response = client.put(f"/goals/{rows['goal']}", json={"title": "Final"})
+    assert (response.json()["title"], response.json()["status"]) == ("Final", "active")
+
+def test_group_update_loads_only_its_collections(client, rows, assert_max_queries):
+    with assert_max_queries(3):
+        response = client.put(f"/groups/{rows['group']}", json={"motto": "Ad astra"})
+    assert response.json()["motto"] == "Ad astra"
+    assert response.json()["members"] == [rows["user"]]
+
+def test_delete_is_a_single_statement(client, rows, assert_max_queries):
+    with assert_max_queries(1):
+        response = client.delete(f"/achievements/{rows['achievement']}")
+    assert response.status_code == 200 and response.json()["id"] == rows["achievement"]
+    assert client.get(f"/achievements/{rows['achievement']}").status_code == 404
+
+    # DELETE ... RETURNING feeds the rollups without a prior SELECT; the rest is
+    # the rollup upsert and the member's group focus minutes
+    with assert_max_queries(4):
+        response = client.delete(f"/focus_sessions/{rows['session']}")
+    assert response.json()["duration"] == 25
+
+def test_goal_delete_clears_links_without_loading_them(client, rows, assert_max_queries):
+    with assert_max_queries(3):
+        response = client.delete(f"/goals/{rows['goal']}")
+    assert response.json()["title"] == "Draft"
+    assert client.get(f"/goals/{rows['goal']}").status_code == 404
+
+@pytest.mark.parametrize("method, path, body", [
+    ("put", "/achievements/missing", {"name": "x"}),
+    ("delete", "/achievements/missing", None),
+    ("put", "/goals/missing", {"title": "x"}),
+    ("put", "/goals/missing", {"status": "completed"}),
+    ("delete", "/goals/missing", None),
+    ("put", "/groups/missing", {"motto": "x"}),
+    ("delete", "/groups/missing", None),
+    ("put", "/focus_sessions/missing", {"duration": 1}),
+    ("delete", "/focus_sessions/missing", None),
+    ("put", "/exploration/missing", {"lore_progress": "x"}),
+    ("delete", "/exploration/missing", None),
+])
+def test_missing_rows_are_404(client, method, path, body):
+    kwargs = {"json": body} if body is not None else {}
+    response = getattr(client, method)(path, **kwargs)
+    assert response.status_code == 404
+    assert response.json()["detail"].endswith("not found")
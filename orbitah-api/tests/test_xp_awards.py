@@ -0,0 +1,189 @@
+import asyncio
+import os
+import threading
+import uuid
+
+import pytest
+from api import crud, models, schemas, xp
+from api.leaderboard import leaderboard
+from api.xp import XPWriteBehind
+
+
+@pytest.fixture
+def account(client):
+    suffix = uuid.uuid4().hex[:8]
+    user = {"username": f"xp_{suffix}", "email": f"xp_{suffix}@example.com", "password": "testpassword123"}
+    user_id = client.post("/auth/register", json=user).json()["id"]
+    response = client.post("/auth/login", json={"email": user["email"], "password": user["password"]})
+    return user_id, {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def _user(test_db, xp=0):
+    suffix = uuid.uuid4().hex[:8]
+    return crud.create_user(
+        test_db,
+        schemas.UserCreate(username=f"p_{suffix}", email=f"p_{suffix}@example.com", password="x", experience_points=xp),
+        hashed_password="x"
+    )
+
+def _xp(test_db, user_id):
+    test_db.expire_all()
+    return test_db.get(models.User, user_id).experience_points
+
+def test_award_is_a_single_atomic_update(client, account, assert_max_queries):
+    user_id, headers = account
+    client.post(f"/users/{user_id}/xp", json={"amount": 10}, headers=headers)
+    with assert_max_queries(2) as statements:
+        response = client.post(f"/users/{user_id}/xp", json={"amount": 15}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["experience_points"] == 25
+    assert any("experience_points + " in s or "experience_points, ?) + " in s for s in statements)
+    assert leaderboard.rank("xp", user_id)["score"] == 25
+
+def test_award_validation(client, account):
+    user_id, headers = account
+    assert client.post(f"/users/{user_id}/xp", json={"amount": 0}, headers=headers).status_code == 422
+    oversized = client.post(f"/users/{user_id}/xp", json={"amount": xp.XP_AWARD_MAX + 1}, headers=headers)
+    assert oversized.status_code == 422
+    assert client.get(f"/users/{user_id}", headers=headers).json()["experience_points"] == 0
+    assert client.post("/users/someone-else/xp", json={"amount": 5}, headers=headers).status_code == 403
+    assert client.post(f"/users/{user_id}/xp", json={"amount": 5}).status_code == 401
+
+def test_profile_update_cannot_set_xp(client, account):
+    user_id, headers = account
+    client.post(f"/users/{user_id}/xp", json={"amount": 10}, headers=headers)
+    response = client.put(f"/users/{user_id}", json={"experience_points": 5000}, headers=headers)
+    assert response.status_code == 422
+    assert client.get(f"/users/{user_id}", headers=headers).json()["experience_points"] == 10
+
+def test_concurrent_awards_are_not_lost(test_engine, test_db):
+    """Test that awards from parallel sessions all land (no read-modify-write)"""
+    from sqlalchemy.orm import sessionmaker
+    if test_engine.dialect.name == "sqlite":
+        pytest.skip("needs a server database with concurrent writers")
+    user = _user(test_db)
+    test_db.commit()
+
+    def award():
+        with sessionmaker(bind=test_engine)() as db:
+            for _ in range(10):
+                crud.award_xp(db, user.id, 1)
+    threads = [threading.Thread(target=award) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert _xp(test_db, user.id) == 40
+
+def test_write_behind_merges_awards(test_db, assert_max_queries):
+    users = [_user(test_db, xp=100), _user(test_db)]
+    buffer = XPWriteBehind()
+    for _ in range(50):
+        buffer.add(users[0].id, 2)
+        buffer.add(users[1].id, 1)
+    assert buffer.pending(users[0].id) == 100
+    assert _xp(test_db, users[0].id) == 100
+    with assert_max_queries(1):
+        assert buffer.flush(test_db) == 2
+    assert [_xp(test_db, u.id) for u in users] == [200, 50]
+    assert buffer.pending(users[0].id) == 0
+
+def test_failed_flush_is_retried(test_db, monkeypatch):
+    user = _user(test_db)
+    buffer = XPWriteBehind()
+    buffer.add(user.id, 7)
+    real_apply = crud.apply_xp_batch
+
+    def broken_apply(*args, **kwargs):
+        raise RuntimeError("database unavailable")
+    monkeypatch.setattr(crud, "apply_xp_batch", broken_apply)
+    assert buffer.flush(test_db) == 0
+    monkeypatch.setattr(crud, "apply_xp_batch", real_apply)
+    buffer.add(user.id, 3)
+    assert buffer.flush(test_db) == 2
+    assert _xp(test_db, user.id) == 10
+
+def test_journal_replay_is_exactly_once(test_db, tmp_path):
+    user = _user(test_db)
+    crashed = XPWriteBehind(str(tmp_path), fsync=False)
+    crashed.add(user.id, 5)
+    crashed.add(user.id, 6)
+    crashed.close()
+
+    # A new process replays the unflushed journal once
+    assert XPWriteBehind(str(tmp_path)).recover(test_db) == 1
+    assert _xp(test_db, user.id) == 11
+    assert XPWriteBehind(str(tmp_path)).recover(test_db) == 0
+    assert _xp(test_db, user.id) == 11
+
+    # A batch that was committed but whose file survived a crash is skipped
+    buffer = XPWriteBehind(str(tmp_path), fsync=False)
+    buffer.add(user.id, 4)
+    batch_id, awards = buffer._seal()
+    crud.apply_xp_batch(test_db, awards, batch_id=batch_id)
+    assert os.path.exists(tmp_path / f"{batch_id}.batch")
+    assert XPWriteBehind(str(tmp_path)).recover(test_db) == 0
+    assert _xp(test_db, user.id) == 15
+    assert os.listdir(tmp_path) == []
+
+def test_workers_can_share_a_journal_dir(test_db, tmp_path):
+    users = [_user(test_db), _user(test_db)]
+    first = XPWriteBehind(str(tmp_path), fsync=False)
+    second = XPWriteBehind(str(tmp_path), fsync=False)
+    first.add(users[0].id, 5)
+    second.add(users[1].id, 7)
+
+    # One worker's flush and another's startup recovery leave a live journal alone
+    assert first.flush(test_db) == 1
+    assert XPWriteBehind(str(tmp_path)).recover(test_db) == 0
+    assert [_xp(test_db, u.id) for u in users] == [5, 0]
+    assert second.flush(test_db) == 1
+    assert [_xp(test_db, u.id) for u in users] == [5, 7]
+
+    # A worker that dies is replayed by the next recovery
+    second.add(users[1].id, 1)
+    second.close()
+    assert XPWriteBehind(str(tmp_path)).recover(test_db) == 1
+    assert _xp(test_db, users[1].id) == 8
+    assert os.listdir(tmp_path) == []
+
+def test_failed_seal_keeps_awards_pending(test_db, tmp_path, monkeypatch):
+    user = _user(test_db)
+    buffer = XPWriteBehind(str(tmp_path), fsync=False)
+    buffer.add(user.id, 5)
+    real_rename = os.rename
+
+    def broken_rename(*args):
+        raise OSError("disk full")
+    monkeypatch.setattr(os, "rename", broken_rename)
+    with pytest.raises(OSError):
+        buffer.flush(test_db)
+    assert buffer.pending(user.id) == 5
+    monkeypatch.setattr(os, "rename", real_rename)
+    assert buffer.flush(test_db) == 1
+    assert _xp(test_db, user.id) == 5
+
+def test_flusher_survives_a_failed_flush(monkeypatch):
+    calls = []
+
+    def flaky_flush():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("database unavailable")
+    monkeypatch.setattr(xp, "xp_buffer", XPWriteBehind())
+    monkeypatch.setattr(xp, "flush_xp_buffer", flaky_flush)
+
+    async def scenario():
+        flusher = asyncio.create_task(xp.run_xp_flusher(interval=0.01))
+        while len(calls) < 3:
+            await asyncio.sleep(0.01)
+        flusher.cancel()
+    asyncio.run(asyncio.wait_for(scenario(), timeout=5))
+
+def test_buffered_endpoint_accepts(client, account, monkeypatch):
+    user_id, headers = account
+    buffer = XPWriteBehind()
+    monkeypatch.setattr(xp, "xp_buffer", buffer)
+    response = client.post(f"/users/{user_id}/xp", json={"amount": 9}, headers=headers)
+    assert response.status_code == 202
+    assert response.json() == {"user_id": user_id, "awarded": 9, "experience_points": None, "pending": 9}
+    assert leaderboard.rank("xp", user_id)["score"] == 9
@@ -1,5 +1,6 @@
 import type {
   Achievement,
+  Dashboard,
   ExplorationState,
   FocusSession,
   Goal,
@@ -274,4 +275,13 @@ export const explorationAPI = {
   },
 };
 
+// Dashboard API
+export const dashboardAPI = {
+  // User, group, goals, sessions, exploration and achievements in one request
+  getDashboard: async (): Promise<Dashboard> => {
+    const response: AxiosResponse<Dashboard> = await api.get("/me/dashboard");
+    return response.data;
+  },
+};
+
 export default api;
@@ -37,7 +37,6 @@ export interface UserUpdate {
   focus_preference?: string;
   group_id?: string;
   current_location?: string;
-  experience_points?: number;
   rank?: string;
   streak_days?: number;
 }
@@ -107,3 +106,12 @@ export interface ExplorationState {
   lore_progress?: string;
   achievements: string[];
 }
+
+export interface Dashboard {
+  user: User;
+  group?: Group;
+  active_goals: Goal[];
+  recent_sessions: FocusSession[];
+  exploration?: ExplorationState;
+  achievements: Achievement[];
+}